@@ -70,20 +70,65 @@ from . import config
 from .config import (set_option, get_option, reset_option, describe_option,
                      options, option_context)
 
-# CAS utilities
-from .cas import (CAS, vl, nil, getone, getnext, datamsghandlers, blob)
-from .cas.table import CASTable
-
-# Conflicts with .cas.table, so we import it excplicitly here
-from .cas.utils import table
-
-# DataFrame with SAS metadata
-from .dataframe import SASDataFrame, concat, reshape_bygroups
-
 # Exceptions
 from .exceptions import SWATError, SWATOptionError, SWATCASActionError
 
-# SAS Formatter
-from .formatter import SASFormatter
+# Names that are imported on first use.  Importing the CAS, DataFrame,
+# and formatter modules loads pandas and the REST stack, so they are
+# deferred until they are needed (PEP 562).
+_LAZY = {
+    # CAS utilities
+    'CAS': 'cas',
+    'vl': 'cas',
+    'nil': 'cas',
+    'getone': 'cas',
+    'getnext': 'cas',
+    'datamsghandlers': 'cas',
+    'blob': 'cas',
+    'ThreadSafeCAS': 'cas',
+    'CASTable': 'cas.table',
+
+    # Conflicts with .cas.table, so we import it excplicitly here
+    'table': 'cas.utils',
+
+    # DataFrame with SAS metadata
+    'SASDataFrame': 'dataframe',
+    'concat': 'dataframe',
+    'crosstab': 'dataframe',
+    'reshape_bygroups': 'dataframe',
+
+    # SAS Formatter
+    'SASFormatter': 'formatter',
+}
+
+__all__ = ['config', 'set_option', 'get_option', 'reset_option', 'describe_option',
+           'options', 'option_context', 'SWATError', 'SWATOptionError',
+           'SWATCASActionError'] + list(_LAZY)
+
+
+def __getattr__(name):
+    ''' Import deferred names on first access '''
+    if name not in _LAZY:
+        raise AttributeError('module %r has no attribute %r' % (__name__, name))
+    import importlib
+    module = importlib.import_module('.' + _LAZY[name], __name__)
+    try:
+        value = getattr(module, name)
+    except AttributeError:
+        # Submodules such as datamsghandlers
+        value = importlib.import_module('.' + name, module.__name__)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
+
+if sys.hexversion < 0x03070000:
+    # Module-level __getattr__ is not supported, so import everything now
+    for _name in _LAZY:
+        __getattr__(_name)
+    del _name
 
 __version__ = '1.2.1-dev'
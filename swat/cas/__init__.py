@@ -29,6 +29,8 @@ from .connection import CAS, getone, getnext
 from .table import CASTable
 from .transformers import py2cas
 from .types import nil, blob
+from .batch import CASBatch
 from .request import CASRequest
 from .response import CASResponse
 from .results import CASResults
+from .threadsafe import ThreadSafeCAS
@@ -26,7 +26,6 @@ from __future__ import print_function, division, absolute_import, unicode_litera
 import six
 import json
 import keyword
-import pandas as pd
 import re
 import textwrap
 import weakref
@@ -248,7 +247,7 @@ def _format_param(param, connection, indent=0, selector=None, path='', output=No
 
     width = 72
     wraptext = None
-    if hasattr(connection._sw_connection, 'wraptext'):
+    if hasattr(getattr(connection, '_sw_connection', None), 'wraptext'):
         wraptext = connection._sw_connection.wraptext
 
     # Print description and other meta-data
@@ -414,6 +413,58 @@ def format_params(params, connection, suppress_subparams=None, param_names=None,
     return '\n'.join(output)
 
 
+class _ReflectedDoc(object):
+    '''
+    Descriptor that generates the docstring of a reflected class
+
+    Formatting the documentation of every action in an action set is
+    expensive, so it is deferred until the docstring is first requested
+    (e.g., by ``help`` or IPython's ``?``).
+
+    '''
+
+    def __get__(self, obj, cls):
+        return cls._get_docs()['doc']
+
+
+class _ActionParamsDoc(object):
+    ''' Descriptor that returns the parameter documentation of an action '''
+
+    def __get__(self, obj, cls):
+        docs = obj is not None and obj._get_action_docs()
+        if docs:
+            return docs['params']
+        return xadict.__doc__
+
+
+class _ActionParams(xadict):
+    '''
+    Parameters of a CASAction instance
+
+    The documentation and tab-completion values of the parameters are
+    taken from the action class when they are first requested.
+
+    '''
+
+    __doc__ = _ActionParamsDoc()
+
+    def set_action(self, action):
+        ''' Set the action class to get documentation from '''
+        super(xadict, self).__setattr__('_action', action)
+
+    def _get_action_docs(self):
+        ''' Return the documentation of the action class, if available '''
+        action = self.__dict__.get('_action')
+        if action is not None:
+            return action._get_docs()
+
+    def __dir__(self):
+        docs = self._get_action_docs()
+        if docs and docs['all_params']:
+            return list(docs['all_params'])
+        return super(_ActionParams, self).__dir__()
+
+
 class CASActionSet(object):
     '''
     CASActionSet container
@@ -425,6 +476,8 @@ class CASActionSet(object):
 
     trait_names = None  # Block IPython's lookup of this
     _connection = None
+    _asinfo = None
+    _docs = None
 
     @classmethod
     def from_reflection(cls, asinfo, connection):
@@ -449,7 +502,9 @@ class CASActionSet(object):
 
         members = {
             '_connection': weakref.ref(connection),
-            '__doc__': cls._format_actionset_doc(asinfo),
+            '_asinfo': asinfo,
+            '_docs': {},
+            '__doc__': _ReflectedDoc(),
             'actions': actions,
         }
 
@@ -467,6 +522,21 @@ class CASActionSet(object):
         # Generate action set class
         return type(str(asname).title(), (CASActionSet,), members)
 
+    @classmethod
+    def _get_docs(cls):
+        '''
+        Return the generated documentation of the action set
+
+        Returns
+        -------
+        dict
+            Dictionary containing the docstring in the 'doc' key
+
+        '''
+        if not cls._docs:
+            cls._docs['doc'] = cls._format_actionset_doc(cls._asinfo)
+        return cls._docs
+
     @classmethod
     def _format_actionset_doc(cls, asinfo):
         '''
@@ -483,6 +553,8 @@ class CASActionSet(object):
            Documentation derived from action set dictionary
 
         '''
+        import pandas as pd
+
         actions = asinfo.get('actions', [])
 
         doc = []
@@ -540,8 +612,7 @@ class CASActionSet(object):
 
             # Create action class
             if hasattr(self, 'default_params') and self.default_params is not None:
-                members = {'default_params': getattr(self, 'default_params', {})}
-                cls = type(cls.__name__, (cls,), members)
+                cls = cls._with_default_params(getattr(self, 'default_params', {}))
 
             if re.match(r'^[A-Z]', origname):
                 return cls
@@ -580,25 +651,18 @@ class CASAction(ParamManager):
 
     trait_names = None  # Block IPython's lookup of this
     _connection = None
+    _actinfo = None
+    _docs = None
     all_params = set()
 
     def __init__(self, *args, **kwargs):
-        super(CASAction, self).__init__(*args, **kwargs)
-        self.params.set_dir_values(type(self).all_params)
-
-        # Add doc to params
-        if type(self).__doc__:
-            idx = 0
-            if 'Parameters' in type(self).__doc__:
-                idx = 1
-            self.params.set_doc(re.split(r'\w+\s+----+',
-                                         type(self).__doc__)[idx].strip())
-        elif self.__init__.__doc__:
-            idx = 0
-            if 'Parameters' in self.__init__.__doc__:
-                idx = 1
-            self.params.set_doc(re.split(r'\w+\s+----+',
-                                         self.__init__.__doc__)[idx].strip())
+        super(CASAction, self).__init__()
+
+        # Documentation of the parameters is generated when requested
+        self.params = _ActionParams()
+        self.params.set_action(type(self))
+
+        self.set_params(*args, **kwargs)
 
     @classmethod
     def from_reflection(cls, asname, actinfo, connection):
@@ -630,7 +694,6 @@ class CASAction(ParamManager):
 
         # Create call signatures
         params = actinfo.get('params', [])
-        results = actinfo.get('results', [])
         params = [x for x in params if not x['name'].startswith('_')]
         params = sorted(params, key=lambda x: (int(not x.get('isRequired', 0))))
         pkeys = [param['name'] for param in params]
@@ -650,18 +713,6 @@ class CASAction(ParamManager):
                    '''    return CASAction.__call__(_self_, %s)''')
                   % (sig, funcargs), _globals, _locals)
 
-        # Generate documentation
-        all_params = []
-        setget_doc = format_params(params, connection,
-                                   suppress_subparams=['table.importoptions'],
-                                   param_names=all_params).rstrip()
-        action_doc = cls._format_action_doc(actinfo, setget_doc).rstrip()
-        if results:
-            results_doc = '\n\nResults Keys\n------------\n' + \
-                          format_params(results, connection, results_format=True).rstrip()
-        else:
-            results_doc = ''
-
         # Generate set/del methods for scalar parameters
         def set_params(_self_, *args, **kwargs):
             ''' Set parameters '''
@@ -679,16 +730,6 @@ class CASAction(ParamManager):
             ''' Get parameter '''
             return CASAction.get_param(_self_, key)
 
-        # Set docstrings
-        set_params.__doc__ = SET_PARAMS_DOCSTRING % setget_doc
-        set_param.__doc__ = SET_PARAM_DOCSTRING % setget_doc
-        get_params.__doc__ = GET_PARAMS_DOCSTRING % setget_doc
-        get_param.__doc__ = GET_PARAM_DOCSTRING % setget_doc
-        _locals['__call__'].__doc__ = re.sub(r'\w+ object$',
-                                             r'CASResults object%s' % results_doc,
-                                             action_doc.rstrip())
-        _locals['__init__'].__doc__ = action_doc.rstrip()
-
         for name in list(param_names):
             if keyword.iskeyword(name):
                 param_names.append(dekeywordify(name))
@@ -696,15 +737,16 @@ class CASAction(ParamManager):
         # CASAction members and methods
         actmembers = {
             '_connection': weakref.ref(connection),
+            '_actinfo': actinfo,
+            '_docs': {},
             '__init__': _locals['__init__'],
             '__call__': _locals['__call__'],
-            '__doc__': action_doc,
+            '__doc__': _ReflectedDoc(),
             'set_params': set_params,
             'set_param': set_param,
             'get_params': get_params,
             'get_param': get_param,
             'param_names': param_names,
-            'all_params': set(all_params)
         }
 
         # Generate action class
@@ -712,6 +754,99 @@ class CASAction(ParamManager):
 
         return actcls
 
+    @classmethod
+    def _get_docs(cls):
+        '''
+        Return the generated documentation of a reflected action class
+
+        The documentation is generated from the reflection information
+        the first time it is requested.  The docstrings of the class
+        methods and the set of all parameter names are filled in at
+        the same time.
+
+        Returns
+        -------
+        dict
+            Dictionary containing the action docstring ('doc'), the
+            parameter documentation ('params'), and the set of all
+            parameter names ('all_params').  None is returned for classes
+            that weren't created from reflection information.
+
+        '''
+        docs = cls._docs
+        if docs is None or docs:
+            return docs
+
+        # Methods and attributes are set on the reflected class rather
+        # than subclasses created for default parameters.
+        actcls = [x for x in cls.__mro__ if '_actinfo' in vars(x)][0]
+        actinfo = actcls._actinfo
+
+        params = actinfo.get('params', [])
+        results = actinfo.get('results', [])
+        params = [x for x in params if not x['name'].startswith('_')]
+        params = sorted(params, key=lambda x: (int(not x.get('isRequired', 0))))
+
+        try:
+            connection = actcls.get_connection()
+        except SWATError:
+            connection = None
+
+        # Generate documentation
+        all_params = []
+        setget_doc = format_params(params, connection,
+                                   suppress_subparams=['table.importoptions'],
+                                   param_names=all_params).rstrip()
+        action_doc = cls._format_action_doc(actinfo, setget_doc).rstrip()
+        if results:
+            results_doc = '\n\nResults Keys\n------------\n' + \
+                          format_params(results, connection, results_format=True).rstrip()
+        else:
+            results_doc = ''
+
+        # Set docstrings
+        members = vars(actcls)
+        members['set_params'].__doc__ = SET_PARAMS_DOCSTRING % setget_doc
+        members['set_param'].__doc__ = SET_PARAM_DOCSTRING % setget_doc
+        members['get_params'].__doc__ = GET_PARAMS_DOCSTRING % setget_doc
+        members['get_param'].__doc__ = GET_PARAM_DOCSTRING % setget_doc
+        members['__call__'].__doc__ = re.sub(r'\w+ object$',
+                                             r'CASResults object%s' % results_doc,
+                                             action_doc)
+        members['__init__'].__doc__ = action_doc
+
+        actcls.all_params = set(all_params)
+
+        idx = 0
+        if 'Parameters' in action_doc:
+            idx = 1
+
+        docs['doc'] = action_doc
+        docs['params'] = re.split(r'\w+\s+----+', action_doc)[idx].strip()
+        docs['all_params'] = actcls.all_params
+
+        return docs
+
+    @classmethod
+    def _with_default_params(cls, default_params):
+        '''
+        Create a subclass of the action class with default parameters
+
+        Parameters
+        ----------
+        default_params : dict
+            The default parameters of the action
+
+        Returns
+        -------
+        CASAction class
+
+        '''
+        members = {'default_params': default_params}
+        if cls._docs is not None:
+            members['__doc__'] = _ReflectedDoc()
+        return type(cls.__name__, (cls,), members)
+
     @classmethod
     def _format_action_doc(cls, actinfo, paramdoc):
         '''
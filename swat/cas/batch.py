@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Utilities for queuing batches of CAS actions
+
+'''
+
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import weakref
+from ..exceptions import SWATError
+from ..utils.compat import a2n
+
+
+class CASBatch(object):
+    '''
+    Queue of CAS actions to run as a batch
+
+    Actions added to the batch are not called until the batch is run,
+    either explicitly using :meth:`run`, or implicitly when the batch
+    is used as a context manager and the ``with`` block exits.  When
+    the batch is run, the actions are called one after another and
+    the responses of each action are compiled into a separate
+    :class:`CASResults` object.
+
+    Notes
+    -----
+    Each action is still a separate request to the server.  A batch
+    doesn't reduce the number of round trips; it groups the actions
+    so they are called together at a well-defined point.
+
+    Parameters
+    ----------
+    connection : CAS object
+        The connection to call the actions on
+
+    Examples
+    --------
+    >>> with conn.batch() as batch:
+    ...     colinfo = batch.retrieve('table.columninfo', table='iris')
+    ...     tblinfo = batch.retrieve('table.tableinfo', table='iris')
+    >>> print(batch.results[colinfo]['ColumnInfo'])
+
+    Returns
+    -------
+    CASBatch object
+
+    '''
+
+    def __init__(self, connection):
+        self._connection = weakref.ref(connection)
+        self._requests = []
+        self.results = []
+
+    def get_connection(self):
+        '''
+        Return the registered connection
+
+        The connection is only held by a weak reference.  If the
+        connection no longer exists, a SWATError is raised.
+
+        Raises
+        ------
+        SWATError
+            If the registered connection no longer exists
+
+        '''
+        conn = self._connection()
+        if conn is None:
+            raise SWATError('Connection object is no longer valid')
+        return conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        if type is None:
+            self.run()
+
+    def __len__(self):
+        return len(self._requests)
+
+    def retrieve(self, _name_, **kwargs):
+        '''
+        Add an action to the batch
+
+        Parameters
+        ----------
+        _name_ : string
+            Name of the action
+        **kwargs : any, optional
+            Arbitrary keyword arguments
+
+        Returns
+        -------
+        int
+            The index of the action's results in :attr:`results`
+            once the batch has been run
+
+        '''
+        self._requests.append((a2n(_name_), kwargs))
+        return len(self._requests) - 1
+
+    invoke = retrieve
+
+    def run(self):
+        '''
+        Call all queued actions and compile the results
+
+        Each action is called when the responses of the previous action
+        have been received.  If an action raises an exception, the
+        remaining actions are not called.
+
+        Returns
+        -------
+        list of CASResults objects
+            The results of each action in the order they were queued
+
+        '''
+        conn = self.get_connection()
+        requests, self._requests = self._requests, []
+        self.results = []
+        for name, kwargs in requests:
+            self.results.append(conn.retrieve(name, **kwargs))
+        return self.results
@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Binding of action arguments to action signatures
+
+'''
+
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import copy
+import six
+from ..utils.compat import text_types, binary_types
+from .table import CASTable
+from .utils.params import ParamManager
+
+# Actions whose table= parameter isn't defined as a table definition
+COLUMNINFO_ACTIONS = set(['columninfo', 'table.columninfo', 'update', 'table.update'])
+
+# Actions that use the fetch parameters of a CASTable
+FETCH_ACTIONS = set(['fetch', 'table.fetch'])
+
+# Actions that don't support inputs=, so the table's vars= is used instead
+VARS_ACTIONS = set(['partition', 'table.partition', 'save', 'table.save'])
+
+# Actions that alias table= to a hidden name= parameter
+TABLEINFO_ACTIONS = set(['tableinfo', 'table.tableinfo'])
+
+# Table-related parameter kinds
+TABLEDEF = 1
+TABLENAME = 2
+OUTTABLEDEF = 3
+CASLIB = 4
+
+
+def _get_kind(param):
+    ''' Return the table-related kind of a parameter '''
+    if param.get('isTableDef'):
+        return TABLEDEF
+    if param.get('isTableName'):
+        return TABLENAME
+    if param.get('isOutTableDef'):
+        return OUTTABLEDEF
+    if param.get('isCasLib'):
+        return CASLIB
+
+
+class ParamBinder(object):
+    '''
+    Compiled binding of keyword arguments to an action parameter list
+
+    The parameter list is scanned once when the binder is created
+    to find the parameters that need special handling (table
+    definitions, table names, output tables, caslibs, and the
+    ``inputs=`` / ``fetchvars=`` lists).  Binding arguments converts
+    :class:`CASTable` objects to the form required by each parameter
+    and records the values in a copy of the parameter list.  Only the
+    dictionaries that are modified are copied, so neither the
+    reflected signature nor the caller's arguments are changed.
+
+    Parameters
+    ----------
+    parmlist : list of dicts
+        The parameter list from the action reflection information
+
+    Returns
+    -------
+    ParamBinder object
+
+    '''
+
+    def __init__(self, parmlist):
+        self.parmlist = parmlist
+
+        self._caslib = False
+        self._uses_inputs = False
+        self._uses_fetchvars = False
+        self._rules = []
+        self._index = {}
+        self._subbinders = {}
+
+        for i, param in enumerate(parmlist):
+            name = param['name']
+            lname = name.lower()
+
+            if name == 'caslib':
+                self._caslib = True
+
+            if param['parmType'] == 'value_list':
+                if lname == 'inputs':
+                    self._uses_inputs = True
+                elif lname == 'fetchvars':
+                    self._uses_fetchvars = True
+
+            kind = _get_kind(param)
+            if kind is not None or lname == 'table':
+                self._rules.append((name, lname, kind, self._uses_inputs))
+
+            self._index.setdefault(name, []).append(i)
+
+    def _get_subbinder(self, idx):
+        ''' Return the binder for the sub-parameters of a parameter '''
+        binder = self._subbinders.get(idx)
+        if binder is None:
+            binder = type(self)(self.parmlist[idx]['parmList'])
+            self._subbinders[idx] = binder
+        return binder
+
+    def bind(self, kwargs, action=''):
+        '''
+        Bind arguments to the parameter list
+
+        Parameters
+        ----------
+        kwargs : dict
+            The action arguments
+        action : string, optional
+            The name of the action
+
+        Returns
+        -------
+        (dict, list of dicts)
+            The converted arguments and the parameter list containing
+            the argument values
+
+        '''
+        if isinstance(kwargs, ParamManager):
+            kwargs = copy.deepcopy(kwargs.params)
+
+        # Short circuit if we can
+        if not isinstance(kwargs, dict):
+            return kwargs, self.parmlist
+
+        kwargs = copy.copy(kwargs)
+        action = (action or '').lower()
+
+        self._convert_tables(kwargs, action)
+
+        # Add current value fields in the signature
+        parmlist = None
+        for key, value in list(kwargs.items()):
+            for idx in self._index.get(key, ()):
+                param = self.parmlist[idx]
+                if 'parmList' in param:
+                    subvalue, subparmlist = self._get_subbinder(idx).bind(value, action)
+                    if isinstance(value, dict):
+                        kwargs[key] = subvalue
+                    if subparmlist is param['parmList']:
+                        continue
+                    param = dict(param, parmList=subparmlist)
+                elif isinstance(value, text_types):
+                    param = dict(param, value=value.replace('"', '\\u0022'))
+                # TODO: This should only happen for binary inputs (i.e., never)
+                elif isinstance(value, binary_types):
+                    continue
+                else:
+                    param = dict(param, value=value)
+
+                if parmlist is None:
+                    parmlist = list(self.parmlist)
+                parmlist[idx] = param
+
+        if parmlist is None:
+            parmlist = self.parmlist
+
+        return kwargs, parmlist
+
+    def _convert_tables(self, kwargs, action):
+        '''
+        Convert CASTable objects to the form required by the parameters
+
+        This method modifies `kwargs` *in place*.
+
+        Parameters
+        ----------
+        kwargs : dict
+            The action arguments
+        action : string
+            The lower-cased name of the action
+
+        '''
+        caslib = self._caslib
+
+        # kwargs preserving case
+        casekeys = {k.lower(): k for k in kwargs.keys()}
+
+        # Get table object if it exists
+        tbl = kwargs.get('__table__', None)
+
+        # Add support for CASTable objects
+        inputs = None
+        fetch = {}
+        for name, lname, kind, uses_inputs in self._rules:
+            key = casekeys.get(name, name)
+            value = kwargs.get(key)
+
+            # Convert table objects to the proper form based on the argument type
+            if isinstance(value, CASTable):
+                if kind == TABLEDEF:
+                    inputs = value.get_inputs_param()
+                    fetch = value.get_fetch_params()
+                    kwargs[key] = value.to_table_params()
+                elif kind == TABLENAME:
+                    inputs = value.get_inputs_param()
+                    fetch = value.get_fetch_params()
+                    # Fill in caslib= first
+                    if caslib and 'caslib' not in kwargs and value.has_param('caslib'):
+                        kwargs['caslib'] = value.get_param('caslib')
+                    kwargs[key] = value.to_table_name()
+                elif kind == OUTTABLEDEF:
+                    kwargs[key] = value.to_outtable_params()
+                elif kind == CASLIB and value.has_param('caslib'):
+                    kwargs[key] = value.get_param('caslib')
+
+            # If a string is given for a table object, convert it to a table object
+            elif isinstance(value, text_types) and kind == TABLEDEF:
+                kwargs[key] = {'name': value}
+
+            elif tbl is not None and kind == TABLEDEF and \
+                    lname == 'table' and 'table' not in casekeys:
+                inputs = tbl.get_inputs_param()
+                fetch = tbl.get_fetch_params()
+                kwargs[key] = tbl.to_table_params()
+
+            elif tbl is not None and kind == TABLENAME and \
+                    lname == 'name' and 'name' not in casekeys:
+                inputs = tbl.get_inputs_param()
+                fetch = tbl.get_fetch_params()
+                if caslib and 'caslib' not in kwargs and tbl.has_param('caslib'):
+                    kwargs['caslib'] = tbl.get_param('caslib')
+                kwargs[key] = tbl.to_table_name()
+
+            # Workaround for columninfo / update which doesn't define table= as
+            # a table definition.
+            elif tbl is not None and lname == 'table' and \
+                    action in COLUMNINFO_ACTIONS and 'table' not in casekeys:
+                inputs = tbl.get_inputs_param()
+                kwargs[key] = tbl.to_table_params()
+                if not uses_inputs:
+                    if inputs and 'vars' not in kwargs:
+                        kwargs[key]['vars'] = inputs
+                    inputs = None
+
+        # Apply input variables
+        if self._uses_inputs and inputs and 'inputs' not in kwargs:
+            kwargs['inputs'] = inputs
+        elif self._uses_fetchvars and inputs and 'fetchvars' not in kwargs:
+            kwargs['fetchvars'] = inputs
+
+        # Apply fetch parameters
+        if fetch and action in FETCH_ACTIONS:
+            for key, value in six.iteritems(fetch):
+                if key in kwargs:
+                    continue
+                if key == 'sortby' and ('orderby' in kwargs or 'orderBy' in kwargs):
+                    continue
+                kwargs[key] = value
+
+        # Apply inputs= to specific actions that don't support it
+        if 'table' in kwargs and not self._uses_inputs and inputs \
+                and action in VARS_ACTIONS:
+            tbl = kwargs['table']
+            if isinstance(tbl, dict):
+                tbl = kwargs['table'] = copy.copy(tbl)
+            else:
+                tbl = dict(name=tbl)
+            tbl['vars'] = inputs
+
+        kwargs.pop('__table__', None)
+
+        # Workaround for tableinfo which aliases table= to name=, but
+        # the alias is hidden.
+        if action in TABLEINFO_ACTIONS and 'table' in kwargs:
+            if isinstance(kwargs['table'], CASTable):
+                kwargs['table'] = kwargs['table'].to_table_params()
+            if isinstance(kwargs['table'], dict):
+                if caslib and 'caslib' not in kwargs and \
+                       kwargs['table'].get('caslib'):
+                    kwargs['caslib'] = kwargs['table']['caslib']
+                kwargs['table'] = kwargs['table']['name']
@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Client-side cache of CAS table metadata
+
+'''
+
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import six
+from ..config import get_option_snapshot
+from ..utils.compat import text_types, items_types
+
+# Actions that can modify any table in the session
+CLEAR_ACTIONS = set([
+    'runcode', 'execdirect', 'runcasl', 'setsessopt',
+    'addcaslib', 'dropcaslib', 'restoretables',
+])
+
+# Actions that modify the table given in their table= or name= parameter
+TABLE_ACTIONS = set([
+    'droptable', 'update', 'altertable', 'append', 'deletesource',
+    'promote', 'loadtable', 'addtable', 'upload', 'deleterows',
+])
+
+# Update flags that indicate that table metadata may have changed
+CLEAR_FLAGS = set(['tables', 'caslibs'])
+
+# Current option values
+_options = get_option_snapshot()
+
+
+def _table_id(table):
+    '''
+    Return the (caslib, name) pair identifying a table
+
+    Parameters
+    ----------
+    table : CASTable or dict or string
+        The table to identify
+
+    Returns
+    -------
+    (string or None, string) tuple
+        The caslib will be None if it isn't specified
+
+    '''
+    if hasattr(table, 'params'):
+        table = table.params
+    if isinstance(table, dict):
+        params = {k.lower(): v for k, v in six.iteritems(table)}
+        name = params.get('name')
+        caslib = params.get('caslib')
+    else:
+        name = table
+        caslib = None
+    if not isinstance(name, text_types):
+        return None
+    if isinstance(caslib, text_types):
+        caslib = caslib.lower()
+    else:
+        caslib = None
+    return caslib, name.lower()
+
+
+class CASMetadataCache(object):
+    '''
+    Cache of table metadata for a connection
+
+    Metadata (column information, row counts, etc.) is keyed by the
+    table's caslib and name as well as the parameters that affect the
+    metadata such as where clauses and computed columns.  Entries for
+    a table are dropped when an action that modifies the table is
+    invoked, and the entire cache is cleared when the server indicates
+    that tables have changed.
+
+    Attributes
+    ----------
+    hits : int
+        The number of lookups that were found in the cache
+    misses : int
+        The number of lookups that were not found in the cache
+
+    Returns
+    -------
+    CASMetadataCache object
+
+    '''
+
+    def __init__(self):
+        self._data = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return sum(len(x) for x in self._data.values())
+
+    def _get_key(self, kind, table):
+        ''' Return the table ID and entry key for a table '''
+        tblid = _table_id(table)
+        if tblid is None:
+            return None, None
+        params = sorted(six.iteritems(table.to_table_params()))
+        return tblid, (kind, repr(params), tuple(table._columns))
+
+    def get(self, kind, table):
+        '''
+        Return the cached metadata for a table
+
+        Parameters
+        ----------
+        kind : string
+            The type of metadata: 'columninfo', 'numrows', or 'numcolumns'
+        table : CASTable
+            The table to look up
+
+        Returns
+        -------
+        any
+            The cached metadata, or None if it isn't in the cache
+
+        '''
+        if not _options['cas.dataset.metadata_cache']:
+            return None
+        tblid, key = self._get_key(kind, table)
+        out = self._data.get(tblid, {}).get(key)
+        if out is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if hasattr(out, 'copy'):
+            return out.copy()
+        return out
+
+    def set(self, kind, table, value):
+        '''
+        Store metadata for a table
+
+        Parameters
+        ----------
+        kind : string
+            The type of metadata: 'columninfo', 'numrows', or 'numcolumns'
+        table : CASTable
+            The table the metadata belongs to
+        value : any
+            The metadata
+
+        '''
+        if not _options['cas.dataset.metadata_cache']:
+            return
+        tblid, key = self._get_key(kind, table)
+        if tblid is not None:
+            if hasattr(value, 'copy'):
+                value = value.copy()
+            self._data.setdefault(tblid, {})[key] = value
+
+    def invalidate(self, table=None):
+        '''
+        Drop cached metadata
+
+        Parameters
+        ----------
+        table : CASTable or dict or string, optional
+            The table to drop the metadata of.  If the table does not
+            specify a caslib, the metadata for tables of that name in all
+            caslibs is dropped.  If no table is given, the entire cache
+            is cleared.
+
+        '''
+        if table is None:
+            self._data.clear()
+            return
+
+        tblid = _table_id(table)
+        if tblid is None:
+            self._data.clear()
+            return
+
+        caslib, name = tblid
+        for key in list(self._data.keys()):
+            if key[1] == name and (caslib is None or key[0] in [None, caslib]):
+                del self._data[key]
+
+    def invalidate_action(self, name, params):
+        '''
+        Drop metadata of tables that may be modified by an action
+
+        Parameters
+        ----------
+        name : string
+            The name of the action
+        params : dict
+            The action parameters
+
+        '''
+        if not self._data:
+            return
+
+        name = name.lower().split('.')[-1]
+        params = {k.lower(): v for k, v in six.iteritems(params)}
+
+        if name in CLEAR_ACTIONS:
+            self._data.clear()
+            return
+
+        targets = []
+        if name in TABLE_ACTIONS:
+            for key in ['name', 'table', '__table__']:
+                if params.get(key) is not None:
+                    targets.append(params[key])
+                    break
+            else:
+                self._data.clear()
+                return
+            if isinstance(targets[0], text_types) and params.get('caslib'):
+                targets[0] = dict(name=targets[0], caslib=params['caslib'])
+
+        for key in ['casout', 'output']:
+            value = params.get(key)
+            if value is None:
+                continue
+            if isinstance(value, items_types):
+                targets.extend(value)
+            else:
+                targets.append(value)
+
+        for target in targets:
+            self.invalidate(target)
+
+    def update_flags(self, flags):
+        '''
+        Drop cached metadata based on response update flags
+
+        Parameters
+        ----------
+        flags : set of strings
+            The update flags of a response
+
+        '''
+        if self._data and CLEAR_FLAGS.intersection(flags):
+            self._data.clear()
+
+    def clear(self):
+        ''' Clear the cache and reset the counters '''
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        '''
+        Return cache statistics
+
+        Returns
+        -------
+        dict
+            Dictionary containing the hits, misses, and size of the cache
+
+        '''
+        return dict(hits=self.hits, misses=self.misses, size=len(self))
@@ -24,17 +24,17 @@ Class for creating CAS sessions
 from __future__ import print_function, division, absolute_import, unicode_literals
 
 import contextlib
-import copy
 import json
 import os
 import re
 import six
+import threading
 import weakref
 from . import rest
 from .. import clib
 from .. import config as cf
 from ..exceptions import SWATError, SWATCASActionError, SWATCASActionRetry
-from ..utils.config import subscribe, get_option
+from ..utils.config import subscribe, get_option_snapshot
 from ..clib import errorcheck
 from ..utils.compat import (a2u, a2n, int32, int64, float64, text_types,
                             binary_types, items_types, int_types)
@@ -42,17 +42,24 @@ from ..utils import getsoptions
 from ..utils.args import iteroptions
 from ..formatter import SASFormatter
 from .actions import CASAction, CASActionSet
+from .binder import ParamBinder
+from .cache import CASMetadataCache
+from .temptables import CASTempTables
 from .table import CASTable
 from .transformers import py2cas
+from .batch import CASBatch
 from .request import CASRequest
 from .response import CASResponse
-from .results import CASResults
+from .results import CASResults, _LazyResult
 from .utils.params import ParamManager, ActionParamManager
 
 # pylint: disable=W0212
 
 RETRY_ACTION_CODE = 0x280034
 
+# Current option values
+_options = get_option_snapshot()
+
 def _option_handler(key, value):
     ''' Handle option changes '''
     sessions = list(CAS.sessions.values())
@@ -308,12 +315,25 @@ class CAS(object):
         # Caches for action classes and reflection information
         self._action_classes = {}
         self._action_info = {}
+        self._param_binders = {}
         self._actionset_classes = {}
         self._actionset_info = {}
 
+        # Cache of table metadata
+        self.metadata_cache = CASMetadataCache()
+
+        # Temporary tables created by CASTable methods
+        self.temp_tables = CASTempTables(self)
+
         # Dictionary of result hook functions
         self._results_hooks = {}
 
+        # Lock held while an action is running
+        self._lock = threading.RLock()
+
+        # Thread streaming the results of an action (see stream)
+        self._stream_thread = None
+
         # Preload __dir__ information.  It will be extended later with action names
         self._dir = set([x for x in self.__dict__.keys() if not x.startswith('_')])
 
@@ -366,6 +386,37 @@ class CAS(object):
                 num = num + 1
         self._id_generator = _id_generator()
 
+    @contextlib.contextmanager
+    def _exclusive(self):
+        '''
+        Hold the connection lock for the duration of the context
+
+        A session can only run one action at a time, so a connection
+        can not be used by multiple threads concurrently.  Nested use
+        from the same thread (e.g., in results hooks) is allowed.
+
+        Raises
+        ------
+        SWATError
+            If the connection is in use by another thread
+
+        '''
+        if not self._lock.acquire(False):
+            raise SWATError('The CAS connection is in use by another thread.  '
+                            'Use a separate connection in each thread, or a '
+                            'ThreadSafeCAS object to share sessions between threads.')
+        stream_thread = self._stream_thread
+        if stream_thread is not None and stream_thread is not threading.current_thread():
+            self._lock.release()
+            raise SWATError('The CAS connection is streaming the results of an action '
+                            'in another thread.  Use a separate connection in each '
+                            'thread, or a ThreadSafeCAS object to share sessions '
+                            'between threads.')
+        try:
+            yield self
+        finally:
+            self._lock.release()
+
     def _gen_id(self):
         ''' Generate an ID unique to the session '''
         import numpy
@@ -423,6 +474,7 @@ class CAS(object):
     def __exit__(self, type, value, traceback):
         ''' Exit the context '''
         self.retrieve('session.endsession', _apptag='UI', _messagelevel='error')
+        self.temp_tables.clear()
         self.close()
 
     @contextlib.contextmanager
@@ -471,6 +523,32 @@ class CAS(object):
         self.retrieve('sessionprop.setsessopt', _messagelevel='error',
                       _apptag='UI', **state)
 
+    def temp_scope(self):
+        '''
+        Create a context that drops the temporary tables created within it
+
+        Temporary tables created by :class:`CASTable` methods (samples,
+        views, data step outputs, cached tables, etc.) are normally
+        dropped when the last :class:`CASTable` object that uses them
+        is garbage collected.  The tables created within a ``with``
+        block using this context are dropped when the block exits, in a
+        single batch, even if they are still referenced.
+
+        Examples
+        --------
+        >>> conn = swat.CAS()
+        >>> tbl = conn.CASTable('cars', caslib='public')
+        >>> with conn.temp_scope():
+        ...     print(tbl.sample(frac=0.1).summary())
+        ...     print(tbl.fillna(0).describe())
+
+        Returns
+        -------
+        context manager
+
+        '''
+        return self.temp_tables.scope()
+
     def get_action_names(self):
         '''
         Return the list of action classes
@@ -731,6 +809,7 @@ class CAS(object):
     def terminate(self):
         ''' End the session and close the CAS connection '''
         self.retrieve('session.endsession', _messagelevel='error', _apptag='UI')
+        self.temp_tables.clear()
         self.close()
 
     def _set_option(self, **kwargs):
@@ -879,166 +958,31 @@ class CAS(object):
                        self._sw_connection)
         return self
 
-    def _merge_param_args(self, parmlist, kwargs, action=None):
+    def _get_param_binder(self, name, signature):
         '''
-        Merge keyword arguments into a parmlist
+        Return the compiled parameter binder for an action
 
-        This method modifies the parmlist *in place*.
+        Binders are cached by action name.  A new binder is compiled if
+        the reflection information of the action has changed.
 
         Parameters
         ----------
-        parmlist : list
-            Parameter list.
-        kwargs : dict
-            Dictionary of keyword arguments.
-        action : string
+        name : string
             Name of the action.
+        signature : dict
+            Reflection information of the action.
 
-        '''
-        if action is None:
-            action = ''
-
-        if isinstance(kwargs, ParamManager):
-            kwargs = copy.deepcopy(kwargs.params)
-
-        # Short circuit if we can
-        if not isinstance(kwargs, dict):
-            return
-
-        # See if we have a caslib= parameter
-        caslib = False
-        for param in parmlist:
-            if param['name'] == 'caslib':
-                caslib = True
-                break
+        Returns
+        -------
+        :class:`ParamBinder`
 
-        # kwargs preserving case
-        casekeys = {k.lower(): k for k in kwargs.keys()}
-
-        # Add support for CASTable objects
-        inputs = None
-        fetch = {}
-        uses_inputs = False
-        uses_fetchvars = False
-        for param in parmlist:
-            ptype = param['parmType']
-            key = param['name']
-            key = casekeys.get(key, key)
-            key_lower = key.lower()
-
-            # Check for inputs= / fetchvars= parameters
-            if ptype == 'value_list':
-                if key_lower == 'inputs':
-                    uses_inputs = True
-                elif key_lower == 'fetchvars':
-                    uses_fetchvars = True
-
-            # Get table object if it exists
-            tbl = kwargs.get('__table__', None)
-
-            # Convert table objects to the proper form based on the argument type
-            if key in kwargs and isinstance(kwargs[key], CASTable):
-                if param.get('isTableDef'):
-                    inputs = kwargs[key].get_inputs_param()
-                    fetch = kwargs[key].get_fetch_params()
-                    kwargs[key] = kwargs[key].to_table_params()
-                elif param.get('isTableName'):
-                    inputs = kwargs[key].get_inputs_param()
-                    fetch = kwargs[key].get_fetch_params()
-                    # Fill in caslib= first
-                    if caslib and 'caslib' not in kwargs and \
-                            kwargs[key].has_param('caslib'):
-                        kwargs['caslib'] = kwargs[key].get_param('caslib')
-                    kwargs[key] = kwargs[key].to_table_name()
-                elif param.get('isOutTableDef'):
-                    kwargs[key] = kwargs[key].to_outtable_params()
-                elif param.get('isCasLib') and kwargs[key].has_param('caslib'):
-                    kwargs[key] = kwargs[key].get_param('caslib')
-
-            # If a string is given for a table object, convert it to a table object
-            elif key in kwargs and isinstance(kwargs[key], text_types) and \
-                    param.get('isTableDef'):
-                kwargs[key] = {'name': kwargs[key]}
-
-            elif tbl is not None and param.get('isTableDef') and \
-                    key_lower == 'table' and 'table' not in casekeys:
-                inputs = tbl.get_inputs_param()
-                fetch = tbl.get_fetch_params()
-                kwargs[key] = tbl.to_table_params()
-
-            elif tbl is not None and param.get('isTableName') and \
-                    key_lower == 'name' and 'name' not in casekeys:
-                inputs = tbl.get_inputs_param()
-                fetch = tbl.get_fetch_params()
-                if caslib and 'caslib' not in kwargs and tbl.has_param('caslib'):
-                    kwargs['caslib'] = tbl.get_param('caslib')
-                kwargs[key] = tbl.to_table_name()
-
-            # Workaround for columninfo / update which doesn't define table= as
-            # a table definition.
-            elif tbl is not None and key_lower == 'table' and \
-                    action.lower() in ['columninfo', 'table.columninfo',
-                                       'update', 'table.update'] and \
-                    'table' not in casekeys:
-                inputs = tbl.get_inputs_param()
-                kwargs[key] = tbl.to_table_params()
-                if not uses_inputs:
-                    if inputs and 'vars' not in kwargs:
-                        kwargs[key]['vars'] = inputs
-                    inputs = None
-
-        # Apply input variables
-        if uses_inputs and inputs and 'inputs' not in kwargs:
-            kwargs['inputs'] = inputs
-        elif uses_fetchvars and inputs and 'fetchvars' not in kwargs:
-            kwargs['fetchvars'] = inputs
-
-        # Apply fetch parameters
-        if fetch and action.lower() in ['fetch', 'table.fetch']:
-            for key, value in fetch.items():
-                if key in kwargs:
-                    continue
-                if key == 'sortby' and ('orderby' in kwargs or 'orderBy' in kwargs):
-                    continue
-                kwargs[key] = value
-
-        # Apply inputs= to specific actions that don't support it
-        if 'table' in kwargs and not uses_inputs and inputs \
-                and action.lower() in ['partition', 'table.partition',
-                                       'save', 'table.save']:
-            tbl = kwargs['table']
-            if not isinstance(tbl, dict):
-                tbl = dict(name=tbl)
-            tbl['vars'] = inputs
-
-        kwargs.pop('__table__', None)
-
-        # Workaround for tableinfo which aliases table= to name=, but
-        # the alias is hidden.
-        if action.lower() in ['tableinfo', 'table.tableinfo'] and 'table' in kwargs:
-            if isinstance(kwargs['table'], CASTable):
-                kwargs['table'] = kwargs['table'].to_table_params()
-            if isinstance(kwargs['table'], dict):
-                if caslib and 'caslib' not in kwargs and \
-                       kwargs['table'].get('caslib'):
-                    kwargs['caslib'] = kwargs['table']['caslib']
-                kwargs['table'] = kwargs['table']['name']
-
-        # Add current value fields in the signature
-        for param in parmlist:
-            if param['name'] in kwargs:
-                if 'parmList' in param:
-                    self._merge_param_args(param['parmList'], kwargs[param['name']],
-                                           action=action)
-                else:
-                    if isinstance(kwargs[param['name']], text_types):
-                        param['value'] = kwargs[param['name']].replace('"', '\\u0022')
-                    # TODO: This should only happen for binary inputs (i.e., never)
-                    elif isinstance(kwargs[param['name']], binary_types):
-#                       param['value'] = kwargs[param['name']].replace('"', '\\u0022')
-                        pass
-                    else:
-                        param['value'] = kwargs[param['name']]
+        '''
+        parmlist = signature.get('params', [])
+        binder = self._param_binders.get(name)
+        if binder is None or binder.parmlist is not parmlist:
+            binder = ParamBinder(parmlist)
+            self._param_binders[name] = binder
+        return binder
 
     def _get_action_params(self, name, kwargs):
         '''
@@ -1086,10 +1030,14 @@ class CAS(object):
         # Check for additional action parameters
         kwargs = self._get_action_params(_name_, kwargs)
 
+        # Drop cached metadata of tables that the action may modify
+        self.metadata_cache.invalidate_action(_name_, kwargs)
+
         if signature:
-            signature = copy.deepcopy(signature)
-            kwargs = copy.deepcopy(kwargs)
-            self._merge_param_args(signature.get('params', {}), kwargs, action=_name_)
+            binder = self._get_param_binder(_name_, signature)
+            kwargs, parmlist = binder.bind(kwargs, action=_name_)
+            if parmlist is not binder.parmlist:
+                signature = dict(signature, params=parmlist)
 
         self._invoke_without_signature(_name_, **kwargs)
 
@@ -1213,14 +1161,17 @@ class CAS(object):
             casout['name'] = name
         kwargs['casout'] = casout
 
-        if isinstance(self._sw_connection, rest.REST_CASConnection):
-            resp = self._sw_connection.upload(a2n(filename), kwargs)
-        else:
-            resp = errorcheck(self._sw_connection.upload(a2n(filename),
-                                                         py2cas(self._soptions,
-                                                                self._sw_error,
-                                                                **kwargs)),
-                              self._sw_connection)
+        self.metadata_cache.invalidate_action('table.upload', kwargs)
+
+        with self._exclusive():
+            if isinstance(self._sw_connection, rest.REST_CASConnection):
+                resp = self._sw_connection.upload(a2n(filename), kwargs)
+            else:
+                resp = errorcheck(self._sw_connection.upload(a2n(filename),
+                                                             py2cas(self._soptions,
+                                                                    self._sw_error,
+                                                                    **kwargs)),
+                                  self._sw_connection)
 
         # Remove temporary file as needed
         if delete:
@@ -1323,7 +1274,8 @@ class CAS(object):
         .
 
         '''
-        self._invoke_with_signature(a2n(_name_), **kwargs)
+        with self._exclusive():
+            self._invoke_with_signature(a2n(_name_), **kwargs)
         return self
 
     def retrieve(self, _name_, **kwargs):
@@ -1439,6 +1391,9 @@ class CAS(object):
         '''
         kwargs = dict(kwargs)
 
+        # Drop temporary tables that are no longer used
+        self.temp_tables.flush()
+
         # Decode from JSON as needed
         if '_json' in kwargs:
             newargs = json.loads(kwargs['_json'])
@@ -1466,28 +1421,59 @@ class CAS(object):
             resultfunc = kwargs['resultfunc']
             kwargs.pop('resultfunc')
 
-        try:
-            # Call the action and compile the results
-            signature = self._invoke_with_signature(a2n(_name_), **kwargs)
-            results = self._get_results(getnext(self, datamsghandler=datamsghandler),
-                                        responsefunc=responsefunc, resultfunc=resultfunc)
-        except SWATCASActionRetry:
-            signature = self._invoke_with_signature(a2n(_name_), **kwargs)
-            results = self._get_results(getnext(self, datamsghandler=datamsghandler),
-                                        responsefunc=responsefunc, resultfunc=resultfunc)
-
-        # Return raw data if a function was supplied
-        if responsefunc is not None or resultfunc is not None:
+        with self._exclusive():
+            try:
+                # Call the action and compile the results
+                signature = self._invoke_with_signature(a2n(_name_), **kwargs)
+                results = self._get_results(getnext(self, datamsghandler=datamsghandler),
+                                            responsefunc=responsefunc,
+                                            resultfunc=resultfunc)
+            except SWATCASActionRetry:
+                signature = self._invoke_with_signature(a2n(_name_), **kwargs)
+                results = self._get_results(getnext(self, datamsghandler=datamsghandler),
+                                            responsefunc=responsefunc,
+                                            resultfunc=resultfunc)
+
+            # Return raw data if a function was supplied
+            if responsefunc is not None or resultfunc is not None:
+                return results
+
+            results.signature = signature
+
+            # run post-processing hooks
+            if signature and signature.get('name') in self._results_hooks:
+                for func in self._results_hooks[signature['name']]:
+                    func(self, results)
+
             return results
 
-        results.signature = signature
+    def batch(self):
+        '''
+        Create a batch of actions to call together
 
-        # run post-processing hooks
-        if signature and signature.get('name') in self._results_hooks:
-            for func in self._results_hooks[signature['name']]:
-                func(self, results)
+        Actions added to the batch are queued until the batch is run.
+        When used as a context manager, the batch is run when the
+        ``with`` block exits.  The actions are called one after another,
+        so each action is still a separate request to the server.
 
-        return results
+        Examples
+        --------
+        >>> with s.batch() as batch:
+        ...     colinfo = batch.retrieve('table.columninfo', table='iris')
+        ...     numrows = batch.retrieve('simple.numrows', table='iris')
+        >>> print(batch.results[numrows]['numrows'])
+        150
+
+        See Also
+        --------
+        :meth:`retrieve` : Calls action and aggregates the results
+
+        Returns
+        -------
+        :class:`CASBatch` object
+
+        '''
+        return CASBatch(self)
 
     def _get_results(self, riter, responsefunc=None, resultfunc=None):
         '''
@@ -1543,44 +1529,31 @@ class CAS(object):
                     idx = 0
                     continue
 
-                # CASTable parameters
-                caslib = None
-                tablename = None
-                castable = None
-
-                for key, value in response:
-
-                    if resultfunc is not None:
+                if resultfunc is not None:
+                    for key, value in response:
                         resultdata = resultfunc(key, value, response,
                                                 conn, resultdata)
-                        continue
+                    continue
 
+                for key, value in self._iter_response(response,
+                                                      lazy=_options['cas.lazy_results']):
                     if key is None or isinstance(key, int_types):
                         results[idx] = value
                         idx += 1
+                    # Event results start with '$'
+                    elif key.startswith('$'):
+                        if type(value) is _LazyResult:
+                            value = value.get()
+                        events[key] = value
                     else:
-                        lowerkey = key.lower()
-                        if lowerkey == 'tablename':
-                            tablename = value
-                        elif lowerkey == 'caslib':
-                            caslib = value
-                        elif lowerkey == 'castable':
-                            castable = True
-                        # Event results start with '$'
-                        if key.startswith('$'):
-                            events[key] = value
-                        else:
-                            results[key] = value
-
-                # Create a CASTable instance if all of the pieces are there
-                if caslib and tablename and not castable:
-                    results['casTable'] = self.CASTable(tablename, caslib=caslib)
+                        results[key] = value
 
                 results.performance = response.performance
                 for key, value in six.iteritems(response.disposition.to_dict()):
                     setattr(results, key, value)
                 messages.extend(response.messages)
                 updateflags.update(response.updateflags)
+                self.metadata_cache.update_flags(response.updateflags)
 
         except SWATCASActionError as err:
             if responsefunc:
@@ -1600,6 +1573,184 @@ class CAS(object):
 
         return results
 
+    def _iter_response(self, response, lazy=False):
+        '''
+        Iterate over the results in a single response
+
+        In addition to the results sent by the server, a ``casTable``
+        result is generated for responses that contain a ``caslib``
+        and ``tableName`` key, but no ``casTable`` key.
+
+        Parameters
+        ----------
+        response : CASResponse object
+            The response to iterate over
+        lazy : boolean, optional
+            If True, tables are converted to Python when they are first
+            accessed in the :class:`CASResults` object
+
+        Yields
+        ------
+        (key, value) tuples
+
+        '''
+        # CASTable parameters
+        caslib = None
+        tablename = None
+        castable = None
+
+        for key, value in response._iter_results(lazy=lazy):
+            if key is not None and not isinstance(key, int_types):
+                lowerkey = key.lower()
+                if lowerkey == 'tablename':
+                    tablename = value
+                elif lowerkey == 'caslib':
+                    caslib = value
+                elif lowerkey == 'castable':
+                    castable = True
+            yield key, value
+
+        # Create a CASTable instance if all of the pieces are there
+        if caslib and tablename and not castable:
+            yield 'casTable', self.CASTable(tablename, caslib=caslib)
+
+    def stream(self, _name_, **kwargs):
+        '''
+        Call the action and yield the results as they arrive
+
+        Unlike :meth:`retrieve`, the results are not compiled into a
+        :class:`CASResults` object.  Each result is yielded as soon as
+        the response containing it is received from the server, so
+        actions that generate many large results (e.g., one table per
+        by group) can be processed incrementally without holding all
+        of the results in memory.
+
+        Parameters
+        ----------
+        _name_ : string
+           Name of the action
+        **kwargs : any, optional
+           Arbitrary keyword arguments
+
+        Notes
+        -----
+        Results with keys starting with '$' are events.  They are yielded
+        along with the other results rather than being collected in the
+        ``events`` attribute as they are in :meth:`retrieve`.
+
+        If the server restarts the action, the results are generated
+        again from the beginning.  Results that were yielded before the
+        restart should be discarded by the caller.
+
+        Results hooks registered with :meth:`add_results_hook` are not
+        run on streamed results.
+
+        The connection lock is only held while a response is received,
+        not while results are being yielded.  Until the generator is
+        exhausted or closed, other threads can not use the connection.
+        If the generator is closed (or garbage collected) before it is
+        exhausted, the remaining responses are read and discarded.
+
+        See Also
+        --------
+        :meth:`retrieve` : Calls action and aggregates the results
+
+        Examples
+        --------
+        >>> for key, value in s.stream('simple.summary', table='iris',
+        ...                            groupby=['species']):
+        ...     print(key)
+        ...     print(value)
+
+        Yields
+        ------
+        (key, value) tuples
+
+        '''
+        kwargs = dict(kwargs)
+
+        # Decode from JSON as needed
+        if '_json' in kwargs:
+            newargs = json.loads(kwargs['_json'])
+            newargs.update(kwargs)
+            del newargs['_json']
+            kwargs = newargs
+
+        datamsghandler = None
+        if 'datamsghandler' in kwargs:
+            datamsghandler = kwargs.pop('datamsghandler')
+            if self._protocol.startswith('http'):
+                raise SWATError('Data message handlers are not supported '
+                                'in the REST interface.')
+
+        events = {}
+        retried = False
+
+        with self._exclusive():
+            self._invoke_with_signature(a2n(_name_), **kwargs)
+            self._stream_thread = threading.current_thread()
+
+        responses = None
+        try:
+            while True:
+                idx = 0
+                started = False
+                responses = getnext(self, datamsghandler=datamsghandler)
+                try:
+                    while True:
+                        with self._exclusive():
+                            response = next(responses, None)
+                            if response is None:
+                                break
+                            response = response[0]
+
+                            if response.disposition.status_code == RETRY_ACTION_CODE:
+                                raise SWATCASActionRetry(response.disposition.status)
+
+                            self.metadata_cache.update_flags(response.updateflags)
+
+                            # Action was restarted by the server
+                            if 'action-restart' in response.updateflags:
+                                idx = 0
+                                continue
+
+                            items = list(self._iter_response(response))
+
+                        for key, value in items:
+                            started = True
+                            if key is None or isinstance(key, int_types):
+                                key = idx
+                                idx += 1
+                            elif key.startswith('$'):
+                                events[key] = value
+                            yield key, value
+
+                except SWATCASActionRetry:
+                    if retried or started:
+                        raise
+                    retried = True
+                    with self._exclusive():
+                        self._invoke_with_signature(a2n(_name_), **kwargs)
+                    continue
+
+                except SWATCASActionError as err:
+                    err.events = events
+                    raise err
+
+                responses = None
+                break
+
+        finally:
+            # This may run in another thread if the generator is garbage collected
+            with self._lock:
+                self._stream_thread = None
+                if responses is not None:
+                    try:
+                        for item in responses:
+                            pass
+                    except SWATError:
+                        pass
+
     def __getattr__(self, name, atype=None):
         '''
         Convenience method for getting a CASActionSet/CASAction as an attribute
@@ -2835,6 +2986,12 @@ def getone(connection, datamsghandler=None):
     :class:`CASResponse` object
 
     '''
+    with connection._exclusive():
+        return _getone(connection, datamsghandler=datamsghandler)
+
+
+def _getone(connection, datamsghandler=None):
+    ''' Get a single response from a connection that is held by this thread '''
     output = None, connection
 
     # enable data messages as needed
@@ -2870,7 +3027,7 @@ def getone(connection, datamsghandler=None):
 
     # Raise exception as needed
     if isinstance(output[0], CASResponse):
-        exception_on_severity = get_option('cas.exception_on_severity')
+        exception_on_severity = _options['cas.exception_on_severity']
         if exception_on_severity is not None and \
                 output[0].disposition.severity >= exception_on_severity:
             raise SWATCASActionError(output[0].disposition.status, output[0], output[1])
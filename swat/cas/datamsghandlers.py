@@ -27,9 +27,12 @@ import base64
 import copy
 import re
 import datetime
+import itertools
 import numpy as np
 import pandas as pd
+import threading
 import warnings
+from six.moves import queue
 from .utils.datetime import (str2cas_timestamp, str2cas_datetime, str2cas_date,
                              str2cas_time, str2sas_timestamp, str2sas_datetime,
                              str2sas_date, str2sas_time, cas2python_timestamp,
@@ -40,9 +43,10 @@ from .utils.datetime import (str2cas_timestamp, str2cas_datetime, str2cas_date,
                              sas2cas_timestamp, sas2cas_datetime, sas2cas_date,
                              sas2cas_time, python2sas_timestamp, python2sas_datetime,
                              python2sas_date, python2sas_time, python2cas_timestamp,
-                             python2cas_datetime, python2cas_date, python2cas_time)
+                             python2cas_datetime, python2cas_date, python2cas_time,
+                             numpy2cas_datetime, numpy2cas_date, numpy2cas_time)
 from .. import clib
-from ..config import get_option
+from ..config import get_option_snapshot
 from ..clib import errorcheck
 from ..exceptions import SWATError
 from ..utils.compat import a2b, a2n, text_types, binary_types, int32, int64, float64
@@ -50,6 +54,9 @@ from ..dataframe import SASDataFrame
 from ..utils import getsoptions
 from .connection import getone, CASRequest, CASResponse
 
+# Current option values
+_options = get_option_snapshot()
+
 
 _SIZES = {
     'char': 1,
@@ -65,6 +72,89 @@ _SIZES = {
     'sas': 8,
 }
 
+# Vectorized converters for datetime64 columns
+_NUMPY2CAS = {
+    'DATETIME': numpy2cas_datetime,
+    'DATE': numpy2cas_date,
+    'TIME': numpy2cas_time,
+}
+
+
+class _BackgroundIterator(object):
+    '''
+    Iterator that reads items from another iterable on a background thread
+
+    Up to `maxsize` items are read ahead and kept in a bounded queue.
+    Exceptions raised while reading are raised by :meth:`next`.
+
+    Parameters
+    ----------
+    iterable : iterable
+        The iterable to read items from.
+    maxsize : int
+        The maximum number of items to read ahead.
+
+    Returns
+    -------
+    :class:`_BackgroundIterator` object
+
+    '''
+
+    _end = object()
+
+    def __init__(self, iterable, maxsize):
+        self._iterable = iterable
+        self._queue = queue.Queue(maxsize=max(int(maxsize), 1))
+        self._stop = threading.Event()
+        self._done = False
+        self._thread = threading.Thread(target=self._read)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _read(self):
+        ''' Put items from the iterable into the queue '''
+        try:
+            for item in self._iterable:
+                if not self._put((item, None)):
+                    return
+        except Exception as exc:
+            self._put((None, exc))
+            return
+        self._put((self._end, None))
+
+    def _put(self, item):
+        ''' Add an item to the queue unless the iterator has been closed '''
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._done:
+            raise StopIteration
+        item, exc = self._queue.get()
+        if exc is not None:
+            self._done = True
+            raise exc
+        if item is self._end:
+            self._done = True
+            raise StopIteration
+        return item
+
+    next = __next__
+
+    def close(self):
+        ''' Stop reading items and wait for the background thread '''
+        self._done = True
+        self._stop.set()
+        self._thread.join()
+
 
 class CASDataMsgHandler(object):
     '''
@@ -349,7 +439,7 @@ class CASDataMsgHandler(object):
                                    self._sw_databuffer)
             elif vrtype == 'NUMERIC' and vtype in ['INT32', 'DATE']:
                 if pd.isnull(value):
-                    value = get_option('cas.missing.%s' % vtype.lower())
+                    value = _options['cas.missing.%s' % vtype.lower()]
                     warnings.warn(("Missing value found in 32-bit integer-based column '%s'.\n" %
                                    v['name']) +
                                   ("Substituting cas.missing.%s option value (%s)." %
@@ -366,7 +456,7 @@ class CASDataMsgHandler(object):
                                self._sw_databuffer)
             elif vrtype == 'NUMERIC' and vtype in ['INT64', 'DATETIME', 'TIME']:
                 if pd.isnull(value):
-                    value = get_option('cas.missing.%s' % vtype.lower())
+                    value = _options['cas.missing.%s' % vtype.lower()]
                     warnings.warn(("Missing value found in 64-bit integer-based column '%s'.\n"
                                    % v['name']) +
                                   ("Substituting cas.missing.%s option value (%s)." %
@@ -471,6 +561,11 @@ class PandasDataFrame(CASDataMsgHandler):
        The number of rows to allocate in the buffer.  This can be
        smaller than the number of totals rows since they are uploaded
        in batches `nrecs` long.
+    prefetch : int, optional
+       If `data` is an iterator of DataFrames, the number of DataFrames
+       to read ahead on a background thread while the data is being sent
+       to the server.  If zero, the DataFrames are read on the calling
+       thread.
 
     See Also
     --------
@@ -484,7 +579,7 @@ class PandasDataFrame(CASDataMsgHandler):
     '''
 
     def __init__(self, data, nrecs=1000, dtype=None, labels=None,
-                 formats=None, transformers=None):
+                 formats=None, transformers=None, prefetch=0):
         if transformers is None:
             transformers = {}
 
@@ -567,7 +662,10 @@ class PandasDataFrame(CASDataMsgHandler):
 
         # Add support for chunked dataframes
         else:
-            self.reader = iter(data)
+            if prefetch > 0:
+                self.reader = _BackgroundIterator(data, prefetch)
+            else:
+                self.reader = iter(data)
             data = next(self.reader)
 
         if data.index.name is None:
@@ -577,9 +675,13 @@ class PandasDataFrame(CASDataMsgHandler):
 
         reclen = 0
         variables = []
-        for name, nptype in zip(data.columns, data.dtypes):
+        converters = {}
+        for i, (name, nptype) in enumerate(zip(data.columns, data.dtypes)):
             length, rtype, subtype = typemap(name, nptype)
-            if subtype == 'DATETIME' and name not in transformers:
+            if subtype in _NUMPY2CAS and name not in transformers and \
+                    isinstance(nptype, np.dtype) and nptype.kind == 'M':
+                converters[i] = subtype
+            elif subtype == 'DATETIME' and name not in transformers:
                 transformers[name] = lambda x: str2cas_timestamp(x)
             elif subtype == 'DATE' and name not in transformers:
                 transformers[name] = lambda x: str2cas_date(x)
@@ -624,9 +726,46 @@ class PandasDataFrame(CASDataMsgHandler):
 
         self.chunksize = len(self.data)
 
+        # Columns converted to CAS values a block of rows at a time
+        self._converters = converters
+        self._rows = []
+        self._rows_start = 0
+
         super(PandasDataFrame, self).__init__(
             variables, nrecs=nrecs, reclen=reclen, transformers=transformers)
 
+    def _get_rows(self, start, stop):
+        '''
+        Return a block of rows of values from the current batch
+
+        Datetime columns are converted to CAS values for the entire
+        block at once rather than by a transformer for each value.
+
+        Parameters
+        ----------
+        start : int
+            The index of the first row.
+        stop : int
+            The index after the last row.
+
+        Returns
+        -------
+        list-of-lists
+            Rows of data values
+
+        '''
+        data = self.data.iloc[start:stop]
+        columns = []
+        for i in range(data.shape[1]):
+            values = data.iloc[:, i]
+            subtype = self._converters.get(i)
+            if subtype is not None:
+                values = _NUMPY2CAS[subtype](
+                    pd.to_datetime(values).values,
+                    missing=_options['cas.missing.%s' % subtype.lower()])
+            columns.append(values.tolist())
+        return [list(x) for x in zip(*columns)]
+
     def getrow(self, row):
         '''
         Get a row of values from the data source
@@ -653,6 +792,7 @@ class PandasDataFrame(CASDataMsgHandler):
         # See if we need another batch
         if row > 0 and batchrow == 0:
             self.data = None
+            self._rows = []
             try:
                 self.data = next(self.reader)
                 if self.data.index.name is None:
@@ -665,10 +805,33 @@ class PandasDataFrame(CASDataMsgHandler):
 
         # Return a row of data
         if batchrow < len(self.data):
-            return self.data.iloc[batchrow].tolist()
+            index = batchrow - self._rows_start
+            if index < 0 or index >= len(self._rows):
+                self._rows_start = batchrow
+                self._rows = self._get_rows(batchrow, batchrow + self.nrecs)
+                index = 0
+            return self._rows[index]
 
         return
 
+    def finish(self, connection):
+        '''
+        Finish the data sending operation
+
+        Parameters
+        ----------
+        connection : :class:`CAS` object
+            The connection that has been receiving the data.
+
+        '''
+        self.close()
+        super(PandasDataFrame, self).finish(connection)
+
+    def close(self):
+        ''' Stop reading DataFrames on the background thread '''
+        if isinstance(self.reader, _BackgroundIterator):
+            self.reader.close()
+
 
 class SAS7BDAT(PandasDataFrame):
     '''
@@ -701,6 +864,32 @@ class SAS7BDAT(PandasDataFrame):
             transformers=transformers)
 
 
+def _peek_chunks(data):
+    '''
+    Check that an iterator of DataFrames has at least one chunk
+
+    Parameters
+    ----------
+    data : DataFrame or iterator of DataFrames
+        The data returned by a pandas reader
+
+    Returns
+    -------
+    DataFrame or iterator of DataFrames
+        `data` with the first chunk read ahead, or None if the iterator
+        contains no chunks
+
+    '''
+    if isinstance(data, pd.DataFrame):
+        return data
+    data = iter(data)
+    try:
+        first = next(data)
+    except StopIteration:
+        return None
+    return itertools.chain([first], data)
+
+
 class CSV(PandasDataFrame):
     '''
     Create a CSV data messsage handler
@@ -727,13 +916,11 @@ class CSV(PandasDataFrame):
 
     def __init__(self, path, nrecs=1000, transformers=None, **kwargs):
         kwargs.setdefault('chunksize', nrecs)
-        try:
-            super(CSV, self).__init__(pd.io.parsers.read_csv(path, **kwargs),
-                                      nrecs=nrecs, transformers=transformers)
-        except StopIteration:
+        data = _peek_chunks(pd.io.parsers.read_csv(path, **kwargs))
+        if data is None:
             del kwargs['chunksize']
-            super(CSV, self).__init__(pd.io.parsers.read_csv(path, **kwargs),
-                                      nrecs=nrecs, transformers=transformers)
+            data = pd.io.parsers.read_csv(path, **kwargs)
+        super(CSV, self).__init__(data, nrecs=nrecs, transformers=transformers)
 
 
 class Text(PandasDataFrame):
@@ -762,13 +949,11 @@ class Text(PandasDataFrame):
 
     def __init__(self, path, nrecs=1000, transformers=None, **kwargs):
         kwargs.setdefault('chunksize', nrecs)
-        try:
-            super(Text, self).__init__(pd.io.parsers.read_table(path, **kwargs),
-                                       nrecs=nrecs, transformers=transformers)
-        except StopIteration:
+        data = _peek_chunks(pd.io.parsers.read_table(path, **kwargs))
+        if data is None:
             del kwargs['chunksize']
-            super(Text, self).__init__(pd.io.parsers.read_table(path, **kwargs),
-                                       nrecs=nrecs, transformers=transformers)
+            data = pd.io.parsers.read_table(path, **kwargs)
+        super(Text, self).__init__(data, nrecs=nrecs, transformers=transformers)
 
 
 class FWF(PandasDataFrame):
@@ -797,13 +982,11 @@ class FWF(PandasDataFrame):
 
     def __init__(self, path, nrecs=1000, transformers=None, **kwargs):
         kwargs.setdefault('chunksize', nrecs)
-        try:
-            super(FWF, self).__init__(pd.io.parsers.read_fwf(path, **kwargs),
-                                      nrecs=nrecs, transformers=transformers)
-        except StopIteration:
+        data = _peek_chunks(pd.io.parsers.read_fwf(path, **kwargs))
+        if data is None:
             del kwargs['chunksize']
-            super(FWF, self).__init__(pd.io.parsers.read_fwf(path, **kwargs),
-                                      nrecs=nrecs, transformers=transformers)
+            data = pd.io.parsers.read_fwf(path, **kwargs)
+        super(FWF, self).__init__(data, nrecs=nrecs, transformers=transformers)
 
 
 class JSON(PandasDataFrame):
@@ -878,9 +1061,19 @@ class SQLTable(PandasDataFrame):
         sqlalchemy engine.
     nrecs : int, optional
         Number of records to send at a time.
+    prefetch : int, optional
+        Number of chunks to read ahead on a background thread.
     **kwargs : keyword arguments, optional
         Arguments sent to :class:`pandas.io.read_sql_table`.
 
+    Notes
+    -----
+    The table is read in chunks of `nrecs` rows unless a different
+    `chunksize` is specified.  Some database drivers buffer the entire
+    result on the client regardless; use a connection with
+    ``execution_options(stream_results=True)`` to use a server-side
+    cursor with those drivers.
+
     Returns
     -------
     :class:`SQLTable` data message handler object
@@ -888,10 +1081,15 @@ class SQLTable(PandasDataFrame):
 
     '''
 
-    def __init__(self, table, engine, nrecs=1000, transformers=None, **kwargs):
-        super(SQLTable, self).__init__(
-            pd.io.sql.read_sql_table(table, engine, **kwargs),
-            nrecs=nrecs, transformers=transformers)
+    def __init__(self, table, engine, nrecs=1000, transformers=None, prefetch=0,
+                 **kwargs):
+        kwargs.setdefault('chunksize', nrecs)
+        data = _peek_chunks(pd.io.sql.read_sql_table(table, engine, **kwargs))
+        if data is None:
+            del kwargs['chunksize']
+            data = pd.io.sql.read_sql_table(table, engine, **kwargs)
+        super(SQLTable, self).__init__(data, nrecs=nrecs, transformers=transformers,
+                                       prefetch=prefetch)
 
     @classmethod
     def create_engine(cls, *args, **kwargs):
@@ -930,9 +1128,19 @@ class SQLQuery(PandasDataFrame):
         sqlalchemy engine.
     nrecs : int or long, optional
         Number of records to send at a time.
+    prefetch : int, optional
+        Number of chunks to read ahead on a background thread.
     **kwargs : any, optional
         Arguments sent to :func:`pandas.io.sql.read_sql_query`.
 
+    Notes
+    -----
+    The query results are read in chunks of `nrecs` rows unless a
+    different `chunksize` is specified.  Some database drivers buffer
+    the entire result on the client regardless; use a connection with
+    ``execution_options(stream_results=True)`` to use a server-side
+    cursor with those drivers.
+
     See Also
     --------
     :func:`pandas.io.sql.read_sql_query`
@@ -944,10 +1152,15 @@ class SQLQuery(PandasDataFrame):
 
     '''
 
-    def __init__(self, query, engine, nrecs=1000, transformers=None, **kwargs):
-        super(SQLQuery, self).__init__(
-            pd.io.sql.read_sql_query(query, engine, **kwargs),
-            nrecs=nrecs, transformers=transformers)
+    def __init__(self, query, engine, nrecs=1000, transformers=None, prefetch=0,
+                 **kwargs):
+        kwargs.setdefault('chunksize', nrecs)
+        data = _peek_chunks(pd.io.sql.read_sql_query(query, engine, **kwargs))
+        if data is None:
+            del kwargs['chunksize']
+            data = pd.io.sql.read_sql_query(query, engine, **kwargs)
+        super(SQLQuery, self).__init__(data, nrecs=nrecs, transformers=transformers,
+                                       prefetch=prefetch)
 
     @classmethod
     def create_engine(cls, *args, **kwargs):
@@ -1055,6 +1268,17 @@ class DBAPI(CASDataMsgHandler):
         The cursor where the results should be fetched from.
     nrecs : int, optional
         The number of records to fetch and upload at a time.
+    prefetch : int, optional
+        The number of blocks of `nrecs` records to read ahead on a
+        background thread while the data is being sent to the server.
+        If zero, the records are read on the calling thread.
+
+    Notes
+    -----
+    When `prefetch` is greater than zero, the cursor is read from
+    a different thread than the one it was created in.  Some database
+    modules require an option for this (e.g., ``check_same_thread=False``
+    for :mod:`sqlite3`).
 
     See Also
     --------
@@ -1066,9 +1290,15 @@ class DBAPI(CASDataMsgHandler):
 
     '''
 
-    def __init__(self, module, cursor, nrecs=1000, transformers=None):
+    def __init__(self, module, cursor, nrecs=1000, transformers=None, prefetch=0):
         self.cursor = cursor
         self.cursor.arraysize = nrecs
+        self.prefetch = int(prefetch)
+
+        self._rows = []
+        self._rows_start = 0
+        self._done = False
+        self._reader = None
 
         # array of functions to transform data types that don't match SAS types
         if transformers is None:
@@ -1142,6 +1372,45 @@ class DBAPI(CASDataMsgHandler):
             return desc
         return self.cursor.description
 
+    def _fetchmany(self):
+        ''' Return the next block of rows from the cursor '''
+        return self.cursor.fetchmany(self.nrecs)
+
+    def _iter_blocks(self):
+        ''' Yield blocks of rows from the cursor until one is empty '''
+        while True:
+            rows = self._fetchmany()
+            if not rows:
+                return
+            yield rows
+
+    def _fetch(self):
+        '''
+        Return the next block of rows from the data source
+
+        Returns
+        -------
+        list of rows
+            The next block of rows, or an empty list if there are no more
+
+        '''
+        if self.prefetch <= 0:
+            rows = self._fetchmany()
+        else:
+            if self._reader is None:
+                self._reader = _BackgroundIterator(self._iter_blocks(),
+                                                   self.prefetch)
+            rows = next(self._reader, [])
+
+        rows = list(rows)
+
+        if hasattr(self, '_firstrow'):
+            if self._firstrow is not None:
+                rows.insert(0, self._firstrow)
+            del self._firstrow
+
+        return rows
+
     def getrow(self, row):
         '''
         Return a row of values from the data source
@@ -1157,8 +1426,33 @@ class DBAPI(CASDataMsgHandler):
             One row of data values
 
         '''
-        if hasattr(self, '_firstrow'):
-            row = self._firstrow
-            del self._firstrow
-            return row
-        return self.cursor.fetchone()
+        index = row - self._rows_start
+        if index >= len(self._rows):
+            if self._done:
+                return
+            self._rows_start += len(self._rows)
+            self._rows = self._fetch()
+            if not self._rows:
+                self._done = True
+                return
+            index = row - self._rows_start
+        return self._rows[index]
+
+    def finish(self, connection):
+        '''
+        Finish the data sending operation
+
+        Parameters
+        ----------
+        connection : :class:`CAS` object
+            The connection that has been receiving the data.
+
+        '''
+        self.close()
+        super(DBAPI, self).finish(connection)
+
+    def close(self):
+        ''' Stop reading records on the background thread '''
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
@@ -28,6 +28,7 @@ import weakref
 from ..utils.compat import a2u, binary_types
 from ..utils import cachedproperty
 from ..clib import errorcheck
+from .results import _LazyResult
 from .transformers import cas2py
 
 
@@ -323,6 +324,24 @@ class CASResponse(object):
 
     def __iter__(self):
         ''' Iterate over all results in the response '''
+        return self._iter_results()
+
+    def _iter_results(self, lazy=False):
+        '''
+        Iterate over all results in the response
+
+        Parameters
+        ----------
+        lazy : boolean, optional
+            If True, tables are not converted to Python until they are
+            first accessed.  They are returned as :class:`_LazyResult`
+            objects, which are converted by :class:`CASResults`.
+
+        Yields
+        ------
+        (key, value) tuples
+
+        '''
         _sw_result = errorcheck(self._sw_response.getNextResult(), self._sw_response)
         while _sw_result:
             key = errorcheck(_sw_result.getKey(), _sw_result)
@@ -330,7 +349,12 @@ class CASResponse(object):
                 key = 0
             elif isinstance(key, binary_types):
                 key = a2u(key, 'utf-8')
-            yield key, cas2py(_sw_result, self.soptions, connection=self._connection)
+            if lazy and errorcheck(_sw_result.getType(), _sw_result) == 'table':
+                yield key, _LazyResult(_sw_result, self.soptions,
+                                       connection=self._connection,
+                                       _sw_response=self._sw_response)
+            else:
+                yield key, cas2py(_sw_result, self.soptions, connection=self._connection)
             _sw_result = errorcheck(self._sw_response.getNextResult(), self._sw_response)
 
     def __str__(self):
@@ -29,6 +29,8 @@ import os
 import requests
 import six
 import socket
+import time
+import zlib
 from six.moves import urllib
 from .message import REST_CASMessage
 from .response import REST_CASResponse
@@ -38,12 +40,71 @@ from ...exceptions import SWATError
 from ...utils.args import parsesoptions
 from ...utils.keyword import keywordify
 from ...utils.compat import (a2u, int_types, int32_types, int64_types,
-                             float64_types, items_types, int32, int64, float64)
+                             float64_types, items_types, text_types,
+                             int32, int64, float64)
 from ...utils.authinfo import query_authinfo
 
 # pylint: disable=C0330
 
 
+# Actions that only read data and can safely be resubmitted
+READONLY_ACTIONS = set([
+    'about', 'caslibinfo', 'columninfo', 'fetch', 'fileinfo', 'help',
+    'listnodes', 'numrows', 'queryactionset', 'queryname', 'reflect',
+    'serverstatus', 'sessionid', 'tableexists', 'tableinfo', 'userinfo',
+    'distinct', 'freq', 'summary', 'topk', 'correlation', 'crosstab',
+    'percentile',
+])
+
+# HTTP status codes of transient errors
+RETRY_STATUS_CODES = set([502, 503, 504])
+
+
+def _is_readonly(action_name, params):
+    '''
+    Is the action call safe to resubmit?
+
+    Parameters
+    ----------
+    action_name : string
+        The name of the action
+    params : dict
+        The action parameters
+
+    Returns
+    -------
+    boolean
+
+    '''
+    if action_name.lower().split('.')[-1] not in READONLY_ACTIONS:
+        return False
+    return not [x for x in params.keys() if x.lower() in ['casout', 'output']]
+
+
+def _compress(data):
+    '''
+    Compress a request body as specified by the cas.rest.compression option
+
+    Parameters
+    ----------
+    data : bytes
+        The request body
+
+    Returns
+    -------
+    (bytes, string or None) tuple
+        The (possibly compressed) request body and the content encoding
+
+    '''
+    encoding = options.cas.rest.compression
+    if encoding == 'none' or len(data) < options.cas.rest.compression_threshold:
+        return data, None
+    if encoding == 'gzip':
+        comp = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return comp.compress(data) + comp.flush(), encoding
+    return zlib.compress(data), encoding
+
+
 def _print_params(params, prefix=''):
     ''' Print parameters for tracing actions '''
     for key, value in sorted(six.iteritems(params)):
@@ -70,6 +131,10 @@ def _print_params_list(plist, prefix=''):
             print('%s = []' % prefix)
 
 
+# Types that are serialized to JSON as-is
+_JSON_TYPES = set(text_types + six.integer_types + (bool, float, type(None)))
+
+
 def _normalize_params(params):
     '''
     Normalize action parameters
@@ -91,45 +156,39 @@ def _normalize_params(params):
     '''
     out = {}
     for key, value in params.items():
-        key = keywordify(key)
-        if value is True:
-            pass
-        elif value is False:
-            pass
-        elif isinstance(value, dict):
-            numkeys = [x for x in value.keys() if isinstance(x, int_types)]
-            if not numkeys:
-                value = _normalize_params(value)
-            else:
-                value = _normalize_list(value.values())
-        elif isinstance(value, items_types):
-            value = _normalize_list(value)
-        elif isinstance(value, CASTable):
-            value = _normalize_params(value.to_params())
-        elif isinstance(value, int64_types):
-            value = int64(value)
-        elif isinstance(value, int32_types):
-            value = int32(value)
-        elif isinstance(value, int32_types):
-            value = int32(value)
-        elif isinstance(value, float64_types):
-            value = float64(value)
-        out[key] = value
+        if type(value) not in _JSON_TYPES:
+            value = _normalize_value(value)
+        out[keywordify(key)] = value
     return out
 
 
+def _normalize_value(value):
+    ''' Normalize a parameter value using standard python types '''
+    if isinstance(value, dict):
+        numkeys = [x for x in value.keys() if isinstance(x, int_types)]
+        if not numkeys:
+            return _normalize_params(value)
+        return _normalize_list(value.values())
+    if isinstance(value, items_types):
+        return _normalize_list(value)
+    if isinstance(value, CASTable):
+        return _normalize_params(value.to_params())
+    if isinstance(value, int64_types):
+        return int64(value)
+    if isinstance(value, int32_types):
+        return int32(value)
+    if isinstance(value, float64_types):
+        return float64(value)
+    return value
+
+
 def _normalize_list(items):
     ''' Normalize objects using standard python types '''
-    newitems = []
-    for item in items:
-        if isinstance(item, dict):
-            item = _normalize_params(item)
-        elif isinstance(item, items_types):
-            item = _normalize_list(item)
-        elif isinstance(item, CASTable):
-            item = _normalize_params(item.to_params())
-        newitems.append(item)
-    return newitems
+    # Lists of strings and numbers (e.g., inputs=) don't need any changes
+    if _JSON_TYPES.issuperset(map(type, items)):
+        return list(items)
+    return [item if type(item) in _JSON_TYPES else _normalize_value(item)
+            for item in items]
 
 
 class REST_CASConnection(object):
@@ -209,20 +268,19 @@ class REST_CASConnection(object):
         self._req_sess.headers.update({
             'Content-Type': 'application/json',
             'Content-Length': '0',
+            'Accept-Encoding': 'gzip, deflate',
             'Authorization': self._auth,
         })
 
         try:
             if session:
-                res = self._req_sess.get(urllib.parse.urljoin(self._baseurl,
-                                         'cas/sessions/%s' % session), data=b'')
+                res = self._request('get', 'cas/sessions/%s' % session)
                 out = json.loads(a2u(res.text, 'utf-8'))
                 if res.status_code != 200 and 'error' in out:
                     raise SWATError(out['error'])
                 self._session = out['uuid']
             else:
-                res = self._req_sess.put(urllib.parse.urljoin(self._baseurl,
-                                         'cas/sessions'), data=b'')
+                res = self._request('put', 'cas/sessions', readonly=False)
                 out = json.loads(a2u(res.text, 'utf-8'))
                 if res.status_code != 200 and 'error' in out:
                     raise SWATError(out['error'])
@@ -238,6 +296,58 @@ class REST_CASConnection(object):
         except Exception as exc:
             raise SWATError(str(exc))
 
+    def _request(self, method, path, data=b'', headers=None, readonly=True):
+        '''
+        Send a request to the server, retrying on transient errors
+
+        Read-only requests are retried on connection errors, timeouts,
+        and gateway errors.  Other requests are only retried when the
+        server could not have received them (i.e., connection timeouts
+        and 503 responses).  The delay between retries starts at
+        cas.rest.retry_backoff seconds and doubles after each retry.
+
+        Parameters
+        ----------
+        method : string
+            The HTTP method
+        path : string
+            The URL path relative to the base URL of the server
+        data : bytes, optional
+            The request body
+        headers : dict, optional
+            Additional request headers
+        readonly : boolean, optional
+            Is the request safe to resubmit?
+
+        Returns
+        -------
+        requests.Response object
+
+        '''
+        url = urllib.parse.urljoin(self._baseurl, path)
+        max_retries = options.cas.rest.max_retries
+        backoff = options.cas.rest.retry_backoff
+
+        if readonly:
+            retry_errors = (requests.exceptions.ConnectionError,
+                            requests.exceptions.Timeout)
+            retry_codes = RETRY_STATUS_CODES
+        else:
+            retry_errors = (requests.exceptions.ConnectTimeout,)
+            retry_codes = set([503])
+
+        attempt = 0
+        while True:
+            try:
+                res = self._req_sess.request(method, url, data=data, headers=headers)
+                if res.status_code not in retry_codes or attempt >= max_retries:
+                    return res
+            except retry_errors:
+                if attempt >= max_retries:
+                    raise
+            time.sleep(backoff * (2 ** attempt))
+            attempt += 1
+
     def invoke(self, action_name, kwargs):
         '''
         Invoke an action
@@ -255,6 +365,7 @@ class REST_CASConnection(object):
 
         '''
         is_ui = kwargs.get('_apptag', '') == 'UI'
+        readonly = _is_readonly(action_name, kwargs)
         kwargs = json.dumps(_normalize_params(kwargs))
 
         if options.cas.trace_actions and \
@@ -263,17 +374,18 @@ class REST_CASConnection(object):
             _print_params(json.loads(kwargs), prefix='    ')
             print('')
 
-        post_data = a2u(kwargs).encode('utf-8')
-        self._req_sess.headers.update({
+        post_data, encoding = _compress(a2u(kwargs).encode('utf-8'))
+        headers = {
             'Content-Type': 'application/json',
             'Content-Length': str(len(post_data)),
-        })
+        }
+        if encoding:
+            headers['Content-Encoding'] = encoding
 
         try:
-            res = self._req_sess.post(urllib.parse.urljoin(self._baseurl,
-                                                           'cas/sessions/%s/actions/%s' %
-                                                           (self._session, action_name)),
-                                      data=post_data)
+            res = self._request('post', 'cas/sessions/%s/actions/%s' %
+                                        (self._session, action_name),
+                                data=post_data, headers=headers, readonly=readonly)
             res = res.text
         except Exception as exc:
             raise SWATError(str(exc))
@@ -352,34 +464,28 @@ class REST_CASConnection(object):
     def close(self):
         ''' Close the connection '''
         if self._session and self._req_sess is not None:
-            self._req_sess.headers.update({
-                'Content-Type': 'application/json',
-                'Content-Length': '0',
-            })
-            res = self._req_sess.delete(urllib.parse.urljoin(self._baseurl,
-                                        'cas/sessions/%s' % self._session), data=b'')
+            res = self._request('delete', 'cas/sessions/%s' % self._session)
             self._session = None
             return res.status_code
 
     def upload(self, file_name, params):
         ''' Upload a data file '''
         with open(file_name, 'rb') as datafile:
-            data = datafile.read()
-        self._req_sess.headers.update({
+            data, encoding = _compress(datafile.read())
+        headers = {
             'Content-Type': 'application/octet-stream',
             'Content-Length': str(len(data)),
             'JSON-Parameters': json.dumps(_normalize_params(params))
-        })
+        }
+        if encoding:
+            headers['Content-Encoding'] = encoding
         try:
-            res = self._req_sess.put(
-                      urllib.parse.urljoin(self._baseurl,
-                                           'cas/sessions/%s/actions/table.upload' %
-                                           self._session), data=data)
+            res = self._request('put', 'cas/sessions/%s/actions/table.upload' %
+                                       self._session,
+                                data=data, headers=headers, readonly=False)
             res = res.text
         except Exception as exc:
             raise SWATError(str(exc))
-        finally:
-            del self._req_sess.headers['JSON-Parameters']
 
         try:
             out = json.loads(a2u(res, 'utf-8'), strict=False)
@@ -29,10 +29,14 @@ import pandas.core.common as pdcom
 import pprint
 import re
 import six
+from ..config import get_option_snapshot
 from ..dataframe import SASDataFrame, concat
-from ..notebook.zeppelin import show as z_show
 from ..utils.compat import OrderedDict
 from ..utils.xdict import xadict
+from .transformers import cas2py
+
+# Current option values
+_options = get_option_snapshot()
 
 
 @six.python_2_unicode_compatible
@@ -41,6 +45,7 @@ class RendererMixin(object):
 
     def _z_show_(self, **kwargs):
         ''' Display Zeppelin notebook rendering '''
+        from ..notebook.zeppelin import show as z_show
         i = 0
         for key, value in six.iteritems(self):
             if i == 0:
@@ -235,6 +240,48 @@ class RendererMixin(object):
         return ''.join(output)
 
 
+class _LazyResult(object):
+    '''
+    Result value that is converted to Python when it is first accessed
+
+    The values of the options that affect the conversion (the
+    ``cas.dataset.*`` options and ``encoding_errors``) at the time the
+    result is received are saved and passed to the conversion, so the
+    value is converted the same way it would have been when it was
+    received.  The global option values are not changed.
+
+    Parameters
+    ----------
+    _sw_value : SWIG CASValue object
+        The raw result value
+    soptions : string
+        soptions of the connection object
+    connection : CAS object
+        The connection to associate generated CASTables with
+    _sw_response : SWIG CASResponse object, optional
+        The raw response that the value belongs to.  A reference is held
+        to keep the response data alive until the value is converted.
+
+    Returns
+    -------
+    :class:`_LazyResult` object
+
+    '''
+
+    def __init__(self, _sw_value, soptions, connection=None, _sw_response=None):
+        self._sw_value = _sw_value
+        self._soptions = soptions
+        self._connection = connection
+        self._sw_response = _sw_response
+        self._options = dict((key, value) for key, value in list(_options.items())
+                             if key.startswith('cas.dataset.') or key == 'encoding_errors')
+
+    def get(self):
+        ''' Convert the value to Python '''
+        return cas2py(self._sw_value, self._soptions, connection=self._connection,
+                      options=self._options)
+
+
 class RenderableXADict(RendererMixin, xadict):
     ''' Renderable xadict object '''
     pass
@@ -352,6 +399,64 @@ class CASResults(RendererMixin, OrderedDict):
             return self[name]
         return super(CASResults, self).__getattribute__(name)
 
+    # Values that are converted to Python on first access are stored as
+    # _LazyResult objects.  All methods that return values convert them.
+
+    def __getitem__(self, key):
+        value = super(CASResults, self).__getitem__(key)
+        if type(value) is _LazyResult:
+            value = value.get()
+            super(CASResults, self).__setitem__(key, value)
+        return value
+
+    def _materialize(self):
+        ''' Convert all lazy values to Python '''
+        for key, value in list(super(CASResults, self).items()):
+            if type(value) is _LazyResult:
+                super(CASResults, self).__setitem__(key, value.get())
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def pop(self, key, *default):
+        value = super(CASResults, self).pop(key, *default)
+        if type(value) is _LazyResult:
+            value = value.get()
+        return value
+
+    def popitem(self, *args, **kwargs):
+        key, value = super(CASResults, self).popitem(*args, **kwargs)
+        if type(value) is _LazyResult:
+            value = value.get()
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
+
+    def items(self):
+        self._materialize()
+        return super(CASResults, self).items()
+
+    def values(self):
+        self._materialize()
+        return super(CASResults, self).values()
+
+    def __eq__(self, other):
+        self._materialize()
+        if isinstance(other, CASResults):
+            other._materialize()
+        return super(CASResults, self).__eq__(other)
+
+    def __ne__(self, other):
+        return not(self == other)
+
+    __hash__ = None
+
     def get_set(self, num):
         '''
         Return a :class:`CASResults` object of the By group set
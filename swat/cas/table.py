@@ -36,7 +36,8 @@ from ..config import get_option
 from ..exceptions import SWATError
 from ..utils import dict2kwargs, getattr_safe_property
 from ..utils.compat import (int_types, binary_types, text_types, items_types,
-                            patch_pandas_sort, char_types, num_types)
+                            patch_pandas_sort, char_types, num_types, a2u,
+                            OrderedDict)
 from ..utils.keyword import dekeywordify
 from .utils.params import ParamManager, ActionParamManager
 
@@ -65,12 +66,290 @@ OPERATOR_NAMES = {
 
 MAX_INT64_INDEX = 2**63 - 1 - 1  # Extra one is for 1 indexing
 
+# Number of bins used to compute kernel density estimates on the server
+KDE_BINS = 1024
+
+# Table parameters that are applied when a table is cached
+CACHE_PARAMS = set(['name', 'caslib', 'where', 'wheretable', 'computedvars',
+                    'computedvarsprogram', 'computedondemand', 'vars',
+                    'importoptions', 'datasourceoptions', 'singlepass'])
+
+# Aggregation functions supported by pivot_table:
+# name => (simple.summary subset, column of the summary output)
+PIVOT_STATS = {
+    'count': [('N', 'count')],
+    'css': [('CSS', 'css')],
+    'cv': [('CV', 'cv')],
+    'kurt': [('KURTOSIS', 'kurtosis')],
+    'kurtosis': [('KURTOSIS', 'kurtosis')],
+    'len': [('N', 'count'), ('NMISS', 'nmiss')],
+    'max': [('MAX', 'max')],
+    'mean': [('MEAN', 'mean')],
+    'min': [('MIN', 'min')],
+    'nmiss': [('NMISS', 'nmiss')],
+    'sem': [('STDERR', 'stderr')],
+    'skew': [('SKEWNESS', 'skewness')],
+    'std': [('STD', 'std')],
+    'sum': [('SUM', 'sum')],
+    'uss': [('USS', 'uss')],
+    'var': [('VAR', 'var')],
+}
+
+# Arguments of CASTablePlotter.box that can be used with the aggregated data
+BOX_PLOT_PARAMS = set([
+    'ax', 'figsize', 'title', 'whis', 'sample', 'sample_pct', 'sample_seed',
+    'stratify_by', 'positions', 'widths', 'vert', 'orientation', 'patch_artist',
+    'shownotches', 'showmeans', 'showcaps', 'showbox', 'showfliers', 'boxprops',
+    'whiskerprops', 'flierprops', 'medianprops', 'capprops', 'meanprops',
+    'meanline', 'manage_ticks', 'zorder', 'label',
+])
+
+JOIN_TYPES = {
+    'inner': 'INNER JOIN',
+    'left': 'LEFT OUTER JOIN',
+    'right': 'RIGHT OUTER JOIN',
+    'outer': 'FULL OUTER JOIN',
+}
+
 
 def _gen_table_name():
     ''' Generate a unique table name '''
     return '_PY_T_%s' % str(uuid.uuid4()).replace('-', '_').upper()
 
 
+# Data steps that haven't been run yet
+_pending_plans = weakref.WeakSet()
+
+
+class _DataStepPlan(object):
+    '''
+    Data step that creates a table, deferred until the table is used
+
+    Before the data step is run, any pending data steps that read the
+    table it creates are run, so they see the table as it was when
+    they were created.
+
+    Parameters
+    ----------
+    source : CASTable object
+        The table to read from.
+    name : string
+        The name of the table to create.
+    caslib : string
+        The CASLib of the table to create.
+    code : list-of-strings
+        The data step statements to apply to each row.
+    lookups : list-of-_LookupTables, optional
+        The lookup tables used by the data step code.
+    temp : CASTempTable object, optional
+        The registered temporary table that the data step creates.
+
+    Returns
+    -------
+    :class:`_DataStepPlan` object
+
+    '''
+
+    def __init__(self, source, name, caslib, code, lookups=None, temp=None):
+        self.source = source
+        self.name = name
+        self.caslib = caslib
+        self.code = []
+        self.lookups = []
+        self.temp = temp
+        self.done = False
+        self.extend(code, lookups)
+        _pending_plans.add(self)
+
+    def extend(self, code, lookups=None):
+        ''' Add data step statements and the lookup tables they use '''
+        self.code.extend(code)
+        for lookup in (lookups or []):
+            lookup.acquire()
+            self.lookups.append(lookup)
+
+    def get_code(self):
+        ''' Return the data step code '''
+        caslib = self.source.params.get('caslib') or self.caslib
+        dscode = []
+        dscode.append('data %s(caslib=%s);' % (_quote(self.name), _quote(self.caslib)))
+        dscode.append('    set %s(caslib=%s);' % (_quote(self.source.params['name']),
+                                                  _quote(caslib)))
+        dscode.extend(self.code)
+        dscode.append('run;')
+        return '\n'.join(dscode)
+
+    def reads(self, conn, name, caslib):
+        ''' Does the data step read the given table? '''
+        if self.done:
+            return False
+        try:
+            if self.source.get_connection() is not conn:
+                return False
+        except SWATError:
+            return False
+        if self.source.params['name'].lower() != name.lower():
+            return False
+        srclib = self.source.params.get('caslib')
+        return not srclib or not caslib or srclib.lower() == caslib.lower()
+
+    def run(self):
+        ''' Run the data step if it hasn't been run yet '''
+        if self.done:
+            return
+        conn = self.source.get_connection()
+        for plan in list(_pending_plans):
+            if plan is not self and plan.reads(conn, self.name, self.caslib):
+                plan.run()
+        out = conn.retrieve('datastep.runcode', code=self.get_code(),
+                            _apptag='UI', _messagelevel='error')
+        if out.status:
+            raise SWATError(out.status)
+        self.done = True
+        _pending_plans.discard(self)
+        if self.temp is not None:
+            conn.temp_tables.update(self.temp, out)
+        for lookup in self.lookups:
+            lookup.release()
+
+
+def _value_kind(value):
+    ''' Return 'char' or 'numeric' for a data step literal, or None '''
+    if isinstance(value, char_types):
+        return 'char'
+    if isinstance(value, num_types):
+        return 'numeric'
+
+
+def _lookup_kind(values):
+    ''' Return the kind shared by all of the given values, or None '''
+    kinds = set(_value_kind(x) for x in values)
+    if len(kinds) == 1:
+        return kinds.pop()
+
+
+class _LookupTable(object):
+    '''
+    Temporary table of keys (and values) used by a data step hash object
+
+    The table is uploaded when the object is created.  It is dropped
+    when the last data step that uses it has been run.
+
+    Parameters
+    ----------
+    conn : CAS object
+        The connection to upload the table to.
+    keys : list
+        The keys of the lookup table.  All keys must be either
+        strings or numerics.
+    values : list, optional
+        The data values corresponding to each key.  All values must
+        be the same kind as the keys.
+
+    Returns
+    -------
+    :class:`_LookupTable` object
+
+    '''
+
+    def __init__(self, conn, keys, values=None):
+        uid = conn._gen_id()
+        self.kind = _lookup_kind(keys)
+        self.hashname = '_h%s_' % uid
+        self.keyvar = '_k%s_' % uid
+        self.datavar = None
+        self.refs = 0
+
+        if self.kind == 'char':
+            convert = a2u
+        else:
+            convert = float
+
+        casvars = [self.keyvar]
+        data = [(self.keyvar, [convert(x) for x in keys])]
+        if values is not None:
+            self.datavar = '_v%s_' % uid
+            casvars.append(self.datavar)
+            data.append((self.datavar, [convert(x) for x in values]))
+
+        vartype = self.kind == 'char' and 'varchar' or 'double'
+        self.table = conn.upload_frame(
+            pd.DataFrame.from_dict(OrderedDict(data)),
+            importoptions=dict(filetype='csv',
+                               vars=[dict(name=x, type=vartype) for x in casvars]),
+            casout=dict(name=_gen_table_name(), replace=True))
+        self.temp = conn.temp_tables.add(self.table.params['name'],
+                                         self.table.params['caslib'])
+
+    def get_code(self):
+        ''' Return the statements that load the hash object '''
+        casvars = [self.keyvar]
+        if self.datavar:
+            casvars.append(self.datavar)
+        dataset = '"%s"(caslib="%s")' % (self.table.params['name'],
+                                         self.table.params['caslib'])
+        code = []
+        if self.kind == 'char':
+            code.append('length %s;' % ' '.join('%s varchar(*)' % x for x in casvars))
+        code.append('if _n_ = 1 then do;')
+        code.append('    declare hash %s(dataset: %s);' %
+                    (self.hashname, "'%s'" % dataset.replace("'", "''")))
+        code.append('    %s.defineKey(%s);' % (self.hashname, _quote(self.keyvar)))
+        if self.datavar:
+            code.append('    %s.defineData(%s);' % (self.hashname, _quote(self.datavar)))
+        code.append('    %s.defineDone();' % self.hashname)
+        code.append('    call missing(%s);' % ', '.join(casvars))
+        code.append('end;')
+        code.append('drop %s;' % ' '.join(casvars))
+        return code
+
+    def get_replace_code(self, colname):
+        ''' Return the statements that replace the values of a column '''
+        return ['%s = %s;' % (self.keyvar, _nlit(colname)),
+                'if ( %s.find() = 0 ) then %s = %s;' %
+                (self.hashname, _nlit(colname), self.datavar)]
+
+    def get_filter_code(self, colname):
+        ''' Return the statements that keep the rows where a column has a key value '''
+        return ['%s = %s;' % (self.keyvar, _nlit(colname)),
+                'if ( %s.check() = 0 );' % self.hashname]
+
+    def acquire(self):
+        ''' Add a data step that uses the table '''
+        self.refs += 1
+
+    def release(self):
+        ''' Remove a data step that uses the table, dropping it if it was the last '''
+        self.refs -= 1
+        if self.refs <= 0:
+            self.table.get_connection().temp_tables.drop([self.temp])
+
+
+class _TableCache(object):
+    '''
+    Temporary table containing the cached data of a CASTable
+
+    The table is dropped when the last CASTable object that uses it
+    is garbage collected.
+
+    Parameters
+    ----------
+    temp : CASTempTable object
+        The registered temporary table.
+    params : dict
+        The table parameters of the CASTable before it was cached.
+
+    Returns
+    -------
+    :class:`_TableCache` object
+
+    '''
+
+    def __init__(self, temp, params):
+        self.temp = temp
+        self.params = params
+
+
 def _nlit(name, quote=False):
     ''' Return `name` as an nlit '''
     if re.match(r'[A-Za-z_]\w*', name):
@@ -85,6 +364,117 @@ def _quote(name):
     return '"%s"' % _escape_string(name)
 
 
+def _fedsql_ident(name):
+    ''' Return `name` as a quoted FedSQL identifier '''
+    return '"%s"' % name.replace('"', '""')
+
+
+def _get_concat_lengths(colinfos):
+    '''
+    Return the data step lengths of the columns of concatenated tables
+
+    Character columns get the longest length of the column in any of the
+    tables (or ``varchar(*)`` if any of them is varchar).  The lengths
+    of all columns are returned so that a length statement doesn't
+    change the order of the columns.
+
+    Parameters
+    ----------
+    colinfos : list-of-DataFrames
+        The ``table.columninfo`` output of each table.
+
+    Raises
+    ------
+    TypeError
+        If a column is character in one table and numeric in another.
+
+    Returns
+    -------
+    list-of-strings
+
+    '''
+    columns = OrderedDict()
+    for colinfo in colinfos:
+        for name, dtype, length in zip(colinfo['Column'], colinfo['Type'],
+                                       colinfo['RawLength']):
+            columns.setdefault(name.lower(), (name, []))[1].append((dtype.lower(),
+                                                                   int(length)))
+
+    out = []
+    chars = set(['char', 'varchar'])
+    binaries = set(['binary', 'varbinary'])
+    for name, info in columns.values():
+        dtypes = set(x[0] for x in info)
+        maxlen = max(x[1] for x in info)
+        if dtypes.issubset(chars):
+            if 'varchar' in dtypes:
+                out.append('%s varchar(*)' % _nlit(name))
+            else:
+                out.append('%s $ %d' % (_nlit(name), maxlen))
+        elif dtypes.issubset(binaries):
+            out.append('%s varbinary(*)' % _nlit(name))
+        elif dtypes.intersection(chars) or dtypes.intersection(binaries):
+            raise TypeError('Column %s has incompatible types: %s' %
+                            (name, ', '.join(sorted(dtypes))))
+        else:
+            out.append('%s 8' % _nlit(name))
+    return out
+
+
+def _drop_tables(tables):
+    ''' Drop the given temporary tables in one batch '''
+    if tables:
+        tables[0].get_connection().temp_tables.drop([x._temp for x in tables])
+
+
+def _concat_fetched(results):
+    '''
+    Combine the tables of ``table.fetch`` results into one DataFrame
+
+    Parameters
+    ----------
+    results : list of CASResults objects
+        The results of one or more ``table.fetch`` actions
+
+    Raises
+    ------
+    SWATError
+        If one of the actions failed
+
+    Returns
+    -------
+    :class:`SASDataFrame`
+        The fetched rows.  If the ``_Index_`` column was fetched, it is
+        used as the (zero-based) index.
+
+    '''
+    from .. import dataframe as df
+
+    values = []
+    for res in results:
+        if res.severity > 1:
+            raise SWATError(res.status)
+        # Sort based on 'Fetch#' key.  This will be out of order in REST.
+        values.extend(x[1] for x in sorted(res.items(),
+                                           key=lambda x: int(x[0].replace('Fetch', '')
+                                                             or '0')))
+    out = df.concat(values)
+
+    if len(out.columns) and out.columns[0] == '_Index_':
+        out['_Index_'] = out['_Index_'] - 1
+        out = out.set_index('_Index_')
+        out.index.name = None
+
+    return out
+
+
+def _fedsql_table(params):
+    ''' Return the FedSQL table reference for the given name and caslib '''
+    if params.get('caslib'):
+        return '%s.%s' % (_fedsql_ident(params['caslib']), _fedsql_ident(params['name']))
+    return _fedsql_ident(params['name'])
+
+
 def _quote_if_string(name):
     ''' Return `name` as a quoted string if it is a string '''
     if isinstance(name, char_types):
@@ -97,6 +487,15 @@ def _escape_string(val):
     return val.replace('"', '""')
 
 
+def _where_equals(name, value):
+    ''' Return a where clause expression comparing column `name` to `value` '''
+    if isinstance(value, char_types):
+        return '%s = %s' % (_nlit(name), _quote(value))
+    if value is None or pd.isnull(value):
+        return 'missing(%s)' % _nlit(name)
+    return '%s = %s' % (_nlit(name), repr(float(value)))
+
+
 def _flatten(items):
     ''' Generator to yield all nested list items '''
     for item in items:
@@ -149,13 +548,16 @@ class CASTableLabelScalarAccessor(CASTableAccessor):
 
     def __getitem__(self, pos):
         tbl = self._table()
-        if isinstance(tbl, CASColumn):
-            if pos < 0 or pos >= tbl._numrows:
-                raise KeyError(pos)
-            return tbl.get_value(pos, 0)
-        if pos[0] < 0 or pos[0] >= tbl._numrows:
+        if not isinstance(tbl, CASColumn):
+            pos, col = pos
+        else:
+            col = 0
+        if pos < 0:
+            raise KeyError(pos)
+        try:
+            return tbl.get_value(pos, col)
+        except IndexError:
             raise KeyError(pos)
-        return tbl.get_value(*pos)
 
 
 def _get_table_selection(table, args):
@@ -177,32 +579,39 @@ def _get_table_selection(table, args):
 
     '''
     cols = None
+    rows = None
     computedvars = []
     computedvarsprogram = []
     outtype = 'table'
 
-    # Rows and columns specified
-    if isinstance(args, tuple):
+    if not isinstance(args, tuple):
+        args = (args,)
+
+    if len(args) > 2:
+        raise IndexError('Too many indexers')
+
+    # Rows specified
+    if args:
         rows = args[0]
 
         # tbl.x[[0, 3, 2]] or tbl.x[[2]]
         if isinstance(rows, items_types):
-            raise IndexError('Row selection is not supported.')
+            rows = list(rows)
 
         # tbl.x[1:12]
         elif isinstance(rows, slice):
-            if rows.start is not None or rows.stop is not None or \
-                    rows.step is not None:
-                raise IndexError('Row selection is not supported.')
+            if rows.start is None and rows.stop is None and rows.step is None:
+                rows = None
 
         # tbl.x[10]
         elif isinstance(rows, int_types):
             outtype = 'row'
-            raise IndexError('Row selection is not supported.')
 
         else:
             raise TypeError('Unknown type for row indexing: %s' % rows)
 
+    # Columns specified
+    if len(args) > 1:
         cols = args[1]
 
         # tbl.x[0, ['a', 'b', 5]]
@@ -270,19 +679,11 @@ def _get_table_selection(table, args):
         else:
             raise TypeError('Unknown type for column indexing: %s' % cols)
 
-    # Range of rows specified
-    elif isinstance(args, slice):
-        raise IndexError('Row selection is not supported.')
-
-    # One row specified
-    elif isinstance(args, int_types):
-        raise IndexError('Row selection is not supported.')
-
-    else:
-        raise TypeError('Unknown type for table indexing: %s' % args)
-
     out = {}
 
+    if rows is not None:
+        out['table._rows'] = rows
+
     if cols:
         out['table._columns'] = cols
 
@@ -336,11 +737,54 @@ class CASTableAnyLocationAccessor(CASTableAccessor):
             tbl.append_computed_columns(params.pop('table.computedvars'),
                                         params.pop('table.computedvarsprogram'))
 
+        if 'table._rows' in params:
+            out = self._fetch_rows(tbl, params.pop('table._rows'))
+            if dtype == 'scalar':
+                return out.iat[0, 0]
+            if dtype == 'row':
+                return out.iloc[0]
+            if dtype == 'column':
+                return out.iloc[:, 0]
+            return out
+
         if dtype == 'column':
             return tbl[tbl.columns[0]]
 
         return tbl
 
+    def _fetch_rows(self, tbl, rows):
+        '''
+        Fetch the selected rows
+
+        Row labels are the row positions, but label-based slices include
+        the stop label and negative labels don't exist.
+
+        '''
+        if not isinstance(rows, slice):
+            if not isinstance(rows, items_types):
+                rows = [rows]
+            elif rows and all(isinstance(x, (bool, np.bool_)) for x in rows):
+                rows = [i for i, x in enumerate(rows) if x]
+
+        if self.accessor == 'iloc':
+            return tbl._fetch_rows(rows)
+
+        if isinstance(rows, slice):
+            if rows.stop is not None and rows.stop < 0:
+                rows = []
+            else:
+                rows = slice(max(rows.start or 0, 0),
+                             None if rows.stop is None else rows.stop + 1, rows.step)
+        else:
+            for row in rows:
+                if row < 0:
+                    raise KeyError(row)
+
+        try:
+            return tbl._fetch_rows(rows)
+        except IndexError as exc:
+            raise KeyError(str(exc))
+
 
 class CASTableRowLocationAccessor(CASTableAnyLocationAccessor):
     ''' Implementation of the iloc property '''
@@ -352,6 +796,27 @@ class CASTableLabelLocationAccessor(CASTableAnyLocationAccessor):
     accessor = 'loc'
 
 
+def _nonsingular(vmin, vmax):
+    ''' Return the plot range of data from `vmin` to `vmax` '''
+    if pd.isnull(vmin) or pd.isnull(vmax):
+        return 0.0, 1.0
+    vmin, vmax = float(vmin), float(vmax)
+    if vmin == vmax:
+        if vmin == 0:
+            return -0.1, 0.1
+        return vmin - 0.1 * abs(vmin), vmax + 0.1 * abs(vmax)
+    return vmin, vmax
+
+
+def _kde_factor(bw_method, nobs):
+    ''' Return the KDE bandwidth factor for `nobs` observations '''
+    if bw_method is None or bw_method == 'scott':
+        return nobs ** (-1. / 5)
+    if bw_method == 'silverman':
+        return (nobs * 3 / 4.) ** (-1. / 5)
+    return bw_method
+
+
 class CASTablePlotter(object):
     '''
     Plotting class for CASTable
@@ -419,6 +884,263 @@ class CASTablePlotter(object):
         params['fetchvars'] = self._get_fetchvars(x=x, y=y, by=by)
         return params, kwargs
 
+    def _use_aggregation(self, by=None, **kwargs):
+        '''
+        Can the plot data be computed on the server?
+
+        '''
+        if not get_option('cas.dataset.plot_aggregation'):
+            return False
+        if by is not None or self._table.has_groupby_vars():
+            return False
+        for key in ['weights', 'subplots', 'xscale', 'yscale', 'extent']:
+            if kwargs.get(key) is not None:
+                return False
+        return True
+
+    def _get_cached(self, kind, args, func):
+        '''
+        Return aggregated plot data, computing it if it isn't cached
+
+        If the ``cas.dataset.metadata_cache`` option is enabled, the data
+        is stored in the metadata cache of the connection, so it is reused
+        until the table is modified.
+
+        '''
+        tbl = self._table
+        cache = tbl.get_connection().metadata_cache
+        key = 'plot.%s%r' % (kind, args)
+        out = cache.get(key, tbl)
+        if out is None:
+            out = func(*args)
+            cache.set(key, tbl, out)
+        return out
+
+    def _get_numeric_columns(self):
+        ''' Return the numeric columns of the table '''
+        return self._table._get_dtypes(include='numeric')
+
+    def _get_ranges(self, columns):
+        '''
+        Return the number of values, minimum, and maximum of each column
+
+        Returns
+        -------
+        :class:`pandas.DataFrame`
+            Indexed by column name, with N, Min, and Max columns
+
+        '''
+        out = self._table._retrieve('simple.summary', inputs=list(columns),
+                                    subset=['N', 'MIN', 'MAX'])['Summary']
+        out = out.set_index(out['Column'].str.lower())
+        return out.loc[[x.lower() for x in columns], ['N', 'Min', 'Max']]
+
+    def _get_bin_counts(self, columns, edges):
+        '''
+        Count the values of each column in equal-width bins
+
+        The bin number of each value is computed in a computed column
+        and the bins are counted by the ``simple.freq`` action.  Values
+        outside of the bin edges are not counted.  As in
+        :func:`numpy.histogram`, the last bin includes its right edge.
+
+        Parameters
+        ----------
+        columns : list-of-strings
+            The columns to count
+        edges : list-of-arrays
+            The increasing bin edges of each column
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The counts with one row per bin and one column per column
+
+        '''
+        tbl = self._table.copy()
+        names = []
+        code = []
+        for i, (col, coledges) in enumerate(zip(columns, edges)):
+            name = '_PY_BIN%d_' % i
+            nbins = len(coledges) - 1
+            lo, hi = float(coledges[0]), float(coledges[-1])
+            names.append(name)
+            code.append('if missing(%s) or %s < %r or %s > %r then %s = .; ' %
+                        (_nlit(col), _nlit(col), lo, _nlit(col), hi, name))
+            if np.allclose(np.diff(coledges), (hi - lo) / nbins):
+                code.append('else %s = min(floor((%s - %r) / %r), %d); ' %
+                            (name, _nlit(col), lo, (hi - lo) / nbins, nbins - 1))
+            else:
+                # Unequal bins are found by comparing with each edge
+                for j, edge in enumerate(coledges[1:-1]):
+                    code.append('else if %s < %r then %s = %d; ' %
+                                (_nlit(col), float(edge), name, j))
+                code.append('else %s = %d; ' % (name, nbins - 1))
+        tbl.append_computed_columns(names, code)
+
+        freq = tbl._retrieve('simple.freq', inputs=names)['Frequency']
+        index = dict((x.lower(), i) for i, x in enumerate(names))
+
+        out = np.zeros((max(len(x) for x in edges) - 1, len(columns)))
+        for col, value, count in zip(freq['Column'], freq['NumVar'], freq['Frequency']):
+            if not pd.isnull(value):
+                out[int(value), index[col.lower()]] += count
+        return out
+
+    def _get_hist_data(self, columns, bins, bin_range):
+        '''
+        Return the bin edges and counts of a histogram of the columns
+
+        '''
+        if isinstance(bins, items_types):
+            edges = np.asarray(bins, dtype=float)
+        else:
+            if bin_range is not None:
+                lo, hi = bin_range
+            else:
+                ranges = self._get_ranges(columns)
+                lo, hi = ranges['Min'].min(), ranges['Max'].max()
+                if pd.isnull(lo):
+                    lo, hi = 0.0, 1.0
+            if lo == hi:
+                lo, hi = lo - 0.5, hi + 0.5
+            edges = np.linspace(lo, hi, bins + 1)
+        return edges, self._get_bin_counts(columns, [edges] * len(columns))
+
+    def _get_kde_data(self, columns):
+        '''
+        Return the binned data used to compute kernel density estimates
+
+        Each column is counted in :data:`KDE_BINS` equal-width bins
+        spanning its values.
+
+        '''
+        ranges = self._get_ranges(columns)
+        edges = []
+        for lo, hi in zip(ranges['Min'], ranges['Max']):
+            lo, hi = _nonsingular(lo, hi)
+            edges.append(np.linspace(lo, hi, KDE_BINS + 1))
+        counts = self._get_bin_counts(columns, edges)
+        return [dict(nobs=nobs, min=lo, max=hi,
+                     centers=(coledges[:-1] + coledges[1:]) / 2.0, counts=counts[:, i])
+                for i, (nobs, lo, hi, coledges) in enumerate(zip(ranges['N'], ranges['Min'],
+                                                                 ranges['Max'], edges))]
+
+    def _get_box_stats(self, columns, whis):
+        '''
+        Return the statistics of a box plot of each column
+
+        The quartiles are computed by the ``percentile.percentile`` action.
+        The whiskers, extremes, and means are computed by the
+        ``simple.summary`` action on computed columns that only contain
+        the values within the whisker limits.
+
+        Returns
+        -------
+        list-of-dicts
+            Statistics in the form used by :meth:`matplotlib.axes.Axes.bxp`
+
+        '''
+        tbl = self._table.copy()
+        tbl._loadactionset('percentile')
+        pctl = tbl._retrieve('percentile.percentile', inputs=list(columns),
+                             values=[25, 50, 75])['Percentile']
+        quartiles = {}
+        for col, pct, value in zip(pctl['Variable'], pctl['Pctl'], pctl['Value']):
+            quartiles.setdefault(col.lower(), {})[int(round(pct))] = value
+
+        names = []
+        code = []
+        for i, col in enumerate(columns):
+            q1, q3 = quartiles[col.lower()][25], quartiles[col.lower()][75]
+            names.extend(['_PY_LO%d_' % i, '_PY_HI%d_' % i])
+            code.append('if %s >= %r then _PY_LO%d_ = %s; else _PY_LO%d_ = .; ' %
+                        (_nlit(col), float(q1 - whis * (q3 - q1)), i, _nlit(col), i))
+            code.append('if . < %s <= %r then _PY_HI%d_ = %s; else _PY_HI%d_ = .; ' %
+                        (_nlit(col), float(q3 + whis * (q3 - q1)), i, _nlit(col), i))
+        tbl.append_computed_columns(names, code)
+
+        summ = tbl._retrieve('simple.summary', inputs=list(columns) + names,
+                             subset=['MIN', 'MAX', 'MEAN'])['Summary']
+        summ = summ.set_index(summ['Column'].str.lower())
+
+        out = []
+        for i, col in enumerate(columns):
+            q1, med, q3 = [quartiles[col.lower()][x] for x in [25, 50, 75]]
+            vmin, vmax, mean = summ.loc[col.lower(), ['Min', 'Max', 'Mean']]
+            whislo = summ.loc['_py_lo%d_' % i, 'Min']
+            whishi = summ.loc['_py_hi%d_' % i, 'Max']
+            if pd.isnull(whislo) or whislo > q1:
+                whislo = q1
+            if pd.isnull(whishi) or whishi < q3:
+                whishi = q3
+            fliers = [x for x in [vmin] if x < whislo] + [x for x in [vmax] if x > whishi]
+            out.append(dict(label=col, q1=q1, med=med, q3=q3, mean=mean,
+                            whislo=whislo, whishi=whishi, fliers=np.array(fliers)))
+        return out
+
+    def _get_hexbin_data(self, x, y, gridsize):
+        '''
+        Return the hexagon centers and counts of a hexbin plot
+
+        The hexagonal grid is the same one that
+        :meth:`matplotlib.axes.Axes.hexbin` uses.  The hexagon of each
+        row is computed in a computed column and the hexagons are
+        counted by the ``simple.freq`` action.
+
+        '''
+        if isinstance(gridsize, items_types):
+            nx, ny = gridsize
+        else:
+            nx = gridsize
+            ny = int(nx / np.sqrt(3))
+        nx1, ny1 = nx + 1, ny + 1
+
+        ranges = self._get_ranges([x, y])
+        xmin, xmax = _nonsingular(ranges['Min'].iloc[0], ranges['Max'].iloc[0])
+        ymin, ymax = _nonsingular(ranges['Min'].iloc[1], ranges['Max'].iloc[1])
+        extent = (xmin, xmax, ymin, ymax)
+
+        # Hexagons exactly cover the x range, so it is padded
+        padding = 1.e-9 * (xmax - xmin)
+        xmin, xmax = xmin - padding, xmax + padding
+        sx = (xmax - xmin) / nx
+        sy = (ymax - ymin) / ny
+
+        code = ('_PY_HEX_ = .; '
+                'if not missing(%(x)s) and not missing(%(y)s) then do; '
+                '_PY_IX_ = (%(x)s - %(xmin)r) / %(sx)r; '
+                '_PY_IY_ = (%(y)s - %(ymin)r) / %(sy)r; '
+                '_PY_IX1_ = round(_PY_IX_); _PY_IY1_ = round(_PY_IY_); '
+                '_PY_IX2_ = floor(_PY_IX_); _PY_IY2_ = floor(_PY_IY_); '
+                'if (_PY_IX_ - _PY_IX1_)**2 + 3 * (_PY_IY_ - _PY_IY1_)**2 < '
+                '(_PY_IX_ - _PY_IX2_ - 0.5)**2 + 3 * (_PY_IY_ - _PY_IY2_ - 0.5)**2 then do; '
+                'if 0 <= _PY_IX1_ < %(nx1)d and 0 <= _PY_IY1_ < %(ny1)d then '
+                '_PY_HEX_ = _PY_IX1_ * %(ny1)d + _PY_IY1_; end; '
+                'else if 0 <= _PY_IX2_ < %(nx)d and 0 <= _PY_IY2_ < %(ny)d then '
+                '_PY_HEX_ = %(n1)d + _PY_IX2_ * %(ny)d + _PY_IY2_; '
+                'end; ') % dict(x=_nlit(x), y=_nlit(y), xmin=xmin, ymin=ymin, sx=sx, sy=sy,
+                                nx=nx, ny=ny, nx1=nx1, ny1=ny1, n1=nx1 * ny1)
+
+        tbl = self._table.copy()
+        tbl.append_computed_columns(['_PY_HEX_'], [code])
+        freq = tbl._retrieve('simple.freq', inputs=['_PY_HEX_'])['Frequency']
+
+        counts = np.zeros(nx1 * ny1 + nx * ny)
+        for value, count in zip(freq['NumVar'], freq['Frequency']):
+            if not pd.isnull(value):
+                counts[int(value)] += count
+
+        centers = np.zeros((len(counts), 2))
+        centers[:nx1 * ny1, 0] = np.repeat(np.arange(nx1), ny1)
+        centers[:nx1 * ny1, 1] = np.tile(np.arange(ny1), nx1)
+        centers[nx1 * ny1:, 0] = np.repeat(np.arange(nx) + 0.5, ny)
+        centers[nx1 * ny1:, 1] = np.tile(np.arange(ny), nx) + 0.5
+        centers[:, 0] = centers[:, 0] * sx + xmin
+        centers[:, 1] = centers[:, 1] * sy + ymin
+
+        return dict(extent=extent, x=centers[:, 0], y=centers[:, 1], counts=counts)
+
     def __call__(self, x=None, y=None, kind='line', **kwargs):
         '''
         Make a line plot of all columns in a table
@@ -503,10 +1225,22 @@ class CASTablePlotter(object):
         '''
         Boxplot
 
-        This method fetches the data from the CAS table and uses the
-        :meth:`pandas.DataFrame.plot.box` method to plot it.  All
-        arguments used in the call to this method are passed to
-        the DataFrame's :meth:`plot.box` method.
+        The quartiles, whiskers, and extremes of each numeric column are
+        computed on the server and drawn using the
+        :meth:`matplotlib.axes.Axes.bxp` method.  The `ax`, `figsize`,
+        and `title` arguments are handled like the DataFrame's
+        :meth:`plot.box` method, and the arguments of :meth:`bxp` (such
+        as `showmeans`) are passed to it.
+
+        Notes
+        -----
+        Only the minimum and maximum of each column are drawn as outliers.
+
+        If `by` is specified, the table has By groups, any other
+        :meth:`pandas.DataFrame.plot.box` arguments (such as `rot`,
+        `grid`, or `color`) are used, or the ``cas.dataset.plot_aggregation``
+        option is False, the data is fetched from the CAS table and
+        plotted using the :meth:`pandas.DataFrame.plot.box` method instead.
 
         See Also
         --------
@@ -517,17 +1251,44 @@ class CASTablePlotter(object):
         :class:`matplotlib.AxesSubplot` or :func:`numpy.array` of them.
 
         '''
-        params, kwargs = self._get_plot_params(by=by, **kwargs)
-        return self._table._fetch(**params).plot.box(by=by, **kwargs)
+        if not self._use_aggregation(by=by, **kwargs) or \
+                isinstance(kwargs.get('whis', 1.5), items_types) or \
+                set(kwargs).difference(BOX_PLOT_PARAMS):
+            params, kwargs = self._get_plot_params(by=by, **kwargs)
+            return self._table._fetch(**params).plot.box(by=by, **kwargs)
+
+        import matplotlib.pyplot as plt
+
+        kwargs = self._get_sampling_params(**kwargs)[1]
+        columns = self._get_numeric_columns()
+        stats = self._get_cached('box', (tuple(columns), kwargs.pop('whis', 1.5)),
+                                 self._get_box_stats)
+
+        ax = kwargs.pop('ax', None)
+        if ax is None:
+            ax = plt.figure(figsize=kwargs.pop('figsize', None)).add_subplot(111)
+        title = kwargs.pop('title', None)
+        ax.bxp(stats, **kwargs)
+        if title:
+            ax.set_title(title)
+        return ax
 
     def density(self, **kwargs):
         '''
         Kernel density estimate plot
 
-        This method fetches the data from the CAS table and uses the
-        :meth:`pandas.DataFrame.plot.density` method to plot it.  All
+        The values of each numeric column are counted in 1024 bins on
+        the server and the estimate of each column is computed from the
+        bin counts using the :meth:`pandas.Series.plot.kde` method.  All
         arguments used in the call to this method are passed to
-        the DataFrame's :meth:`plot.density` method.
+        the Series' :meth:`plot.kde` method.
+
+        Notes
+        -----
+        If the table has By groups, or the ``cas.dataset.plot_aggregation``
+        option is False, the data is fetched from the CAS table and
+        plotted using the :meth:`pandas.DataFrame.plot.density` method
+        instead.
 
         See Also
         --------
@@ -538,18 +1299,26 @@ class CASTablePlotter(object):
         :class:`matplotlib.AxesSubplot` or :func:`numpy.array` of them.
 
         '''
-        params, kwargs = self._get_plot_params(**kwargs)
-        return self._table._fetch(**params).plot.density(**kwargs)
+        if not self._use_aggregation(**kwargs):
+            params, kwargs = self._get_plot_params(**kwargs)
+            return self._table._fetch(**params).plot.density(**kwargs)
+        return self._plot_kde(**kwargs)
 
     def hexbin(self, x=None, y=None, C=None, reduce_C_function=None,
                gridsize=None, **kwargs):
         '''
         Hexbin plot
 
-        This method fetches the data from the CAS table and uses the
-        :meth:`pandas.DataFrame.plot.hexbin` method to plot it.  All
-        arguments used in the call to this method are passed to
-        the DataFrame's :meth:`plot.density` method.
+        The number of rows in each hexagon is computed on the server and
+        the counts are plotted using the :meth:`pandas.DataFrame.plot.hexbin`
+        method.  All arguments used in the call to this method are passed
+        to the DataFrame's :meth:`plot.hexbin` method.
+
+        Notes
+        -----
+        If `C` is specified, the table has By groups, or the
+        ``cas.dataset.plot_aggregation`` option is False, the data is
+        fetched from the CAS table and plotted instead.
 
         See Also
         --------
@@ -560,21 +1329,49 @@ class CASTablePlotter(object):
         :class:`matplotlib.AxesSubplot` or :func:`numpy.array` of them.
 
         '''
-        params, kwargs = self._get_plot_params(x=x, y=y, **kwargs)
-        return self._table._fetch(**params)\
-                   .plot.hexbin(x=x, y=y, C=C,
-                                reduce_C_function=reduce_C_function,
-                                gridsize=gridsize, **kwargs)
+        if C is not None or not self._use_aggregation(**kwargs):
+            params, kwargs = self._get_plot_params(x=x, y=y, **kwargs)
+            return self._table._fetch(**params)\
+                       .plot.hexbin(x=x, y=y, C=C,
+                                    reduce_C_function=reduce_C_function,
+                                    gridsize=gridsize, **kwargs)
+
+        kwargs = self._get_sampling_params(**kwargs)[1]
+        if gridsize is None:
+            gridsize = 100
+        if isinstance(gridsize, items_types):
+            gridsize = tuple(gridsize)
+        data = self._get_cached('hexbin', (x, y, gridsize), self._get_hexbin_data)
+
+        # Each hexagon center is plotted with the count of its hexagon
+        keep = slice(None)
+        mincnt = kwargs.pop('mincnt', None)
+        if mincnt is not None:
+            keep = data['counts'] >= mincnt
+        plotdata = pd.DataFrame(OrderedDict([('_x_', data['x'][keep]),
+                                             ('_y_', data['y'][keep]),
+                                             ('_count_', data['counts'][keep])]))
+        ax = plotdata.plot.hexbin(x='_x_', y='_y_', C='_count_', reduce_C_function=np.sum,
+                                  gridsize=gridsize, extent=data['extent'], **kwargs)
+        ax.set_xlabel(x)
+        ax.set_ylabel(y)
+        return ax
 
     def hist(self, by=None, bins=10, **kwargs):
         '''
         Histogram
 
-        This method fetches the data from the CAS table and uses the
-        :meth:`pandas.DataFrame.plot.hist` method to plot it.  All
-        arguments used in the call to this method are passed to
+        The bin counts of each numeric column are computed on the server
+        and plotted using the :meth:`pandas.DataFrame.plot.hist` method.
+        All arguments used in the call to this method are passed to
         the DataFrame's :meth:`plot.hist` method.
 
+        Notes
+        -----
+        If `by` or `weights` is specified, the table has By groups, or the
+        ``cas.dataset.plot_aggregation`` option is False, the data is
+        fetched from the CAS table and plotted instead.
+
         See Also
         --------
         :meth:`pandas.DataFrame.plot.hist`
@@ -584,17 +1381,41 @@ class CASTablePlotter(object):
         :class:`matplotlib.AxesSubplot` or :func:`numpy.array` of them.
 
         '''
-        params, kwargs = self._get_plot_params(by=by, **kwargs)
-        return self._table._fetch(**params).plot.hist(by=by, bins=bins, **kwargs)
+        if not self._use_aggregation(by=by, **kwargs):
+            params, kwargs = self._get_plot_params(by=by, **kwargs)
+            return self._table._fetch(**params).plot.hist(by=by, bins=bins, **kwargs)
+
+        kwargs = self._get_sampling_params(**kwargs)[1]
+        columns = self._get_numeric_columns()
+        if isinstance(bins, items_types):
+            bins = tuple(bins)
+        bin_range = kwargs.pop('range', None)
+        if bin_range is not None:
+            bin_range = tuple(bin_range)
+        edges, counts = self._get_cached('hist', (tuple(columns), bins, bin_range),
+                                         self._get_hist_data)
+
+        # Each bin center is plotted with the count of its bin as the weight
+        centers = (edges[:-1] + edges[1:]) / 2.0
+        plotdata = pd.DataFrame(OrderedDict((x, centers) for x in columns), columns=columns)
+        return plotdata.plot.hist(bins=edges, weights=counts, **kwargs)
 
     def kde(self, **kwargs):
         '''
         Kernel density estimate plot
 
-        This method fetches the data from the CAS table and uses the
-        :meth:`pandas.DataFrame.plot.kde` method to plot it.  All
+        The values of each numeric column are counted in 1024 bins on
+        the server and the estimate of each column is computed from the
+        bin counts using the :meth:`pandas.Series.plot.kde` method.  All
         arguments used in the call to this method are passed to
-        the DataFrame's :meth:`plot.kde` method.
+        the Series' :meth:`plot.kde` method.
+
+        Notes
+        -----
+        If the table has By groups, or the ``cas.dataset.plot_aggregation``
+        option is False, the data is fetched from the CAS table and
+        plotted using the :meth:`pandas.DataFrame.plot.kde` method
+        instead.
 
         See Also
         --------
@@ -605,8 +1426,35 @@ class CASTablePlotter(object):
         :class:`matplotlib.AxesSubplot` or :func:`numpy.array` of them.
 
         '''
-        params, kwargs = self._get_plot_params(**kwargs)
-        return self._table._fetch(**params).plot.kde(**kwargs)
+        if not self._use_aggregation(**kwargs):
+            params, kwargs = self._get_plot_params(**kwargs)
+            return self._table._fetch(**params).plot.kde(**kwargs)
+        return self._plot_kde(**kwargs)
+
+    def _plot_kde(self, bw_method=None, ind=None, **kwargs):
+        '''
+        Plot kernel density estimates computed from binned data
+
+        '''
+        kwargs = self._get_sampling_params(**kwargs)[1]
+        kwargs.setdefault('legend', True)
+        columns = self._get_numeric_columns()
+        data = self._get_cached('kde', (tuple(columns),), self._get_kde_data)
+
+        ax = kwargs.pop('ax', None)
+        for col, coldata in zip(columns, data):
+            if not coldata['nobs']:
+                continue
+            colind = ind
+            if colind is None or isinstance(colind, int_types):
+                sample_range = coldata['max'] - coldata['min']
+                colind = np.linspace(coldata['min'] - 0.5 * sample_range,
+                                     coldata['max'] + 0.5 * sample_range,
+                                     colind or 1000)
+            ax = pd.Series(coldata['centers'], name=col)\
+                   .plot.kde(ax=ax, weights=coldata['counts'], ind=colind,
+                             bw_method=_kde_factor(bw_method, coldata['nobs']), **kwargs)
+        return ax
 
     def line(self, x=None, y=None, **kwargs):
         '''
@@ -838,9 +1686,13 @@ class CASTable(ParamManager, ActionParamManager):
 
         self._columns = []
         self._sortby = []
+        self._plan = None
+        self._isin = None
+        self._cache = None
+        self._temp = None
 
-#       self._iat = CASTableRowScalarAccessor(self)
-#       self._at = CASTableLabelScalarAccessor(self)
+        self._iat = CASTableRowScalarAccessor(self)
+        self._at = CASTableLabelScalarAccessor(self)
         self._iloc = CASTableRowLocationAccessor(self)
         self._loc = CASTableLabelLocationAccessor(self)
         self._ix = CASTableAnyLocationAccessor(self)
@@ -1151,6 +2003,8 @@ class CASTable(ParamManager, ActionParamManager):
         column = CASColumn(**self.copy().to_params())
         column._columns = list(self._columns)
         column._sortby = list(self._sortby)
+        column._cache = self._cache
+        column._temp = self._temp
 
         if varname is not None:
             column._columns = [varname]
@@ -1333,6 +2187,9 @@ class CASTable(ParamManager, ActionParamManager):
         tbl = type(self)(**self.params)
         tbl._columns = self._columns
         tbl._sortby = self._sortby
+        tbl._plan = self._plan
+        tbl._cache = self._cache
+        tbl._temp = self._temp
         try:
             tbl.set_connection(self.get_connection())
         except SWATError:
@@ -1365,6 +2222,9 @@ class CASTable(ParamManager, ActionParamManager):
         tbl = type(self)(**copy.deepcopy(self.params))
         tbl._columns = list(self._columns)
         tbl._sortby = list(self._sortby)
+        tbl._plan = self._plan
+        tbl._cache = self._cache
+        tbl._temp = self._temp
         try:
             tbl.set_connection(self.get_connection())
         except SWATError:
@@ -1535,8 +2395,7 @@ class CASTable(ParamManager, ActionParamManager):
 
         if conn.has_action(name):
             actcls = conn.get_action_class(name)
-            members = {'default_params': {'__table__': self.copy()}}
-            actcls = type(actcls.__name__, (actcls,), members)
+            actcls = actcls._with_default_params({'__table__': self.copy()})
 
             if re.match(r'^[A-Z]', origname):
                 return actcls
@@ -1722,6 +2581,7 @@ class CASTable(ParamManager, ActionParamManager):
            Dictionary with only input table parameters
 
         '''
+        self._run_plan()
         if type(self).table_params:
             out = {}
             for key in self.params.keys():
@@ -1828,8 +2688,28 @@ class CASTable(ParamManager, ActionParamManager):
            CASTable name
 
         '''
+        self._run_plan()
         return self.params['name']
 
+    def _run_plan(self):
+        ''' Run the deferred data step that creates the table, if any '''
+        if self._plan is not None:
+            self._plan.run()
+
+    def _get_active_caslib(self):
+        ''' Return the active CASLib of the session '''
+        return self.get_connection().retrieve('sessionprop.getsessopt',
+                                              name='caslib', _apptag='UI',
+                                              _messagelevel='error').caslib
+
+    def _get_plan_dtypes(self):
+        ''' Return the data types without running the deferred data step '''
+        if self._plan is None or self._plan.done:
+            return self.dtypes
+        tbl = self._plan.source.copy()
+        tbl._columns = list(self._columns)
+        return tbl.dtypes
+
     #
     # Pandas DataFrame API
     #
@@ -1841,15 +2721,87 @@ class CASTable(ParamManager, ActionParamManager):
         if not hasattr(self, name):
             self._retrieve('builtins.loadactionset', actionset=name)
 
+    def _get_metadata(self, *names):
+        '''
+        Retrieve table metadata
+
+        The actions that retrieve the metadata are called together in
+        one :class:`CASBatch`.  Metadata found in the connection's
+        metadata cache is not retrieved from the server again.
+
+        Parameters
+        ----------
+        *names : one or more strings
+            The metadata to retrieve: 'columninfo', 'numrows',
+            and / or 'numcolumns'.
+
+        Returns
+        -------
+        list
+            The requested metadata in the same order as `names`
+
+        '''
+        out = {}
+        queued = {}
+
+        conn = self.get_connection()
+        cache = conn.metadata_cache
+        tables = dict(columninfo=self, numrows=self.copy(exclude='groupby'),
+                      numcolumns=self)
+
+        # Short circuit if we can
+        if 'numcolumns' in names and self._columns:
+            out['numcolumns'] = len(self._columns)
+
+        for name in names:
+            if name in tables and name not in out:
+                value = cache.get(name, tables[name])
+                if value is not None:
+                    out[name] = value
+
+        with conn.batch() as batch:
+            for name in names:
+                if name in out or name in queued:
+                    continue
+                if name == 'columninfo':
+                    queued[name] = batch.retrieve('table.columninfo', __table__=self,
+                                                  _apptag='UI', _messagelevel='error')
+                elif name == 'numrows':
+                    queued[name] = batch.retrieve('simple.numrows',
+                                                  __table__=tables[name],
+                                                  _apptag='UI', _messagelevel='error')
+                elif name == 'numcolumns':
+                    queued[name] = batch.retrieve('table.tableinfo', __table__=self,
+                                                  _apptag='UI', _messagelevel='error')
+                else:
+                    raise ValueError('Unknown table metadata: %s' % name)
+
+        for name, idx in six.iteritems(queued):
+            res = batch.results[idx]
+            if res.severity > 1:
+                raise SWATError(res.status)
+            if name == 'columninfo':
+                out[name] = res['ColumnInfo']
+            elif name == 'numrows':
+                out[name] = res['numrows']
+            elif name == 'numcolumns':
+                computedvars = self.get_param('computedvars', [])
+                if computedvars and not isinstance(computedvars, items_types):
+                    computedvars = [computedvars]
+                out[name] = res['TableInfo'].ix[0, 'Columns'] + len(computedvars)
+            cache.set(name, tables[name], out[name])
+
+        return [out[name] for name in names]
+
     @getattr_safe_property
     def _columninfo(self):
         ''' Return columninfo dataframe '''
-        return self._retrieve('table.columninfo')['ColumnInfo']
+        return self._get_metadata('columninfo')[0]
 
     @getattr_safe_property
     def _numrows(self):
         ''' Return number of rows in the table '''
-        return self.copy(exclude='groupby')._retrieve('simple.numrows')['numrows']
+        return self._get_metadata('numrows')[0]
 
     def __len__(self):
         return self._numrows
@@ -1868,17 +2820,7 @@ class CASTable(ParamManager, ActionParamManager):
     @getattr_safe_property
     def _numcolumns(self):
         ''' Return number of visible columns '''
-        # Short circuit if we can
-        varlist = self._columns
-        if varlist:
-            return len(varlist)
-
-        # Call tableinfo
-        tblinfo = self._retrieve('table.tableinfo')['TableInfo']
-        computedvars = self.get_param('computedvars', [])
-        if computedvars and not isinstance(computedvars, items_types):
-            computedvars = [computedvars]
-        return tblinfo.ix[0, 'Columns'] + len(computedvars)
+        return self._get_metadata('numcolumns')[0]
 
     @getattr_safe_property
     def columns(self):
@@ -2146,7 +3088,7 @@ class CASTable(ParamManager, ActionParamManager):
     @getattr_safe_property
     def shape(self):
         ''' Return a tuple representing the dimensionality of the table '''
-        return self._numrows, self._numcolumns
+        return tuple(self._get_metadata('numrows', 'numcolumns'))
 
     # Conversion
 
@@ -2281,6 +3223,11 @@ class CASTable(ParamManager, ActionParamManager):
         the order is not guaranteed.  If you do not apply a sort order
         using :meth:`sort_values` the results are not predictable.
 
+        If a sort order is applied and `start` is zero, the rows are
+        selected using the top-k values of the first sort column rather
+        than sorting the entire table.  All By groups are handled
+        in the same action calls.
+
         Returns
         -------
         :class:`swat.SASDataFrame`
@@ -2294,6 +3241,10 @@ class CASTable(ParamManager, ActionParamManager):
             tbl = self.copy()
             tbl._columns = list(columns)
 
+        if tbl._sortby and start == 0 and (stop is None or stop > 0):
+            return tbl._topk_slice(5 if stop is None else stop,
+                                   bygroup_as_index=bygroup_as_index)
+
         groupvars = self.get_groupby_vars()
         if groupvars:
             groups = tbl.groupby(groupvars)
@@ -2328,6 +3279,153 @@ class CASTable(ParamManager, ActionParamManager):
 
         return concat(out)
 
+    def _topk_slice(self, n, bygroup_as_index=True):
+        '''
+        Retrieve the first `n` rows of each By group in sort order
+
+        The ``simple.topk`` action is used to find the `n` largest (or
+        smallest) distinct values of the first sort column in each
+        By group.  Only the rows within those values are sorted, and at
+        most `n` of them are fetched from each By group.  If By groups
+        are specified, the rows of all By groups are fetched by one
+        ``table.fetch`` action (see :meth:`_fetch_groups`).
+
+        Missing values of the first sort column are kept, so they sort
+        first in ascending order as they do when the entire table is sorted.
+
+        Parameters
+        ----------
+        n : int or long
+            The number of rows to return from each By group.
+        bygroup_as_index : boolean
+            If By groups are specified, should they be converted to an index?
+
+        Returns
+        -------
+        :class:`swat.SASDataFrame`
+
+        '''
+        sortby = list(self._sortby)
+        key = sortby[0]['name']
+        largest = sortby[0].get('order', 'ASCENDING').upper() == 'DESCENDING'
+        groups = self.get_groupby_vars()
+
+        out = self._retrieve('simple.topk', inputs=[key], order='value', raw=True,
+                             includemissing=False, topk=n if largest else 0,
+                             bottomk=0 if largest else n)
+
+        where = []
+        for topk in out.get_tables('Topk'):
+            expr = [_where_equals(x, topk.attrs['ByVar%dValue' % (i + 1)])
+                    for i, x in enumerate(groups)]
+            # With fewer than `n` distinct values, all rows are candidates
+            if len(topk) >= n:
+                if 'NumVar' in topk.columns:
+                    value = topk['NumVar'].min() if largest else topk['NumVar'].max()
+                    value = repr(float(value))
+                else:
+                    value = topk['CharVar'].min() if largest else topk['CharVar'].max()
+                    value = _quote(value)
+                expr.append('%s %s %s' % (_nlit(key), largest and '>=' or '<=', value))
+            where.append(' and '.join(expr))
+
+        tbl = self.copy()
+        tbl.params.pop('groupby', None)
+        tbl.params.pop('groupBy', None)
+        tbl._sortby = [dict(name=x, order='ASCENDING', formatted='RAW')
+                       for x in groups] + sortby
+
+        columns = None
+        if self._columns:
+            columns = _get_unique(groups + list(self._columns))
+            tbl._columns = _get_unique(columns + [x['name'] for x in sortby])
+
+        if not groups:
+            if where and where[0]:
+                tbl.append_where(where[0])
+            data = tbl._fetch(to=n)
+        else:
+            data = tbl._fetch_groups(groups, where or ['0'], n)
+
+        if columns is not None:
+            data = data[columns]
+
+        if groups and bygroup_as_index:
+            data = data.set_index(groups)
+
+        return data
+
+    def _fetch_groups(self, groups, where, n):
+        '''
+        Fetch the first `n` rows selected by each where clause
+
+        The table must be sorted by the `groups` columns first, so the
+        rows of each group are contiguous.  The rows of all groups are
+        fetched by one ``table.fetch`` action using the combined where
+        clauses and ``to=`` sized for `n` rows of each group.  Rows
+        beyond the first `n` of each group are dropped on the client.
+        If some groups have more than `n` selected rows (for example,
+        because of ties), the groups that were cut off are fetched again.
+
+        Parameters
+        ----------
+        groups : list-of-strings
+            The columns that identify each group of rows.
+        where : list-of-strings
+            The where clause of each group of rows.
+        n : int or long
+            The maximum number of rows to fetch from each group.
+
+        Returns
+        -------
+        :class:`SASDataFrame`
+
+        '''
+        from .. import dataframe as df
+
+        selected = ' or '.join('(%s)' % x for x in where)
+        complete = []
+        out = []
+
+        while len(complete) < len(where):
+            tbl = self.copy()
+            if complete:
+                tbl.append_where('(%s) and not (%s)' % (selected, ' or '.join(complete)))
+            else:
+                tbl.append_where(selected)
+
+            limit = (len(where) - len(complete)) * n
+            data = tbl._fetch(to=limit)
+
+            # Find the first row of each group and the rows to keep
+            starts = []
+            keep = []
+            last = None
+            for i, key in enumerate(data[groups].itertuples(index=False)):
+                key = tuple(None if pd.isnull(x) else x for x in key)
+                if not starts or key != last:
+                    starts.append(i)
+                    last = key
+                keep.append(i - starts[-1] < n)
+
+            # The last group was cut off if it has fewer than `n` rows
+            numgroups = len(starts)
+            if len(data) >= limit and numgroups and len(data) - starts[-1] < n:
+                numgroups -= 1
+
+            end = numgroups < len(starts) and starts[numgroups] or len(data)
+            out.append(data.iloc[:end][np.array(keep[:end], dtype=bool)])
+
+            for i in starts[:numgroups]:
+                row = data.iloc[i]
+                complete.append('(%s)' % ' and '.join(_where_equals(x, row[x])
+                                                        for x in groups))
+
+            if len(data) < limit or not numgroups:
+                break
+
+        return df.concat(out)
+
     def nth(self, n, dropna=False, bygroup_as_index=True):
         '''
         Return the nth row
@@ -2359,17 +3457,13 @@ class CASTable(ParamManager, ActionParamManager):
 
     @getattr_safe_property
     def at(self):
-        # ''' Label-based scalar accessor '''
-        raise NotImplementedError('The `at` attribute is not implemented, '
-                                  'but the attribute is reserved.')
-#       return self._at
+        ''' Label-based scalar accessor '''
+        return self._at
 
     @getattr_safe_property
     def iat(self):
-        # ''' Integer location scalar accessor '''
-        raise NotImplementedError('The `iat` attribute is not implemented, '
-                                  'but the attribute is reserved.')
-#       return self._iat
+        ''' Integer location scalar accessor '''
+        return self._iat
 
     @getattr_safe_property
     def ix(self):
@@ -2567,28 +3661,33 @@ class CASTable(ParamManager, ActionParamManager):
 
     def get_value(self, index, col, **kwargs):
         ''' Retrieve a single scalar value '''
-        if isinstance(col, int_types):
-            col = self.columns[col]
-        tbl = self.copy()
-        tbl._columns = [col]
-        numrows = self._numrows
-        if abs(index) >= numrows:
-            raise IndexError('index %s is out of bounds for axis 0 with size %s' %
-                             (index, numrows))
-        if index < 0:
-            index = index + numrows
-        out = self._fetch(from_=index + 1, to=index + 1)
-        return out.get_value(out.index.values[0], col, **kwargs)
+        return self.lookup([index], [col])[0]
 
     def lookup(self, row_labels, col_labels):
         ''' Retrieve values indicated by row_labels, col_labels positions '''
+        columns = list(self.columns)
+        lcolumns = dict((x.lower(), x) for x in columns)
+        names = []
+        for col in col_labels:
+            if isinstance(col, int_types):
+                names.append(columns[col])
+            elif col.lower() in lcolumns:
+                names.append(lcolumns[col.lower()])
+            else:
+                raise KeyError(col)
+
+        # Fetch only the rows that contain the values
+        tbl = self.copy()
+        tbl._columns = _get_unique(names)
+        out = tbl._fetch_rows(list(row_labels))
+
         data = []
-        for row, col in zip(row_labels, col_labels):
-            data.append(self.get_value(row, col))
+        for i, col in enumerate(names):
+            data.append(out[col].iloc[i])
 
         types = set([type(x) for x in data])
         out = None
-        if len(types) == 1:
+        if len(types) == 1 and not issubclass(list(types)[0], char_types):
             try:
                 out = np.ndarray(shape=(len(row_labels),), dtype=types.pop())
             except ValueError:
@@ -2655,7 +3754,9 @@ class CASTable(ParamManager, ActionParamManager):
         code : string
             The Data step code to execute.
         casout : dict, optional
-            The name and caslib of the output table.
+            The name and caslib of the output table.  If not specified,
+            a temporary table is created.  It is dropped when the last
+            :class:`CASTable` object that refers to it is released.
         *args : any, optional
             Arbitrary positional arguments to the datastep.runcode action.
         **kwargs : any, optional
@@ -2666,8 +3767,9 @@ class CASTable(ParamManager, ActionParamManager):
         :class:`CASResults` object
 
         '''
-        view = self.to_view(name=_gen_table_name())
+        view = self.to_view()
 
+        temp = casout is None
         if casout is None:
             casout = {'name': _gen_table_name()}
         elif isinstance(casout, (text_types, binary_types)):
@@ -2690,16 +3792,22 @@ class CASTable(ParamManager, ActionParamManager):
 
         kwargs = kwargs.copy()
         kwargs['code'] = code
-        out = self.get_connection().retrieve('datastep.runcode', *args, **kwargs)
+        conn = self.get_connection()
+        out = conn.retrieve('datastep.runcode', *args, **kwargs)
 
-        view._retrieve('table.droptable')
+        _drop_tables([view])
 
         try:
-            return out['OutputCasTables']['casTable'][0]
+            outtbl = out['OutputCasTables']['casTable'][0]
         except (KeyError, IndexError):
-            pass
+            raise SWATError(out.status)
+
+        # Generated output tables are dropped when they are no longer used
+        if temp:
+            outtbl._temp = conn.temp_tables.add(outtbl.params['name'],
+                                                outtbl.params.get('caslib'), results=out)
 
-        raise SWATError(out.status)
+        return outtbl
 
 #   def isin(self, values, casout=None):
 #       raise NotImplementedError
@@ -3499,6 +4607,12 @@ class CASTable(ParamManager, ActionParamManager):
         keep : string, optional
             Not implemented.
 
+        Notes
+        -----
+        The rows are selected using the ``simple.topk`` action rather
+        than sorting the entire table.  If By groups are specified,
+        `n` rows are returned from each By group.
+
         See Also
         --------
         :meth:`pandas.DataFrame.nlargest`
@@ -3506,7 +4620,7 @@ class CASTable(ParamManager, ActionParamManager):
 
         Returns
         -------
-        :class:`pandas.Series`
+        :class:`SASDataFrame`
 
         '''
         return self.sort_values(columns, ascending=False).slice(0, n)
@@ -3524,6 +4638,16 @@ class CASTable(ParamManager, ActionParamManager):
         keep : string, optional
             Not implemented.
 
+        Notes
+        -----
+        The rows are selected using the ``simple.topk`` action rather
+        than sorting the entire table.  If By groups are specified,
+        `n` rows are returned from each By group.
+
+        Unlike :meth:`pandas.DataFrame.nsmallest`, rows with missing
+        values sort first and are returned, as they are when the
+        table is sorted.
+
         See Also
         --------
         :meth:`pandas.DataFrame.nsmallest`
@@ -3531,7 +4655,7 @@ class CASTable(ParamManager, ActionParamManager):
 
         Returns
         -------
-        :class:`pandas.Series`
+        :class:`SASDataFrame`
 
         '''
         return self.sort_values(columns, ascending=True).slice(0, n)
@@ -4110,7 +5234,7 @@ class CASTable(ParamManager, ActionParamManager):
         :class:`CASTable` object
 
         '''
-        dtypes = self.dtypes
+        dtypes = self._get_plan_dtypes()
         all_dtypes_len = len(dtypes)
         dtypes = dtypes[dtypes.isin(['double', 'char', 'varchar'])].to_dict()
         miss_dtypes_len = len(dtypes)
@@ -4173,7 +5297,7 @@ class CASTable(ParamManager, ActionParamManager):
         else:
             is_scalar = True
 
-        dtypes = self.dtypes
+        dtypes = self._get_plan_dtypes()
         dtypes = dtypes[dtypes.isin(['double', 'char', 'varchar'])].to_dict()
 
         code = []
@@ -4224,6 +5348,13 @@ class CASTable(ParamManager, ActionParamManager):
         method : string, optional
             Not supported
 
+        Notes
+        -----
+        Mappings containing ``cas.dataset.lookup_threshold`` or more
+        values are uploaded to a temporary lookup table and applied
+        using a data step hash object rather than a statement for
+        each value.
+
         Raises
         ------
         AssertionError
@@ -4379,14 +5510,30 @@ class CASTable(ParamManager, ActionParamManager):
             to = re.sub(r'\\(\d)', r'$\1', to)
             return _quote('s/%s/%s/%s' % (patt, to, flags))
 
+        threshold = get_option('cas.dataset.lookup_threshold')
+        lookups = []
+
         # Generate data step code
         for col, repl_dict in repl.items():
 
             # Cache column list
             if col is None and columns is None:
-                dtypes = self.dtypes
-                columns = [x[0] for x in dtypes.iteritems()]
-                dtypes = [x[1] for x in dtypes.iteritems()]
+                dtypes = self._get_plan_dtypes()
+                columns = [x[0] for x in dtypes.items()]
+                dtypes = [x[1] for x in dtypes.items()]
+
+            # Large mappings are applied using a hash object
+            lookup = self._get_replace_lookup(repl_dict, threshold)
+            if lookup is not None:
+                lookups.append(lookup)
+                code.extend(lookup.get_code())
+                if col is None:
+                    for colname, dtype in zip(columns, dtypes):
+                        if (dtype in col_char_types) == (lookup.kind == 'char'):
+                            code.extend(lookup.get_replace_code(colname))
+                else:
+                    code.extend(lookup.get_replace_code(col))
+                continue
 
             # Apply replacements for each column
             for from_, to in repl_dict.items():
@@ -4422,9 +5569,44 @@ class CASTable(ParamManager, ActionParamManager):
                                     (_nlit(col), _quote_if_string(from_),
                                      _nlit(col), _quote_if_string(to)))
 
-        return self._apply_datastep(code, inplace=inplace)
+        return self._apply_datastep(code, inplace=inplace, lookups=lookups)
 
-    def _apply_datastep(self, code, inplace=False, casout=None):
+    def _get_replace_lookup(self, repl_dict, threshold):
+        '''
+        Upload a replacement mapping to a lookup table if it is large enough
+
+        Parameters
+        ----------
+        repl_dict : dict
+            Replacements of the form {(from, is_regex): (to, is_regex)}.
+        threshold : int
+            The minimum number of replacements to use a lookup table for.
+            If zero, a lookup table is never used.
+
+        Returns
+        -------
+        :class:`_LookupTable` object
+            If the mapping was uploaded
+        None
+            If the mapping is too small, or it contains regular expressions
+            or values of mixed types
+
+        '''
+        if not threshold or len(repl_dict) < threshold:
+            return
+        keys = []
+        values = []
+        for (from_, from_is_regex), (to, to_is_regex) in repl_dict.items():
+            if from_is_regex or to_is_regex:
+                return
+            keys.append(from_)
+            values.append(to)
+        kind = _lookup_kind(keys)
+        if kind is None or _lookup_kind(values) != kind:
+            return
+        return _LookupTable(self.get_connection(), keys, values)
+
+    def _apply_datastep(self, code, inplace=False, casout=None, lookups=None):
         '''
         Apply the given data step code to the table
 
@@ -4438,6 +5620,15 @@ class CASTable(ParamManager, ActionParamManager):
 
         In all cases, the `casout=` parameter takes highest priority.
 
+        If the ``cas.dataset.deferred_datasteps`` option is enabled and
+        the output table is a generated temporary table, the data step
+        isn't run until the resulting table is used in an action.  Code
+        applied to a table whose data step hasn't been run yet is added
+        to that data step, so a chain of calls such as
+        ``tbl.fillna(0).replace(1, 2).dropna()`` runs a single data step.
+        In-place data steps and data steps that create a named table
+        are always run immediately.
+
         Parameters
         ----------
         code : string or list-of-strings
@@ -4446,6 +5637,9 @@ class CASTable(ParamManager, ActionParamManager):
             Should the table be modified in-place?
         casout : dict, optional
             The output table specification
+        lookups : list-of-_LookupTables, optional
+            The lookup tables used by `code`.  They are dropped when
+            the data step has been run.
 
         Returns
         -------
@@ -4455,45 +5649,66 @@ class CASTable(ParamManager, ActionParamManager):
         if casout is None:
             casout = {}
 
+        if isinstance(code, items_types):
+            code = list(code)
+        else:
+            code = [code]
+
+        plan = self._plan
+        if plan is not None and plan.done:
+            plan = None
+
+        # Add the code to the pending data step that creates this table.
+        # The table doesn't exist yet, so nothing else can see the change.
+        if plan is not None and inplace and not casout:
+            plan.extend(code, lookups)
+            if not get_option('cas.dataset.deferred_datasteps'):
+                self._run_plan()
+            return self
+
         if casout.get('caslib'):
             caslib = casout['caslib']
         elif inplace and 'caslib' in self.params:
             caslib = self.params['caslib']
         else:
-            caslib = self.getsessopt('caslib').caslib
+            caslib = self._get_active_caslib()
 
+        temp = None
         if casout.get('name'):
             newname = casout['name']
         elif inplace:
             newname = self.params['name']
         else:
             newname = _gen_table_name()
+            temp = self.get_connection().temp_tables.add(newname, caslib, created=False)
 
-        dscode = []
-        dscode.append('data %s(caslib=%s);' % (_quote(newname), _quote(caslib)))
-        dscode.append('    set %s(caslib=%s);' % (_quote(self.params.name),
-                                                  _quote(caslib)))
-        if isinstance(code, items_types):
-            dscode.extend(code)
+        lookups = list(lookups or [])
+        if plan is not None:
+            source = plan.source
+            code = plan.code + code
+            lookups = plan.lookups + lookups
         else:
-            dscode.append(code)
-        dscode.append('run;')
-        dscode = '\n'.join(dscode)
+            source = self.copy()
+            source._plan = None
 
-        out = self.get_connection().retrieve('datastep.runcode', code=dscode,
-                                             _apptag='UI', _messagelevel='error')
-        if out.status:
-            raise SWATError(out.status)
+        plan = _DataStepPlan(source, newname, caslib, code, lookups=lookups,
+                             temp=temp)
 
+        # Tables that already exist or are created with a given name can
+        # be used by other table objects, so those data steps run now.
         if inplace:
+            plan.run()
             return self
 
-        tbl = out['OutputCasTables'].ix[0, 'casTable']
-
         out = copy.deepcopy(self)
+        out.params['name'] = newname
+        out.params['caslib'] = caslib
+        out._cache = None
+        out._temp = temp
+        out._plan = plan
 
-        out.params['name'] = tbl.params['name']
-        out.params['caslib'] = tbl.params['caslib']
+        if casout.get('name') or not get_option('cas.dataset.deferred_datasteps'):
+            out._run_plan()
 
         return out
 
@@ -4502,6 +5717,117 @@ class CASTable(ParamManager, ActionParamManager):
 #   def pivot(self, *args, **kwargs):
 #       raise NotImplementedError
 
+    def pivot_table(self, values=None, index=None, columns=None, aggfunc='mean',
+                    fill_value=None, margins=False, dropna=True, margins_name='All'):
+        '''
+        Create a spreadsheet-style pivot table
+
+        The statistics are computed on the server by the ``simple.summary``
+        action grouped by the `index=` and `columns=` variables.  Only the
+        summary is returned to the client where it is reshaped into a
+        pivot table.
+
+        Parameters
+        ----------
+        values : string or list-of-strings, optional
+            The columns to aggregate.  By default, all numeric columns
+            that are not used in `index=` or `columns=` are used.
+        index : string or list-of-strings
+            The columns to group the rows of the pivot table by.
+        columns : string or list-of-strings, optional
+            The columns to group the columns of the pivot table by.
+        aggfunc : string or function or list, optional
+            The aggregation function or a list of them.  The names (or
+            NumPy functions) 'count', 'css', 'cv', 'kurt', 'len', 'max',
+            'mean', 'min', 'nmiss', 'sem', 'skew', 'std', 'sum', 'uss',
+            and 'var' are supported.  Unlike 'count', 'len' includes
+            rows with missing values.
+        fill_value : scalar, optional
+            The value to replace missing values with.
+        margins : boolean, optional
+            Not supported
+        dropna : boolean, optional
+            Should columns that contain only missing values be dropped?
+        margins_name : string, optional
+            Not supported
+
+        Raises
+        ------
+        ValueError
+            If `index=` is not specified or `aggfunc=` is not supported.
+
+        Examples
+        --------
+        >>> tbl.pivot_table(values='MSRP', index='Origin', columns='Type',
+        ...                 aggfunc='mean')
+
+        See Also
+        --------
+        :meth:`pandas.DataFrame.pivot_table`
+
+        Returns
+        -------
+        :class:`pandas.DataFrame`
+
+        '''
+        if margins:
+            raise NotImplementedError('The margins= parameter is not supported')
+
+        index = [x for x in _flatten([index]) if x]
+        columns = [x for x in _flatten([columns]) if x]
+        if not index:
+            raise ValueError('The index= parameter must be specified')
+
+        aggfuncs = aggfunc
+        if not isinstance(aggfunc, items_types):
+            aggfuncs = [aggfunc]
+        stats = []
+        for func in aggfuncs:
+            name = getattr(func, '__name__', func)
+            if name not in PIVOT_STATS:
+                raise ValueError('Unsupported aggregation function: %s' % name)
+            stats.append(name)
+
+        groups = index + columns
+        if values is None:
+            grpset = set(x.lower() for x in groups)
+            invalues = [x for x in self.select_dtypes(include='numeric').columns
+                        if x.lower() not in grpset]
+        else:
+            invalues = list(_flatten([values]))
+
+        tbl = self.copy()
+        tbl.set_param('groupby', groups)
+        summ = tbl._summary(inputs=invalues,
+                            subset=sorted(set(stat for x in stats
+                                              for stat, _ in PIVOT_STATS[x])))
+        summ.index.names = groups + [None]
+
+        frames = []
+        for name in stats:
+            # Statistics such as 'len' are the sum of several summary statistics
+            part = sum(summ.xs(row, level=-1) for _, row in PIVOT_STATS[name])
+            part.columns.name = None
+            if columns:
+                part = part.unstack(list(range(len(index), len(groups))))
+            frames.append(part)
+
+        if isinstance(aggfunc, items_types):
+            out = pd.concat(frames, axis=1, keys=stats)
+        else:
+            out = frames[0]
+
+        # A single value column is not included in the column labels
+        if columns and not isinstance(values, (items_types, type(None))):
+            out.columns = out.columns.droplevel(out.columns.nlevels - len(columns) - 1)
+
+        out = out.sort_index()
+        if dropna:
+            out = out.dropna(axis=1, how='all')
+        if fill_value is not None:
+            out = out.fillna(fill_value)
+        return out
+
 #   def reorder_levels(self, *args, **kwargs):
 #       raise NotImplementedError
 
@@ -4586,7 +5912,9 @@ class CASTable(ParamManager, ActionParamManager):
 
         The parameters to this method are the same as the `table.view`
         action.  `self` will automatically be added as the `tables=`
-        parameter.
+        parameter.  If no name is given, a temporary view is created.
+        It is dropped when the last :class:`CASTable` object that refers
+        to it is released.
 
         Returns
         -------
@@ -4595,16 +5923,109 @@ class CASTable(ParamManager, ActionParamManager):
         '''
         kwargs = kwargs.copy()
         kwargs['tables'] = [self.to_table_params()]
-        if not args and 'name' not in kwargs:
+        temp = not args and 'name' not in kwargs
+        if temp:
             kwargs['name'] = _gen_table_name()
-        out = self._retrieve('table.view', *args, **kwargs)
-        if 'caslib' in out and 'viewName' in out:
+        results = self._retrieve('table.view', *args, **kwargs)
+        if 'caslib' in results and 'viewName' in results:
             conn = self.get_connection()
-            out = conn.CASTable(out['viewName'], caslib=out['caslib'])
+            out = conn.CASTable(results['viewName'], caslib=results['caslib'])
             out._sortby = list(self._sortby)
+            if temp:
+                # The view keeps the temporary tables that it reads from
+                out._temp = conn.temp_tables.add(results['viewName'], results['caslib'],
+                                                 results=results,
+                                                 sources=[self._temp, self._cache and
+                                                          self._cache.temp])
             return out
         raise SWATError('No output table was returned')
 
+    def cache(self):
+        '''
+        Store the data of the table in a temporary table
+
+        The ``where``, computed variables, and selected columns of the
+        table are applied once, and the result is stored in a temporary
+        in-memory table using the ``table.partition`` action.  The table
+        parameters of `self` are changed to refer to the temporary table,
+        so later actions on the table (and copies of it) don't compute
+        them again.
+
+        The temporary table is dropped when `self` and all of the
+        :class:`CASTable` objects that refer to it are garbage collected,
+        or when :meth:`uncache` is called.  It is only visible in the
+        current session, so it is also dropped when the session is closed.
+
+        Examples
+        --------
+        >>> tbl = conn.CASTable('cars', where='MSRP > 40000')
+        >>> tbl['Ratio'] = tbl.MSRP / tbl.Invoice
+        >>> tbl.cache()
+        >>> tbl.summary()
+        >>> tbl.percentile()
+
+        See Also
+        --------
+        :meth:`uncache`
+
+        Returns
+        -------
+        :class:`CASTable` object
+            `self`
+
+        '''
+        if self._cache is not None:
+            return self
+
+        params = copy.deepcopy(self.params)
+        results = self._retrieve('table.partition',
+                                 casout=dict(name=_gen_table_name(), replace=True))
+        out = results['casTable']
+
+        for key in list(self.params.keys()):
+            if key.lower() in CACHE_PARAMS:
+                del self.params[key]
+
+        self.params['name'] = out.params['name']
+        if out.params.get('caslib'):
+            self.params['caslib'] = out.params['caslib']
+
+        temp = self.get_connection().temp_tables.add(out.params['name'],
+                                                     out.params.get('caslib'),
+                                                     results=results)
+        self._cache = _TableCache(temp, params)
+
+        return self
+
+    persist = cache
+
+    def uncache(self):
+        '''
+        Stop using the temporary table created by :meth:`cache`
+
+        The table parameters of `self` are restored to those that were
+        used before the table was cached.  The temporary table is
+        dropped if no other :class:`CASTable` objects refer to it.
+
+        See Also
+        --------
+        :meth:`cache`
+
+        Returns
+        -------
+        :class:`CASTable` object
+            `self`
+
+        '''
+        if self._cache is None:
+            return self
+        self.params.clear()
+        self.params.update(copy.deepcopy(self._cache.params))
+        self._cache = None
+        return self
+
+    unpersist = uncache
+
 #   def to_panel(self, *args, **kwargs):
 #       raise NotImplementedError
 
@@ -4613,17 +6034,400 @@ class CASTable(ParamManager, ActionParamManager):
 
     # Combining / joining / merging
 
-#   def append(self, other, **kwargs):
-#       raise NotImplementedError
+    def append(self, other, ignore_index=False, verify_integrity=False,
+               sort=None, view=False, casout=None):
+        '''
+        Append the rows of other tables to the rows of this table
+
+        The tables are concatenated on the server by a single data step
+        that reads all of the tables in one ``set`` statement.  Columns
+        that exist in only some of the tables contain missing values in
+        the rows of the other tables.  Character columns are given the
+        longest length of that column in any of the tables.
+
+        If `view=True` is specified, a view of all of the tables is
+        created using the ``table.view`` action rather than copying
+        the data.  In that case, the columns of all of the tables must
+        have the same types.
+
+        Parameters
+        ----------
+        other : CASTable or list-of-CASTables
+            The tables to append.
+        ignore_index : boolean, optional
+            Not supported
+        verify_integrity : boolean, optional
+            Not supported
+        sort : boolean, optional
+            Not supported
+        view : boolean, optional
+            Should a view be created rather than a new table?
+        casout : string or dict or CASTable, optional
+            The output table specification.  By default, a table with a
+            generated name is created in the active CASLib.
+
+        Raises
+        ------
+        TypeError
+            If any of the tables is not a CASTable, or if a column has
+            incompatible types in different tables.
+
+        Examples
+        --------
+        >>> out = jan.append([feb, mar])
+        >>> out = swat.concat([jan, feb, mar], view=True)
+
+        See Also
+        --------
+        :func:`swat.concat`
+
+        Returns
+        -------
+        :class:`CASTable` object
+
+        '''
+        if isinstance(other, items_types):
+            tables = [self] + list(other)
+        else:
+            tables = [self, other]
+
+        for tbl in tables:
+            if not isinstance(tbl, CASTable):
+                raise TypeError('Can only append CASTable objects, not %s' % type(tbl))
+
+        casout = self._get_output_params(casout)
+        conn = self.get_connection()
+
+        if view:
+            tblparams = []
+            for tbl in tables:
+                params = tbl.to_table_params()
+                if tbl._columns:
+                    params['vars'] = tbl.get_inputs_param()
+                tblparams.append(params)
+            kwargs = {}
+            if casout.get('replace'):
+                kwargs['replace'] = True
+            out = conn.retrieve('table.view', name=casout['name'],
+                                caslib=casout['caslib'], tables=tblparams,
+                                _apptag='UI', _messagelevel='error', **kwargs)
+            if out.severity > 1:
+                raise SWATError(out.status)
+            return conn.CASTable(casout['name'], caslib=casout['caslib'])
+
+        lengths = _get_concat_lengths([tbl._columninfo for tbl in tables])
+
+        views = []
+        try:
+            sources = []
+            for tbl in tables:
+                params = tbl._get_source_params(views)
+                options = []
+                if params['caslib']:
+                    options.append('caslib=%s' % _quote(params['caslib']))
+                if tbl._columns:
+                    options.append('keep=%s' % ' '.join(_nlit(x) for x in tbl._columns))
+                source = _quote(params['name'])
+                if options:
+                    source = '%s(%s)' % (source, ' '.join(options))
+                sources.append(source)
+
+            code = []
+            code.append('data %s(caslib=%s);' % (_quote(casout['name']),
+                                                 _quote(casout['caslib'])))
+            if lengths:
+                code.append('    length %s;' % ' '.join(lengths))
+            code.append('    set %s;' % ' '.join(sources))
+            code.append('run;')
+
+            out = conn.retrieve('datastep.runcode', code='\n'.join(code),
+                                _apptag='UI', _messagelevel='error')
+            if out.status:
+                raise SWATError(out.status)
+
+        finally:
+            _drop_tables(views)
+
+        return conn.CASTable(casout['name'], caslib=casout['caslib'])
 
 #   def assign(self, **kwargs):
 #       raise NotImplementedError
 
-#   def join(self, other, **kwargs):
-#       raise NotImplementedError
+    def join(self, other, on=None, how='left', lsuffix='', rsuffix='',
+             sort=False, casout=None):
+        '''
+        Join columns of another CASTable on the given key columns
 
-#   def merge(self, right, **kwargs):
-#       raise NotImplementedError
+        CAS tables do not have an index, so the tables are joined on the
+        `on=` columns, which must exist in both tables.  See
+        :meth:`merge` for details of how the join is done.
+
+        Parameters
+        ----------
+        other : CASTable
+            The table to join with.
+        on : string or list-of-strings
+            The key columns.
+        how : string, optional
+            The type of join: 'left', 'right', 'outer', or 'inner'.
+        lsuffix : string, optional
+            The suffix to add to overlapping column names from `self`.
+        rsuffix : string, optional
+            The suffix to add to overlapping column names from `other`.
+        sort : boolean, optional
+            Not supported
+        casout : string or dict or CASTable, optional
+            The output table specification.
+
+        Raises
+        ------
+        ValueError
+            If `on=` isn't specified, or if columns overlap and no
+            suffix is specified.
+
+        See Also
+        --------
+        :meth:`merge`
+
+        Returns
+        -------
+        :class:`CASTable` object
+
+        '''
+        if on is None:
+            raise ValueError('CAS tables do not have an index; the on= parameter '
+                             'must be specified')
+        return self.merge(other, how=how, on=on, suffixes=(lsuffix, rsuffix),
+                          casout=casout)
+
+    def merge(self, right, how='inner', on=None, left_on=None, right_on=None,
+              left_index=False, right_index=False, sort=False,
+              suffixes=('_x', '_y'), copy=True, casout=None):
+        '''
+        Merge CASTable objects using a database-style join on columns
+
+        The join is done on the server by a ``CREATE TABLE ... AS SELECT``
+        statement run by the ``fedsql.execdirect`` action.  If a table has
+        a where clause, computed columns, or other table parameters, a
+        temporary view is created for it using :meth:`to_view`, so the
+        data is never transferred to the client.
+
+        Parameters
+        ----------
+        right : CASTable
+            The table to merge with.
+        how : string, optional
+            The type of join: 'inner', 'left', 'right', or 'outer'.
+        on : string or list-of-strings, optional
+            The key columns, which must exist in both tables.  If `on=`,
+            `left_on=`, and `right_on=` are not specified, the columns
+            common to both tables are used.
+        left_on : string or list-of-strings, optional
+            The key columns of `self`.
+        right_on : string or list-of-strings, optional
+            The key columns of `right`.
+        left_index : boolean, optional
+            Not supported
+        right_index : boolean, optional
+            Not supported
+        sort : boolean, optional
+            Not supported
+        suffixes : two-element tuple, optional
+            The suffixes to add to overlapping column names from `self`
+            and `right`, respectively.
+        copy : boolean, optional
+            Not supported
+        casout : string or dict or CASTable, optional
+            The output table specification.  By default, a table with a
+            generated name is created in the active CASLib.
+
+        Raises
+        ------
+        TypeError
+            If `right` is not a CASTable.
+        ValueError
+            If the key columns or join type are invalid, or if columns
+            overlap and no suffixes are specified.
+
+        Examples
+        --------
+        >>> out = orders.merge(customers, on='custid', how='left')
+        >>> out = orders.merge(customers, left_on='cust', right_on='id')
+
+        See Also
+        --------
+        :meth:`pandas.DataFrame.merge`
+
+        Returns
+        -------
+        :class:`CASTable` object
+
+        '''
+        if not isinstance(right, CASTable):
+            raise TypeError('Can only merge CASTable objects, not %s' % type(right))
+
+        if left_index or right_index:
+            raise ValueError('CAS tables do not have an index; use the on=, '
+                             'left_on=, or right_on= parameters')
+
+        how = how.lower()
+        if how not in JOIN_TYPES:
+            raise ValueError('The how= parameter must be one of: %s' %
+                             ', '.join(sorted(JOIN_TYPES.keys())))
+
+        left_columns = list(self._columns or self.columns)
+        right_columns = list(right._columns or right.columns)
+
+        if on is not None:
+            if left_on is not None or right_on is not None:
+                raise ValueError('The on= parameter can not be used with the '
+                                 'left_on= or right_on= parameters')
+            left_on = right_on = on
+        elif left_on is None and right_on is None:
+            rset = set(x.lower() for x in right_columns)
+            left_on = right_on = [x for x in left_columns if x.lower() in rset]
+            if not left_on:
+                raise ValueError('No common columns to perform merge on')
+        elif left_on is None or right_on is None:
+            raise ValueError('The left_on= and right_on= parameters must '
+                             'both be specified')
+
+        if not isinstance(left_on, items_types):
+            left_on = [left_on]
+        if not isinstance(right_on, items_types):
+            right_on = [right_on]
+        left_on = list(left_on)
+        right_on = list(right_on)
+        if len(left_on) != len(right_on):
+            raise ValueError('len(right_on) must equal len(left_on)')
+
+        lset = set(x.lower() for x in left_columns)
+        rset = set(x.lower() for x in right_columns)
+        missing = [x for x in left_on if x.lower() not in lset]
+        missing += [x for x in right_on if x.lower() not in rset]
+        if missing:
+            raise ValueError('Key columns do not exist: %s' % ', '.join(missing))
+
+        # Key columns with the same name in both tables become one column
+        merged = dict((x.lower(), y) for x, y in zip(left_on, right_on)
+                      if x.lower() == y.lower())
+
+        lsuffix, rsuffix = [x or '' for x in suffixes]
+        overlap = (lset & rset) - set(merged.keys())
+        if overlap and not lsuffix and not rsuffix:
+            raise ValueError('Columns overlap but no suffix specified: %s' %
+                             ', '.join(sorted(overlap)))
+
+        select = []
+        for col in left_columns:
+            lcol = col.lower()
+            if lcol in merged:
+                lexpr = 'L.%s' % _fedsql_ident(col)
+                rexpr = 'R.%s' % _fedsql_ident(merged[lcol])
+                if how == 'right':
+                    lexpr = rexpr
+                elif how == 'outer':
+                    lexpr = 'COALESCE(%s, %s)' % (lexpr, rexpr)
+                select.append('%s AS %s' % (lexpr, _fedsql_ident(col)))
+            elif lcol in overlap:
+                select.append('L.%s AS %s' % (_fedsql_ident(col),
+                                              _fedsql_ident(col + lsuffix)))
+            else:
+                select.append('L.%s' % _fedsql_ident(col))
+        for col in right_columns:
+            lcol = col.lower()
+            if lcol in merged:
+                continue
+            if lcol in overlap:
+                select.append('R.%s AS %s' % (_fedsql_ident(col),
+                                              _fedsql_ident(col + rsuffix)))
+            else:
+                select.append('R.%s' % _fedsql_ident(col))
+
+        condition = ' AND '.join('L.%s = R.%s' % (_fedsql_ident(x), _fedsql_ident(y))
+                                 for x, y in zip(left_on, right_on))
+
+        casout = self._get_output_params(casout)
+
+        options = ''
+        if casout.get('replace'):
+            options = ' {options replace=true}'
+
+        conn = self.get_connection()
+        views = []
+
+        try:
+            query = 'CREATE TABLE %s%s AS SELECT %s FROM %s AS L %s %s AS R ON %s' % \
+                    (_fedsql_table(casout), options, ', '.join(select),
+                     _fedsql_table(self._get_source_params(views)), JOIN_TYPES[how],
+                     _fedsql_table(right._get_source_params(views)), condition)
+
+            conn.retrieve('builtins.loadactionset', actionset='fedsql',
+                          _apptag='UI', _messagelevel='error')
+            out = conn.retrieve('fedsql.execdirect', query=query,
+                                _apptag='UI', _messagelevel='error')
+            if out.severity > 1:
+                raise SWATError(out.status)
+
+        finally:
+            _drop_tables(views)
+
+        return conn.CASTable(casout['name'], caslib=casout['caslib'])
+
+    def _get_output_params(self, casout=None):
+        '''
+        Return the name and CASLib of an output table
+
+        Parameters
+        ----------
+        casout : string or dict or CASTable, optional
+            The output table specification.  If the name is not
+            specified, a name is generated.  If the CASLib is not
+            specified, the active CASLib is used.
+
+        Returns
+        -------
+        dict
+            Output table parameters with lower-cased keys
+
+        '''
+        if casout is None:
+            casout = {}
+        elif isinstance(casout, CASTable):
+            casout = casout.to_outtable_params()
+        elif isinstance(casout, (text_types, binary_types)):
+            casout = {'name': casout}
+        casout = dict((k.lower(), v) for k, v in casout.items())
+        casout.setdefault('name', _gen_table_name())
+        if not casout.get('caslib'):
+            casout['caslib'] = self._get_active_caslib()
+        return casout
+
+    def _get_source_params(self, views):
+        '''
+        Return the name and CASLib of a table containing the table data
+
+        Actions such as ``fedsql.execdirect`` and ``datastep.runcode``
+        do not apply table parameters such as where clauses and computed
+        columns.  If the table has such parameters, a view is created
+        that applies them and the view is returned instead.
+
+        Parameters
+        ----------
+        views : list
+            The list to add created views to.  The caller must drop them.
+
+        Returns
+        -------
+        dict
+
+        '''
+        params = self.to_table_params()
+        if set(x.lower() for x in params.keys()) - set(['name', 'caslib']):
+            view = self.to_view()
+            views.append(view)
+            params = view.params
+        return dict(name=params['name'], caslib=params.get('caslib'))
 
 #   def update(self, other, **kwargs):
 #       raise NotImplementedError
@@ -4684,8 +6488,6 @@ class CASTable(ParamManager, ActionParamManager):
         :class:`SASDataFrame`
 
         '''
-        from .. import dataframe as df
-
         kwargs = kwargs.copy()
         groups = self.get_groupby_vars()
 
@@ -4730,19 +6532,10 @@ class CASTable(ParamManager, ActionParamManager):
         tbl = self._sample(sample_pct=sample_pct, sample_seed=sample_seed,
                            stratify_by=stratify_by, columns=columns)
 
-        # Sort based on 'Fetch#' key.  This will be out of order in REST.
-        values = [x[1] for x in sorted(tbl._retrieve('table.fetch', **kwargs).items(),
-                                       key=lambda x: int(x[0].replace('Fetch', '') or
-                                                         '0'))]
-        out = df.concat(values)
+        out = _concat_fetched([tbl._retrieve('table.fetch', **kwargs)])
 
         if tbl is not self:
-            tbl._retrieve('table.droptable')
-
-        if len(out.columns) and out.columns[0] == '_Index_':
-            out['_Index_'] = out['_Index_'] - 1
-            out = out.set_index('_Index_')
-            out.index.name = None
+            _drop_tables([tbl])
 
         if grouped and groups:
             return out.groupby(groups)
@@ -4780,11 +6573,15 @@ class CASTable(ParamManager, ActionParamManager):
         if sample_seed is not None:
             params['seed'] = sample_seed
 
-        out = samptbl._retrieve(action_name,
-                                output=dict(casout=dict(name=_gen_table_name(),
-                                                        replace=True),
-                                            copyvars=columns),
-                                **params)['OutputCasTables'].ix[0, 'casTable']
+        results = samptbl._retrieve(action_name,
+                                    output=dict(casout=dict(name=_gen_table_name(),
+                                                            replace=True),
+                                                copyvars=columns),
+                                    **params)
+        out = results['OutputCasTables'].ix[0, 'casTable']
+        out._temp = self.get_connection().temp_tables.add(out.params['name'],
+                                                          out.params.get('caslib'),
+                                                          results=results)
 
         if stratify_by:
             del samptbl.params['groupby']
@@ -4804,6 +6601,98 @@ class CASTable(ParamManager, ActionParamManager):
                            sample_seed=sample_seed, sample=sample,
                            stratify_by=stratify_by, **kwargs)
 
+    def _fetch_rows(self, rows):
+        '''
+        Fetch the rows at the given positions
+
+        Each run of consecutive positions is fetched as one ``from=`` /
+        ``to=`` window of the ``table.fetch`` action, so only the
+        requested rows are transferred.  The windows are fetched by
+        separate actions that are called together in one batch.  The
+        number of rows in the table is only retrieved if negative
+        positions are used.
+
+        Parameters
+        ----------
+        rows : slice or list-of-ints
+            The row positions.  Negative positions count from the end
+            of the table.  A slice with a step of one is fetched as a
+            single window.
+
+        Raises
+        ------
+        IndexError
+            If a position in a list is out of bounds.
+
+        Returns
+        -------
+        :class:`SASDataFrame`
+            The rows in the requested order indexed by their positions
+
+        '''
+        numrows = None
+        positions = None
+        windows = []
+
+        if isinstance(rows, slice):
+            start, stop, step = rows.start, rows.stop, rows.step
+            if (start or 0) < 0 or (stop or 0) < 0 or (step or 1) != 1:
+                numrows = self._numrows
+                start, stop, step = rows.indices(numrows)
+            if step == 1 or step is None:
+                start = start or 0
+                if stop is None:
+                    windows.append((start, min(start + get_option('cas.dataset.'
+                                                                  'max_rows_fetched'),
+                                               MAX_INT64_INDEX) - 1))
+                elif stop > start:
+                    windows.append((start, stop - 1))
+            else:
+                rows = list(range(start, stop, step))
+
+        if not isinstance(rows, slice):
+            positions = []
+            for pos in rows:
+                if pos < 0:
+                    if numrows is None:
+                        numrows = self._numrows
+                    if pos + numrows < 0:
+                        raise IndexError('index %s is out of bounds for axis 0 '
+                                         'with size %s' % (pos, numrows))
+                    pos = pos + numrows
+                positions.append(pos)
+
+            for pos in sorted(set(positions)):
+                if windows and windows[-1][1] == pos - 1:
+                    windows[-1] = (windows[-1][0], pos)
+                else:
+                    windows.append((pos, pos))
+
+        tbl = self.copy(exclude='groupby')
+
+        if not windows:
+            return tbl._fetch(from_=1, to=1).iloc[:0]
+
+        with self.get_connection().batch() as batch:
+            queued = [batch.retrieve('table.fetch', __table__=tbl, to=stop + 1,
+                                     index=True, _apptag='UI', _messagelevel='error',
+                                     **{'from': start + 1})
+                      for start, stop in windows]
+
+        out = _concat_fetched([batch.results[idx] for idx in queued])
+
+        if positions is None:
+            return out
+
+        missing = set(positions).difference(out.index)
+        if missing:
+            if numrows is None:
+                numrows = self._numrows
+            raise IndexError('index %s is out of bounds for axis 0 with size %s' %
+                             (min(missing), numrows))
+
+        return out.loc[positions]
+
     # Plotting
 
     def boxplot(self, column=None, by=None, **kwargs):
@@ -5707,9 +7596,17 @@ class CASTable(ParamManager, ActionParamManager):
 
         # tbl[CASColumn]
         if isinstance(key, CASColumn):
-            out = self.copy()
+            # Large isin value sets select rows with a data step that
+            # looks the values up in a temporary table
+            if key._isin is not None and \
+                    key._isin[0] not in self.get_param('computedvars', []):
+                lookup = _LookupTable(self.get_connection(), key._isin[1])
+                code = lookup.get_code() + lookup.get_filter_code(key._isin[0])
+                return self._apply_datastep(code, lookups=[lookup])
+
             expr, ecomputedvars, ecomputedvarsprogram = key._to_expression()
 
+            out = self.copy()
             out.append_where(expr)
 
             if ecomputedvars:
@@ -5725,11 +7622,11 @@ class CASTable(ParamManager, ActionParamManager):
 
         # tbl[rowslice]
         if isinstance(key, slice):
-            return self.ix[key]
+            return self._iloc[key]
 
         # col[row]
         if is_column and isinstance(key, int_types):
-            return self.ix[key]
+            return self._at[key]
 
         # Everything else
         raise KeyError(key)
@@ -7501,11 +9398,47 @@ class CASColumn(CASTable):
         return self.eq(other)
 
     def isin(self, values):
-        ''' Return a boolean CASColumn indicating if the value is in the given values '''
-        if not isinstance(values, items_types):
+        '''
+        Return a boolean CASColumn indicating if the value is in the given values
+
+        If there are ``cas.dataset.lookup_threshold`` or more values and
+        the result is used directly to select rows of a table (e.g.,
+        ``tbl[tbl.col.isin(values)]``), the values are uploaded to a
+        temporary lookup table.  The rows are then selected by a data
+        step that uses a hash object rather than an ``in`` expression
+        containing every value.  In all other cases, the ``in``
+        expression is used.
+
+        Parameters
+        ----------
+        values : list or CASColumn or Series or scalar
+            The values to check for
+
+        Returns
+        -------
+        :class:`CASColumn`
+
+        '''
+        if isinstance(values, (CASColumn, pd.Series)):
             values = [values]
-        return self._compute('isin', '({value} in {values})',
-                             values=values, eval_values=True)
+        elif not isinstance(values, items_types):
+            values = [values]
+
+        items = []
+        for item in values:
+            if isinstance(item, (CASColumn, pd.Series)):
+                items.extend(item.unique().tolist())
+            else:
+                items.append(item)
+
+        out = self._compute('isin', '({value} in {values})', values=items)
+
+        threshold = get_option('cas.dataset.lookup_threshold')
+        if threshold and len(items) >= threshold and _lookup_kind(items) and \
+                self.name not in self.get_param('computedvars', []):
+            out._isin = (self.name, items)
+
+        return out
 
     def __invert__(self):
         return self._compute('invert', '(^({value}))')
@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Registry of the temporary tables created by a CAS session
+
+'''
+
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import collections
+import contextlib
+import itertools
+import threading
+import warnings
+import weakref
+from ..config import get_option_snapshot
+
+# Current option values
+_options = get_option_snapshot()
+
+
+class CASTempTable(object):
+    '''
+    Handle of a temporary table
+
+    The table is dropped after the last reference to the handle is
+    released.  :class:`CASTable` objects that use the table (and copies
+    of them) hold a reference to the handle.
+
+    Parameters
+    ----------
+    key : int
+        The key of the table in the registry
+    name : string
+        The name of the table
+    caslib : string, optional
+        The caslib of the table
+    sources : list of CASTempTable objects, optional
+        Temporary tables that the table depends on (e.g., the tables
+        used by a view).  They are kept until the table is dropped.
+
+    Returns
+    -------
+    CASTempTable object
+
+    '''
+
+    def __init__(self, key, name, caslib=None, sources=None):
+        self.key = key
+        self.name = name
+        self.caslib = caslib
+        self.sources = [x for x in (sources or []) if x is not None]
+
+    def __repr__(self):
+        return 'CASTempTable(%r, caslib=%r)' % (self.name, self.caslib)
+
+
+class CASTempTables(object):
+    '''
+    Registry of the temporary tables created by a connection
+
+    Tables generated by :class:`CASTable` methods (samples, views,
+    data step outputs, cached tables, etc.) are registered here.  When
+    the :class:`CASTempTable` handle of a table is garbage collected,
+    the table is queued to be dropped.  Queued tables are dropped
+    together, in one batch of ``table.droptable`` actions, before the
+    next action is called on the connection (or when :meth:`flush` is
+    called).
+
+    The memory used by the registered tables is approximated by the
+    ``memory`` performance metric of the actions that created them.
+    If it exceeds the ``cas.dataset.temp_table_memory_limit`` option,
+    a :class:`RuntimeWarning` is issued.
+
+    Parameters
+    ----------
+    connection : CAS object
+        The connection that the tables belong to
+
+    Returns
+    -------
+    CASTempTables object
+
+    '''
+
+    def __init__(self, connection):
+        self._connection = weakref.ref(connection)
+        self._tables = collections.OrderedDict()
+        self._refs = {}
+        self._pending = collections.deque()
+        self._scopes = []
+        self._keys = itertools.count()
+        self._lock = threading.RLock()
+        self._over_limit = False
+
+    def __len__(self):
+        return len(self._tables)
+
+    def __contains__(self, handle):
+        return getattr(handle, 'key', None) in self._tables
+
+    @property
+    def memory(self):
+        ''' The memory used by the registered tables '''
+        return sum(x['memory'] for x in list(self._tables.values()))
+
+    @property
+    def pending(self):
+        ''' The number of tables waiting to be dropped '''
+        return len(self._pending)
+
+    def add(self, name, caslib=None, results=None, sources=None, created=True):
+        '''
+        Register a temporary table
+
+        Parameters
+        ----------
+        name : string
+            The name of the table
+        caslib : string, optional
+            The caslib of the table
+        results : CASResults object, optional
+            The results of the action that created the table.  The
+            memory used by the action is recorded.
+        sources : list of CASTempTable objects, optional
+            Temporary tables that the table depends on
+        created : bool, optional
+            Has the table been created yet?  Tables that have not been
+            created (e.g., outputs of deferred data steps) are not dropped
+            until :meth:`update` is called.
+
+        Returns
+        -------
+        :class:`CASTempTable` object
+            The handle to keep for as long as the table is used
+
+        '''
+        key = next(self._keys)
+        handle = CASTempTable(key, name, caslib=caslib, sources=sources)
+        pending = self._pending
+        with self._lock:
+            self._tables[key] = dict(name=name, caslib=caslib, created=created,
+                                     memory=_get_memory(results))
+            # The callback must not refer to self, it may run during garbage collection
+            self._refs[key] = weakref.ref(handle, lambda ref, key=key: pending.append(key))
+            if self._scopes:
+                self._scopes[-1].append(key)
+        self._check_memory()
+        return handle
+
+    def update(self, handle, results=None):
+        '''
+        Record that a registered table has been created
+
+        Parameters
+        ----------
+        handle : CASTempTable object
+            The handle of the table
+        results : CASResults object, optional
+            The results of the action that created the table
+
+        '''
+        with self._lock:
+            info = self._tables.get(handle.key)
+            if info is None:
+                return
+            info['created'] = True
+            info['memory'] = _get_memory(results)
+        self._check_memory()
+
+    def _check_memory(self):
+        ''' Warn if the registered tables use more memory than allowed '''
+        limit = _options['cas.dataset.temp_table_memory_limit']
+        memory = self.memory
+        over_limit = limit > 0 and memory > limit
+        if over_limit and not self._over_limit:
+            warnings.warn('Temporary tables of this session use %d bytes, which exceeds '
+                          'the cas.dataset.temp_table_memory_limit option of %d bytes.  '
+                          'Release unused CASTable objects or use temp_scope() to drop '
+                          'them sooner.' % (memory, limit), RuntimeWarning)
+        self._over_limit = over_limit
+
+    def drop(self, handles=None):
+        '''
+        Drop registered tables and the tables waiting to be dropped
+
+        All of the tables are dropped together in one batch of actions.
+
+        Parameters
+        ----------
+        handles : list of CASTempTable objects, optional
+            The tables to drop in addition to the queued tables
+
+        '''
+        self._drop([x.key for x in (handles or []) if x is not None])
+
+    def _drop(self, keys):
+        ''' Drop the tables with the given keys and the queued tables '''
+        keys = list(keys)
+        with self._lock:
+            while self._pending:
+                keys.append(self._pending.popleft())
+            tables = []
+            for key in keys:
+                self._refs.pop(key, None)
+                info = self._tables.pop(key, None)
+                if info is not None and info['created']:
+                    tables.append(info)
+
+        if not tables:
+            return
+
+        conn = self._connection()
+        if conn is None:
+            return
+
+        with conn.batch() as batch:
+            for info in tables:
+                batch.retrieve('table.droptable', name=info['name'],
+                               caslib=info['caslib'], _apptag='UI',
+                               _messagelevel='error')
+
+        self._check_memory()
+
+    def flush(self):
+        ''' Drop the tables whose handles have been garbage collected '''
+        if self._pending:
+            self.drop()
+
+    @contextlib.contextmanager
+    def scope(self):
+        '''
+        Drop the tables registered within a ``with`` block when it exits
+
+        Tables registered within the block are dropped when it exits
+        even if they are still referenced by :class:`CASTable` objects.
+
+        '''
+        keys = []
+        with self._lock:
+            self._scopes.append(keys)
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._scopes.remove(keys)
+            self._drop(keys)
+
+    def clear(self):
+        ''' Forget all registered tables without dropping them '''
+        with self._lock:
+            self._tables.clear()
+            self._refs.clear()
+            self._pending.clear()
+
+
+def _get_memory(results):
+    ''' Return the memory used by the action that returned `results` '''
+    try:
+        return int(getattr(getattr(results, 'performance', None), 'memory', 0) or 0)
+    except Exception:
+        return 0
@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Thread-safe access to CAS sessions
+
+'''
+
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import contextlib
+import threading
+from six.moves import queue
+from ..exceptions import SWATError
+from ..utils.compat import a2n
+
+
+class _ActionCaller(object):
+    '''
+    Callable that runs an action through a ThreadSafeCAS object
+
+    Attribute access extends the action name so that both
+    ``conn.summary(...)`` and ``conn.simple.summary(...)`` work.
+    Only the names of actions in the action set are allowed.
+
+    '''
+
+    def __init__(self, connection, name):
+        self._connection = connection
+        self._name = name
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        fullname = '%s.%s' % (self._name, name)
+        if '.' in self._name or not self._connection._has_action(fullname):
+            raise AttributeError(name)
+        return type(self)(self._connection, fullname)
+
+    def __call__(self, **kwargs):
+        return self._connection.retrieve(self._name, **kwargs)
+
+
+class ThreadSafeCAS(object):
+    '''
+    Thread-safe wrapper around CAS sessions
+
+    A CAS session can only run one action at a time, so a :class:`CAS`
+    object can not be used by multiple threads concurrently.  This
+    wrapper serializes actions from multiple threads on the given
+    connection.  If `pool_size` is greater than one, additional
+    sessions are created (using :meth:`CAS.copy`) as needed, up to
+    `pool_size` sessions in total, so that up to `pool_size` actions
+    can run concurrently.
+
+    Parameters
+    ----------
+    connection : CAS object
+        The connection to wrap
+    pool_size : int, optional
+        The maximum number of sessions to use
+
+    Notes
+    -----
+    Each action may be run on a different session.  Operations that
+    depend on session state (e.g., session-scope tables or a sequence
+    of actions on a :class:`CASTable`) should be run in a
+    :meth:`session` block, which gives the current thread exclusive
+    use of a single session.
+
+    Examples
+    --------
+    >>> conn = swat.ThreadSafeCAS(swat.CAS(), pool_size=4)
+    >>> out = conn.retrieve('table.tableinfo', caslib='public')
+    >>> out = conn.simple.summary(table=dict(name='cars', caslib='public'))
+
+    >>> with conn.session() as sess:
+    ...     tbl = sess.upload_frame(df)
+    ...     print(tbl.summary())
+
+    Returns
+    -------
+    ThreadSafeCAS object
+
+    '''
+
+    def __init__(self, connection, pool_size=1):
+        if int(pool_size) < 1:
+            raise ValueError('pool_size must be a positive integer')
+        self._connection = connection
+        self._pool_size = int(pool_size)
+        self._sessions = [connection]
+        self._idle = queue.Queue()
+        self._idle.put(connection)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def __getattr__(self, name):
+        if name.startswith('_') or not (self._has_action(name) or
+                                        self._has_actionset(name)):
+            raise AttributeError(name)
+        return _ActionCaller(self, name)
+
+    def _get_sessions(self):
+        ''' Return the sessions created so far '''
+        with self._lock:
+            return list(self._sessions)
+
+    def _has_action(self, name):
+        ''' Does an action with the given name exist in any session? '''
+        name = name.lower()
+        return any(x.has_action(name) for x in self._get_sessions())
+
+    def _has_actionset(self, name):
+        ''' Does an action set with the given name exist in any session? '''
+        name = name.lower()
+        return any(x.has_actionset(name) for x in self._get_sessions())
+
+    def _acquire(self):
+        ''' Get an idle session, creating a new one if allowed '''
+        if self._closed:
+            raise SWATError('The ThreadSafeCAS object has been closed')
+
+        try:
+            return self._idle.get(block=False)
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._sessions) < self._pool_size:
+                conn = self._connection.copy()
+                self._sessions.append(conn)
+                return conn
+
+        return self._idle.get()
+
+    def _release(self, conn):
+        ''' Return a session to the pool '''
+        self._idle.put(conn)
+
+    @contextlib.contextmanager
+    def session(self):
+        '''
+        Give the current thread exclusive use of a session
+
+        Examples
+        --------
+        >>> with conn.session() as sess:
+        ...     sess.loadactionset('simple')
+        ...     out = sess.summary(table='cars')
+
+        Raises
+        ------
+        SWATError
+            If the current thread is already in a session block
+
+        Returns
+        -------
+        context manager returning a :class:`CAS` object
+
+        '''
+        if getattr(self._local, 'session', None) is not None:
+            raise SWATError('The current thread is already using a session of '
+                            'this ThreadSafeCAS object.  Use the session returned '
+                            'by the outer session() call.')
+        conn = self._acquire()
+        self._local.session = conn
+        try:
+            yield conn
+        finally:
+            self._local.session = None
+            self._release(conn)
+
+    def retrieve(self, _name_, **kwargs):
+        '''
+        Call the action on an idle session and return the results
+
+        If the current thread is in a :meth:`session` block, the
+        action is run on that session.
+
+        Parameters
+        ----------
+        _name_ : string
+            Name of the action
+        **kwargs : any, optional
+            Arbitrary keyword arguments
+
+        Returns
+        -------
+        :class:`CASResults` object
+
+        '''
+        conn = getattr(self._local, 'session', None)
+        if conn is not None:
+            return conn.retrieve(a2n(_name_), **kwargs)
+
+        conn = self._acquire()
+        try:
+            return conn.retrieve(a2n(_name_), **kwargs)
+        finally:
+            self._release(conn)
+
+    def invoke(self, _name_, **kwargs):
+        ''' Not supported; responses must be retrieved by the calling thread '''
+        raise SWATError('ThreadSafeCAS does not support invoke.  Use retrieve, '
+                        'or invoke the action on the connection returned by '
+                        'session().')
+
+    def close(self):
+        '''
+        End the sessions created by the pool
+
+        The connection that was passed to the constructor is not closed.
+
+        '''
+        with self._lock:
+            self._closed = True
+            sessions, self._sessions = self._sessions[1:], self._sessions[:1]
+        for conn in sessions:
+            try:
+                conn.terminate()
+            except SWATError:
+                pass
@@ -25,18 +25,21 @@ from __future__ import print_function, division, absolute_import, unicode_litera
 
 import base64
 import datetime
+import functools
 import numpy as np
 import pandas as pd
 import six
 from .utils import datetime as casdt
+from .utils.images import LazyImage
 from .. import clib
-from ..utils.compat import (a2u, a2n, int32, int64, float64, text_types,
+from ..utils.compat import (PY3, a2u, a2n, int32, int64, float64, text_types,
                             binary_types, int32_types, int64_types,
                             float64_types, items_types, dict_types,
                             MAX_INT32, MIN_INT32)
 from ..utils.keyword import keywordify
-from ..config import get_option
+from ..config import get_option_snapshot
 from ..clib import errorcheck
+from ..exceptions import SWATError
 from ..formatter import SASFormatter
 from ..dataframe import SASDataFrame, SASColumnSpec
 from .table import CASTable
@@ -45,6 +48,9 @@ from .utils.params import ParamManager
 
 # pylint: disable=C0330
 
+# Current option values
+_options = get_option_snapshot()
+
 
 def casvaluelist2py(_sw_values, soptions, length=None):
     '''
@@ -133,7 +139,29 @@ def _caslist2py(_sw_value, soptions, echk, connection=None):
         return output
 
 
-def ctb2tabular(_sw_table, soptions='', connection=None):
+def _to_image(value, options=None):
+    '''
+    Convert encoded image data to an image
+
+    If the ``cas.dataset.lazy_images`` option is enabled, a
+    :class:`LazyImage` is returned.  Otherwise, the decoded
+    :class:`PIL.Image.Image` is returned.
+
+    '''
+    if value is None:
+        return value
+    if (options or _options)['cas.dataset.lazy_images']:
+        if isinstance(value, LazyImage):
+            return value
+        return LazyImage(value)
+    if isinstance(value, LazyImage):
+        return value.image
+    from PIL import Image
+    from io import BytesIO
+    return Image.open(BytesIO(value))
+
+
+def ctb2tabular(_sw_table, soptions='', connection=None, options=None):
     '''
     Convert SWIG table to a tabular structure based on cas.dataset.format option
 
@@ -145,6 +173,9 @@ def ctb2tabular(_sw_table, soptions='', connection=None):
        soptions of connection object
     connection : CAS object
        The connection to associate generated CASTable objects with
+    options : dict, optional
+       The ``cas.dataset.*`` and ``encoding_errors`` option values to use
+       rather than the current values
 
     Returns
     -------
@@ -160,12 +191,15 @@ def ctb2tabular(_sw_table, soptions='', connection=None):
        A tuple of tuples of the data values only
 
     '''
-    tformat = get_option('cas.dataset.format')
+    if options is None:
+        options = _options
+
+    tformat = options['cas.dataset.format']
     needattrs = (tformat == 'dataframe:sas')
 
     # We can short circuit right away if they just want tuples
     if tformat.startswith('tuple'):
-        return _sw_table.toTuples(a2n(get_option('encoding_errors'), 'utf-8'),
+        return _sw_table.toTuples(a2n(options['encoding_errors'], 'utf-8'),
                                   casdt.cas2python_datetime,
                                   casdt.cas2python_date,
                                   casdt.cas2python_time)
@@ -307,7 +341,7 @@ def ctb2tabular(_sw_table, soptions='', connection=None):
 
     # Create a np.array and fill it
     kwargs['data'] = np.array(_sw_table.toTuples(a2n(
-                         get_option('encoding_errors'), 'utf-8'),
+                         options['encoding_errors'], 'utf-8'),
                          casdt.cas2python_datetime, casdt.cas2python_date,
                          casdt.cas2python_time),
                          dtype=dtypes)
@@ -327,24 +361,22 @@ def ctb2tabular(_sw_table, soptions='', connection=None):
 
     # Apply mimetype transformations
     if mimetypes:
-        from PIL import Image
-        from io import BytesIO
         for key, value in mimetypes.items():
             if value.startswith('image/'):
-                cdf[key] = cdf[key].map(lambda x: Image.open(BytesIO(x)))
+                cdf[key] = cdf[key].map(lambda x: _to_image(x, options))
 
     # Check for By group information
-    optbycol = get_option('cas.dataset.bygroup_columns')
-    optbyidx = get_option('cas.dataset.bygroup_as_index')
-    optbysfx = get_option('cas.dataset.bygroup_formatted_suffix')
-    optbycolsfx = get_option('cas.dataset.bygroup_collision_suffix')
+    optbycol = options['cas.dataset.bygroup_columns']
+    optbyidx = options['cas.dataset.bygroup_as_index']
+    optbysfx = options['cas.dataset.bygroup_formatted_suffix']
+    optbycolsfx = options['cas.dataset.bygroup_collision_suffix']
     cdf = cdf.reshape_bygroups(bygroup_columns=optbycol,
                                bygroup_as_index=optbyidx,
                                bygroup_formatted_suffix=optbysfx,
                                bygroup_collision_suffix=optbycolsfx)
 
     # Add an index as needed
-    index = get_option('cas.dataset.index_name')
+    index = options['cas.dataset.index_name']
     if index:
         if not isinstance(index, (list, tuple, set)):
             index = [index]
@@ -354,12 +386,12 @@ def ctb2tabular(_sw_table, soptions='', connection=None):
                     cdf.set_index([idx], append=True, inplace=True)
                 else:
                     cdf.set_index([idx], inplace=True)
-                adjust = get_option('cas.dataset.index_adjustment')
+                adjust = options['cas.dataset.index_adjustment']
                 if adjust != 0 and str(cdf.index.dtype).startswith('int'):
                     names = cdf.index.names
                     cdf.index = cdf.index.values + adjust
                     cdf.index.names = names
-                if get_option('cas.dataset.drop_index_name'):
+                if options['cas.dataset.drop_index_name']:
                     names = list(cdf.index.names)
                     names[-1] = None
                     cdf.index.names = names
@@ -416,7 +448,7 @@ CAS2PY = {
 }
 
 
-def cas2py(_sw_value, soptions, connection=None):
+def cas2py(_sw_value, soptions, connection=None, options=None):
     '''
     Convert a CASValue object to a Python object
 
@@ -426,6 +458,11 @@ def cas2py(_sw_value, soptions, connection=None):
        Object to convert to Python
     soptions : string
        soptions of connection object
+    connection : CAS object, optional
+       The connection to associate generated CASTable objects with
+    options : dict, optional
+       The ``cas.dataset.*`` and ``encoding_errors`` option values to use
+       rather than the current values
 
     Returns
     -------
@@ -433,15 +470,218 @@ def cas2py(_sw_value, soptions, connection=None):
        Python representation of CASValue
 
     '''
+    totabular = ctb2tabular
+    if options is None:
+        options = _options
+    else:
+        totabular = functools.partial(ctb2tabular, options=options)
     return _sw_value.toPython(_sw_value, soptions,
-                              a2n(get_option('encoding_errors'), 'utf-8'),
-                              connection, ctb2tabular,
+                              a2n(options['encoding_errors'], 'utf-8'),
+                              connection, totabular,
                               base64.b64decode, casdt.cas2python_datetime,
                               casdt.cas2python_date, casdt.cas2python_time)
 #   return CAS2PY[errorcheck(_sw_value.getType(),
 #                            _sw_value)](_sw_value, soptions, errorcheck, connection)
 
 
+def _to_native(item):
+    ''' Convert a string to the native string type '''
+    return a2n(item, 'utf-8')
+
+
+def _set_bool(_sw_values, i, key, item):
+    ''' Set a boolean item '''
+    _sw_values.setBoolean(i, key, item and 1 or 0)
+
+
+def _set_blob(_sw_values, i, key, item):
+    ''' Set a blob item '''
+    _sw_values.setBlob(i, key, item)
+
+
+def _set_string(_sw_values, i, key, item):
+    ''' Set a string item '''
+    _sw_values.setString(i, key, a2n(item, 'utf-8'))
+
+
+def _set_int64(_sw_values, i, key, item):
+    ''' Set a 64-bit integer item '''
+    _sw_values.setInt64(i, key, int64(item))
+
+
+def _set_int32(_sw_values, i, key, item):
+    ''' Set a 32-bit integer item, or 64-bit if it is out of range '''
+    if item > MAX_INT32 or item < MIN_INT32:
+        _sw_values.setInt64(i, key, int64(item))
+    else:
+        _sw_values.setInt32(i, key, int32(item))
+
+
+def _set_double(_sw_values, i, key, item):
+    ''' Set a double item '''
+    _sw_values.setDouble(i, key, float64(item))
+
+
+def _set_nil(_sw_values, i, key, item):
+    ''' Set a nil item '''
+    _sw_values.setNil(i, key)
+
+
+def _set_items(_sw_values, i, key, item):
+    ''' Set a list item '''
+    _sw_sublist = errorcheck(_sw_values.createListAt(i, key, len(item)), _sw_values)
+    _set_list_values(_sw_sublist, item)
+
+
+def _set_dict(_sw_values, i, key, item):
+    ''' Set a dictionary item '''
+    if isinstance(item, ParamManager):
+        item = item.to_params()
+    _sw_sublist = errorcheck(_sw_values.createListAt(i, key, len(item)), _sw_values)
+    _set_dict_values(_sw_sublist, item)
+
+
+def _set_datetime(_sw_values, i, key, item):
+    ''' Set a datetime item '''
+    _sw_values.setDateTime(i, key, casdt.python2cas_datetime(item))
+
+
+def _set_date(_sw_values, i, key, item):
+    ''' Set a date item '''
+    _sw_values.setDate(i, key, casdt.python2cas_date(item))
+
+
+def _set_time(_sw_values, i, key, item):
+    ''' Set a time item '''
+    _sw_values.setTime(i, key, casdt.python2cas_time(item))
+
+
+# Setters for each supported type in order of precedence
+_PY2CAS_TYPES = [
+    (bool, _set_bool),
+    (blob, _set_blob),
+    (text_types, _set_string),
+    (binary_types, _set_string),
+    (int64_types, _set_int64),
+    (int32_types, _set_int32),
+    (float64_types, _set_double),
+    (type(nil), _set_nil),
+    (items_types, _set_items),
+    (dict_types + (ParamManager,), _set_dict),
+    (datetime.datetime, _set_datetime),
+    (datetime.date, _set_date),
+    (datetime.time, _set_time),
+]
+
+# Setters resolved for each type seen so far
+_PY2CAS_SETTERS = {}
+
+# Fast paths for lists where all items are the same type:
+# type => (CASValueList method name, value converter)
+_PY2CAS_LIST_SETTERS = {
+    float: ('setDouble', None),
+    np.float64: ('setDouble', float64),
+}
+for _type in text_types + binary_types:
+    _PY2CAS_LIST_SETTERS[_type] = ('setString',
+                                   None if (PY3 and _type is str) else _to_native)
+for _type in int64_types:
+    _PY2CAS_LIST_SETTERS[_type] = ('setInt64', None if _type is int else int64)
+del _type
+
+
+def _get_setter(cls):
+    '''
+    Return the function that sets values of the given type
+
+    Parameters
+    ----------
+    cls : type
+       The type of the value
+
+    Returns
+    -------
+    function
+       The setter function, or None if the type isn't supported
+
+    '''
+    try:
+        return _PY2CAS_SETTERS[cls]
+    except KeyError:
+        pass
+    for types, setter in _PY2CAS_TYPES:
+        if issubclass(cls, types):
+            break
+    else:
+        setter = None
+    _PY2CAS_SETTERS[cls] = setter
+    return setter
+
+
+def _set_list_values(_sw_values, items):
+    '''
+    Set the items of a CASValueList from a list of values
+
+    Lists where all items are strings, integers, or floats are set
+    using a single loop over the specific setter method.
+
+    Parameters
+    ----------
+    _sw_values : SWIG CASValueList object
+       List to set the values in
+    items : list or tuple or set
+       The values to set
+
+    '''
+    types = set(map(type, items))
+    if len(types) == 1:
+        method, convert = _PY2CAS_LIST_SETTERS.get(types.pop(), (None, None))
+        if method is not None:
+            if convert is not None:
+                items = [convert(x) for x in items]
+            setter = getattr(_sw_values, method)
+            get_error = _sw_values.getLastErrorMessage
+            for i, item in enumerate(items):
+                setter(i, None, item)
+                msg = get_error()
+                if msg:
+                    raise SWATError(a2u(msg, 'utf-8'))
+            return
+
+    i = 0
+    for item in items:
+        setter = _PY2CAS_SETTERS.get(type(item)) or _get_setter(type(item))
+        if setter is not None:
+            setter(_sw_values, i, None, item)
+            errorcheck(None, _sw_values)
+            i = i + 1
+
+
+def _set_dict_values(_sw_values, items):
+    '''
+    Set the items of a CASValueList from a dictionary
+
+    Parameters
+    ----------
+    _sw_values : SWIG CASValueList object
+       List to set the values in
+    items : dict
+       The keys and values to set
+
+    '''
+    i = 0
+    for key, item in six.iteritems(items):
+        if isinstance(key, (binary_types, text_types)):
+            key = keywordify(a2n(key, 'utf-8'))
+        else:
+            key = None
+        setter = _PY2CAS_SETTERS.get(type(item)) or _get_setter(type(item))
+        if setter is not None:
+            setter(_sw_values, i, key, item)
+            errorcheck(None, _sw_values)
+            i = i + 1
+
+
 def py2cas(soptions, _sw_error, **kwargs):
     '''
     Convert Python arguments to a CASValueList
@@ -463,97 +703,5 @@ def py2cas(soptions, _sw_error, **kwargs):
     '''
     _sw_values = errorcheck(clib.SW_CASValueList(len(kwargs), a2n(soptions),
                                                  _sw_error), _sw_error)
-
-    def set_list_value(_sw_values, i, key, item):
-        '''
-        Set a CASValueList item i to the key/item pair
-
-        Parameters
-        ----------
-        _sw_values : SWIG CASValueList object
-           List to set the value in
-        i : int or long
-           Index in the list to set
-        key : string
-           Key for the list item (None of no key is desired)
-        item : any
-           Value to set at the list index
-
-        Returns
-        -------
-        int
-           The next position in the list to set
-
-        '''
-        if isinstance(key, (binary_types, text_types)):
-            key = keywordify(a2n(key, 'utf-8'))
-
-        if item is True or item is False:
-            errorcheck(_sw_values.setBoolean(i, key, item and 1 or 0),
-                       _sw_values)
-            i = i + 1
-        elif isinstance(item, blob):
-            errorcheck(_sw_values.setBlob(i, key, item), _sw_values)
-            i = i + 1
-        elif isinstance(item, text_types):
-            errorcheck(_sw_values.setString(i, key, a2n(item, 'utf-8')),
-                       _sw_values)
-            i = i + 1
-        elif isinstance(item, binary_types):
-            errorcheck(_sw_values.setString(i, key, a2n(item, 'utf-8')),
-                       _sw_values)
-            i = i + 1
-        elif isinstance(item, int64_types):
-            errorcheck(_sw_values.setInt64(i, key, int64(item)), _sw_values)
-            i = i + 1
-        elif isinstance(item, int32_types):
-            if item > MAX_INT32 or item < MIN_INT32:
-                errorcheck(_sw_values.setInt64(i, key, int64(item)), _sw_values)
-            else:
-                errorcheck(_sw_values.setInt32(i, key, int32(item)), _sw_values)
-            i = i + 1
-        elif isinstance(item, float64_types):
-            errorcheck(_sw_values.setDouble(i, key, float64(item)), _sw_values)
-            i = i + 1
-        elif item is nil:
-            errorcheck(_sw_values.setNil(i, key), _sw_values)
-            i = i + 1
-        elif isinstance(item, items_types):
-            _sw_sublist = errorcheck(_sw_values.createListAt(
-                                     i, key, len(item)), _sw_values)
-            j = 0
-            for v in item:
-                j = set_list_value(_sw_sublist, j, None, v)
-            i = i + 1
-        elif isinstance(item, dict_types) or isinstance(item, ParamManager):
-            if isinstance(item, ParamManager):
-                item = item.to_params()
-            _sw_sublist = errorcheck(_sw_values.createListAt(
-                                     i, key, len(item)), _sw_values)
-            j = 0
-            for k, v in six.iteritems(item):
-                if isinstance(k, binary_types) or isinstance(k, text_types):
-                    j = set_list_value(_sw_sublist, j, k, v)
-                else:
-                    j = set_list_value(_sw_sublist, j, None, v)
-            i = i + 1
-        elif isinstance(item, datetime.datetime):
-            errorcheck(_sw_values.setDateTime(i, key, casdt.python2cas_datetime(item)),
-                       _sw_values)
-            i = i + 1
-        elif isinstance(item, datetime.date):
-            errorcheck(_sw_values.setDate(i, key, casdt.python2cas_date(item)),
-                       _sw_values)
-            i = i + 1
-        elif isinstance(item, datetime.time):
-            errorcheck(_sw_values.setTime(i, key, casdt.python2cas_time(item)),
-                       _sw_values)
-            i = i + 1
-
-        return i
-
-    i = 0
-    for skey, svalue in six.iteritems(kwargs):
-        i = set_list_value(_sw_values, i, skey, svalue)
-
+    _set_dict_values(_sw_values, kwargs)
     return _sw_values
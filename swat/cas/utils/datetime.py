@@ -654,6 +654,100 @@ def python2sas_time(pytm):
     return python2cas_time(pytm) / float(10**6)
 
 
+# NumPy to CAS
+
+# Offset of the CAS epoch from the NumPy epoch
+_CAS_EPOCH_DAYS = int((CAS_EPOCH - datetime.datetime(1970, 1, 1)).days)
+_CAS_EPOCH_USECS = _CAS_EPOCH_DAYS * 24 * 60 * 60 * 10**6
+_USECS_PER_DAY = 24 * 60 * 60 * 10**6
+
+
+def numpy2cas_timestamp(values, missing=0):
+    '''
+    Convert an array of NumPy datetimes to CAS datetimes
+
+    Parameters
+    ----------
+    values : :class:`numpy.ndarray` of datetime64
+        NumPy datetimes.
+    missing : int, optional
+        The value to use for NaT values.
+
+    Examples
+    --------
+    >>> numpy2cas_timestamp(np.array(['1970-01-01T12:00'], dtype='datetime64[ns]'))
+    array([315662400000000])
+
+    Returns
+    -------
+    :class:`numpy.ndarray` of int64
+        CAS timestamps
+
+    '''
+    values = np.asarray(values, dtype='datetime64[us]')
+    out = values.view('int64') - _CAS_EPOCH_USECS
+    out[pd.isnull(values)] = missing
+    return out
+
+numpy2cas_datetime = numpy2cas_timestamp
+
+
+def numpy2cas_date(values, missing=0):
+    '''
+    Convert an array of NumPy datetimes to CAS dates
+
+    Parameters
+    ----------
+    values : :class:`numpy.ndarray` of datetime64
+        NumPy datetimes.
+    missing : int, optional
+        The value to use for NaT values.
+
+    Examples
+    --------
+    >>> numpy2cas_date(np.array(['1970-01-01T12:00'], dtype='datetime64[ns]'))
+    array([3653], dtype=int32)
+
+    Returns
+    -------
+    :class:`numpy.ndarray` of int32
+        CAS dates
+
+    '''
+    values = np.asarray(values, dtype='datetime64[D]')
+    out = values.view('int64') - _CAS_EPOCH_DAYS
+    out[pd.isnull(values)] = missing
+    return out.astype('int32')
+
+
+def numpy2cas_time(values, missing=0):
+    '''
+    Convert an array of NumPy datetimes to CAS times
+
+    Parameters
+    ----------
+    values : :class:`numpy.ndarray` of datetime64
+        NumPy datetimes.
+    missing : int, optional
+        The value to use for NaT values.
+
+    Examples
+    --------
+    >>> numpy2cas_time(np.array(['1970-01-01T12:00'], dtype='datetime64[ns]'))
+    array([43200000000])
+
+    Returns
+    -------
+    :class:`numpy.ndarray` of int64
+        CAS times
+
+    '''
+    values = np.asarray(values, dtype='datetime64[us]')
+    out = values.view('int64') % _USECS_PER_DAY
+    out[pd.isnull(values)] = missing
+    return out
+
+
 def _local_time_offset(timestamp):
     '''
     Return offset of local zone from GMT
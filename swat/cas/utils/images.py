@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Image utilities for CAS tables
+
+'''
+
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import base64
+import threading
+from ...config import get_option_snapshot
+from ...utils.compat import OrderedDict, a2b
+
+# Current option values
+_options = get_option_snapshot()
+
+
+class _ImageCache(object):
+    '''
+    Least-recently-used cache of decoded images
+
+    The maximum size is given by the ``cas.dataset.image_cache_size``
+    option.
+
+    '''
+
+    def __init__(self):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        ''' Return the image for `key`, or None if it isn't cached '''
+        with self._lock:
+            item = self._data.pop(id(key), None)
+            if item is None:
+                return None
+            self._data[id(key)] = item
+            return item[1]
+
+    def set(self, key, image):
+        ''' Store the image for `key`, dropping the least recently used '''
+        maxsize = _options['cas.dataset.image_cache_size']
+        with self._lock:
+            # The key is stored with the image so that its ID isn't reused
+            self._data.pop(id(key), None)
+            if maxsize > 0:
+                self._data[id(key)] = (key, image)
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        ''' Remove all images from the cache '''
+        with self._lock:
+            self._data.clear()
+
+
+image_cache = _ImageCache()
+
+
+class LazyImage(object):
+    '''
+    Image that is decoded when it is first used
+
+    Image columns of CAS tables contain these objects rather than
+    :class:`PIL.Image.Image` objects.  The encoded image data is kept
+    and decoded when the image is used.  Attributes of the decoded
+    image (e.g., ``size``, ``show()``) are available directly on the
+    :class:`LazyImage` object.  Decoded images are kept in a
+    least-recently-used cache whose size is given by the
+    ``cas.dataset.image_cache_size`` option.
+
+    Parameters
+    ----------
+    data : bytes or string
+        The encoded image.
+    encoding : string, optional
+        If 'base64', `data` is base64 encoded.
+
+    Examples
+    --------
+    >>> out = conn.fetch(table='images')
+    >>> img = out.Fetch['_image_'][0]
+    >>> img.size
+    (256, 256)
+    >>> pil_image = img.image
+
+    Returns
+    -------
+    :class:`LazyImage` object
+
+    '''
+
+    def __init__(self, data, encoding=None):
+        self._data = data
+        self._encoding = encoding
+
+    @property
+    def data(self):
+        ''' The encoded image data '''
+        if self._encoding == 'base64':
+            data = a2b(self._data)
+            self._data = base64.b64decode(data + b'=' * (-len(data) % 4))
+            self._encoding = None
+        return self._data
+
+    @property
+    def image(self):
+        ''' The decoded :class:`PIL.Image.Image` object '''
+        out = image_cache.get(self)
+        if out is None:
+            from PIL import Image
+            from io import BytesIO
+            out = Image.open(BytesIO(self.data))
+            image_cache.set(self, out)
+        return out
+
+    def __getattr__(self, name):
+        if name.startswith('__') or name in ['_data', '_encoding']:
+            raise AttributeError(name)
+        return getattr(self.image, name)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyImage):
+            return self.data == other.data
+        return NotImplemented
+
+    def __ne__(self, other):
+        out = self.__eq__(other)
+        if out is NotImplemented:
+            return out
+        return not out
+
+    __hash__ = object.__hash__
+
+    def __repr__(self):
+        return '<%s.%s object, %s bytes>' % (type(self).__module__,
+                                             type(self).__name__, len(self.data))
@@ -28,7 +28,8 @@ from .clib import InitializeTK
 from .utils.config import (register_option, check_boolean, check_int, get_option,
                            set_option, reset_option, describe_option, check_url,
                            SWATOptionError, check_string, options, get_suboptions,
-                           get_default, check_float, option_context)
+                           get_default, check_float, option_context,
+                           get_option_snapshot)
 from .utils.compat import a2n
 
 #
@@ -136,6 +137,41 @@ register_option('cas.exception_on_severity', 'int or None', check_severity, None
                 '1 would raise exceptions on warnings.  2 would raise exceptions\n' +
                 'on errors.')
 
+register_option('cas.lazy_results', 'boolean', check_boolean, True,
+                'Indicates whether tables in action results should be converted\n' +
+                'to Python objects when they are first accessed rather than when\n' +
+                'the results are received.  This saves the conversion cost of tables\n' +
+                'that are never used.')
+
+#
+# REST interface options
+#
+
+register_option('cas.rest.compression', 'string',
+                functools.partial(check_string,
+                                  valid_values=['none', 'gzip', 'deflate']),
+                'none',
+                'Content encoding used to compress the bodies of requests sent\n' +
+                'to the REST interface.  Compressed responses are always accepted.\n' +
+                'The server must support the selected encoding.')
+
+register_option('cas.rest.compression_threshold', 'int',
+                functools.partial(check_int, minimum=0), 1024,
+                'Request bodies smaller than this number of bytes are not\n' +
+                'compressed.')
+
+register_option('cas.rest.max_retries', 'int',
+                functools.partial(check_int, minimum=0), 3,
+                'Maximum number of times a REST request is retried after a\n' +
+                'transient error.  Read-only actions are retried on connection\n' +
+                'errors, timeouts, and gateway errors.  Other actions are only\n' +
+                'retried when the request could not have reached the server.')
+
+register_option('cas.rest.retry_backoff', 'float',
+                functools.partial(check_float, minimum=0), 0.5,
+                'Base delay in seconds between REST request retries.  The delay\n' +
+                'doubles after each retry.')
+
 #
 # Integer missing value substitutions
 #
@@ -214,6 +250,52 @@ register_option('cas.dataset.max_rows_fetched', 'int', check_int, 10000,
                 'the table.fetch action in the background (i.e. the head, tail,\n' +
                 'values, etc. of CASTable).')
 
+register_option('cas.dataset.metadata_cache', 'boolean', check_boolean, False,
+                'Should table metadata (column information, number of rows, etc.)\n' +
+                'be cached on the client?  Cached metadata is dropped when an\n' +
+                'action that modifies the table is invoked on this connection.\n' +
+                'Changes made by other sessions (for example, to promoted tables)\n' +
+                'or by actions that aren\'t known to modify tables are not seen\n' +
+                'until the cache is cleared.')
+
+register_option('cas.dataset.deferred_datasteps', 'boolean', check_boolean, True,
+                'Should the data steps generated by CASTable methods such as\n' +
+                'fillna, replace, and dropna be deferred until the resulting\n' +
+                'temporary table is used?  Deferred data steps on the same\n' +
+                'table are combined into a single data step.  In-place data\n' +
+                'steps are always run immediately.')
+
+register_option('cas.dataset.lookup_threshold', 'int',
+                functools.partial(check_int, minimum=0), 1000,
+                'The number of values at which CASTable.replace mappings and\n' +
+                'CASColumn.isin value sets used to select rows are uploaded to\n' +
+                'a temporary lookup table and used through a data step hash\n' +
+                'object rather than inlined into the generated code.  If zero,\n' +
+                'values are always inlined.')
+
+register_option('cas.dataset.temp_table_memory_limit', 'int',
+                functools.partial(check_int, minimum=0), 0,
+                'The number of bytes of server memory that the temporary tables\n' +
+                'created by CASTable methods in a session may use before a\n' +
+                'warning is issued.  The memory of a table is approximated by\n' +
+                'the memory used by the action that created it.  If zero, no\n' +
+                'warning is issued.')
+
+register_option('cas.dataset.plot_aggregation', 'boolean', check_boolean, True,
+                'Should the data of histograms, box plots, hexbin plots, and\n' +
+                'density plots of CASTable objects be aggregated on the server\n' +
+                'rather than fetched and aggregated on the client?')
+
+register_option('cas.dataset.lazy_images', 'boolean', check_boolean, False,
+                'Should image columns (columns with an image MIMEType) contain\n' +
+                'LazyImage objects that are decoded when they are first used\n' +
+                'rather than decoded PIL images?')
+
+register_option('cas.dataset.image_cache_size', 'int',
+                functools.partial(check_int, minimum=0), 64,
+                'The number of decoded images to keep in the LazyImage cache.\n' +
+                'If zero, images are decoded each time they are used.')
+
 register_option('cas.dataset.bygroup_columns', 'string',
                 functools.partial(check_string,
                                   valid_values=['none', 'raw', 'formatted', 'both']),
@@ -29,7 +29,6 @@ import json
 import re
 import pandas as pd
 import six
-from .cas.table import CASTable
 from .utils.compat import (a2u, a2n, int32, int64, float64, int32_types,
                            int64_types, float64_types, bool_types, text_types,
                            binary_types)
@@ -80,12 +79,16 @@ def concat(objs, **kwargs):
     preserves metadata in :class:`SASDataFrames`.  It can be used on standard
     :class:`pandas.DataFrames` as well.
 
+    If the objects are :class:`CASTable` objects, the tables are concatenated
+    on the server using :meth:`CASTable.append`.
+
     Parameters
     ----------
-    objs : a sequence of mapping of Series, (SAS)DataFrame, or Panel objects
+    objs : a sequence of mapping of Series, (SAS)DataFrame, CASTable, or Panel objects
         The DataFrames to concatenate.
     **kwargs : any, optional
-        Additional arguments to pass to :func:`pandas.concat`.
+        Additional arguments to pass to :func:`pandas.concat`, or to
+        :meth:`CASTable.append` for :class:`CASTable` objects.
 
     Examples
     --------
@@ -95,13 +98,23 @@ def concat(objs, **kwargs):
     >>> print(concat([out['ByGroup1.Summary'], out['ByGroup2.Summary'],
     ...               out['ByGroup3.Summary']]))
 
+    >>> out = concat([conn.CASTable('jan'), conn.CASTable('feb')], view=True)
+
     Returns
     -------
     :class:`SASDataFrame`
+        For DataFrame objects
+    :class:`CASTable`
+        For CASTable objects
 
     '''
+    from .cas.table import CASTable
+
     proto = objs[0]
 
+    if isinstance(proto, CASTable):
+        return proto.append(list(objs)[1:], **kwargs)
+
     if not isinstance(proto, SASDataFrame):
         return pd.concat(objs, **kwargs)
 
@@ -124,6 +137,114 @@ def concat(objs, **kwargs):
                         formatter=formatter)[list(columns.keys())]
 
 
+def crosstab(index, columns, values=None, rownames=None, colnames=None,
+             aggfunc=None, margins=False, margins_name='All', dropna=True,
+             normalize=False):
+    '''
+    Compute a cross-tabulation of two or more factors
+
+    This function is equivalent to :func:`pandas.crosstab` except that
+    if the factors are :class:`CASColumn` objects, the table is computed
+    on the server using :meth:`CASTable.pivot_table`.  Only the
+    cross-tabulation is returned to the client.
+
+    Parameters
+    ----------
+    index : CASColumn or list-of-CASColumns
+        The values to group by in the rows.
+    columns : CASColumn or list-of-CASColumns
+        The values to group by in the columns.
+    values : CASColumn, optional
+        The values to aggregate using `aggfunc=`.
+    rownames : list-of-strings, optional
+        The names of the row levels.
+    colnames : list-of-strings, optional
+        The names of the column levels.
+    aggfunc : string or function, optional
+        The aggregation function.  See :meth:`CASTable.pivot_table`
+        for the supported functions.  If not specified, the number of
+        rows in each group is computed.
+    margins : boolean, optional
+        Not supported
+    margins_name : string, optional
+        Not supported
+    dropna : boolean, optional
+        Should columns that contain only missing values be dropped?
+    normalize : boolean or string, optional
+        Normalize by the sum of all values (True or 'all'), or the sum
+        of each row ('index') or column ('columns').
+
+    Examples
+    --------
+    >>> tbl = conn.CASTable('cars')
+    >>> print(crosstab(tbl.Origin, tbl.Type))
+
+    Returns
+    -------
+    :class:`pandas.DataFrame`
+
+    '''
+    from .cas.table import CASColumn
+
+    index = isinstance(index, (list, tuple)) and list(index) or [index]
+    columns = isinstance(columns, (list, tuple)) and list(columns) or [columns]
+
+    if not isinstance(index[0], CASColumn):
+        return pd.crosstab(index, columns, values=values, rownames=rownames,
+                           colnames=colnames, aggfunc=aggfunc, margins=margins,
+                           margins_name=margins_name, dropna=dropna,
+                           normalize=normalize)
+
+    if values is None and aggfunc is not None:
+        raise ValueError('aggfunc cannot be used without values.')
+    if values is not None and aggfunc is None:
+        raise ValueError('values cannot be used without an aggfunc.')
+
+    factors = index + columns
+    items = factors + (values is not None and [values] or [])
+    names = set((x.params.get('caslib'), x.params['name']) for x in items)
+    if len(names) > 1:
+        raise ValueError('All columns must be from the same table')
+
+    tbl = factors[0]._to_table()
+    for item in items[1:]:
+        tbl.append_computedvars(item.get_param('computedvars', []))
+        tbl.append_computedvarsprogram(item.get_param('computedvarsprogram', ''))
+    tbl.append_where(*[x.get_param('where', None) for x in items[1:]])
+
+    if values is None:
+        valname = '_crosstab_n_'
+        tbl.append_computed_columns([valname], ['%s = 1; ' % valname])
+        aggfunc = 'count'
+    else:
+        valname = values.name
+
+    out = tbl.pivot_table(values=valname, index=[x.name for x in index],
+                          columns=[x.name for x in columns], aggfunc=aggfunc,
+                          dropna=dropna, margins=margins, margins_name=margins_name)
+
+    if values is None:
+        out = out.fillna(0).astype('int64')
+
+    if rownames is not None:
+        out.index.names = list(rownames)
+    if colnames is not None:
+        out.columns.names = list(colnames)
+
+    if normalize is not False:
+        out = out.fillna(0)
+        if normalize is True or normalize == 'all':
+            out = out / out.values.sum()
+        elif normalize == 'index':
+            out = out.div(out.sum(axis=1), axis=0)
+        elif normalize == 'columns':
+            out = out / out.sum(axis=0)
+        else:
+            raise ValueError('Not a valid normalize argument: %s' % normalize)
+
+    return out
+
+
 def reshape_bygroups(items, bygroup_columns='formatted',
                      bygroup_as_index=True, bygroup_formatted_suffix='_f',
                      bygroup_collision_suffix='_by'):
@@ -394,6 +515,7 @@ class SASDataFrame(pd.DataFrame):
                 return int64(obj)
             if isinstance(obj, (int32_types, bool_types)):
                 return int32(obj)
+            from .cas.table import CASTable
             if isinstance(obj, CASTable):
                 return str(obj)
             return json.JSONEncoder.default(self, obj)
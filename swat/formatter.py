@@ -26,9 +26,7 @@ from __future__ import print_function, division, absolute_import, unicode_litera
 import datetime
 import numpy as np
 from . import clib
-from .cas import utils
 from .clib import errorcheck
-from .cas.table import CASTable
 from .exceptions import SWATError
 from pandas import Timestamp
 from .utils import getsoptions
@@ -190,20 +188,23 @@ class SASFormatter(object):
                                  int32(value), a2n(sasfmt), int32(width)), a2n('utf-8')),
                              self._sw_formatter)
         elif isinstance(value, (datetime.datetime, Timestamp)):
+            from .cas.utils.datetime import python2sas_datetime
             out = errorcheck(a2u(self._sw_formatter.formatDouble(
-                                 utils.python2sas_datetime(value),
+                                 python2sas_datetime(value),
                                  a2n(sasfmt), int32(width)),
                                  a2n('utf-8')),
                              self._sw_formatter)
         elif isinstance(value, datetime.date):
+            from .cas.utils.datetime import python2sas_date
             out = errorcheck(a2u(self._sw_formatter.formatDouble(
-                                 utils.python2sas_date(value),
+                                 python2sas_date(value),
                                  a2n(sasfmt), int32(width)),
                                  a2n('utf-8')),
                              self._sw_formatter)
         elif isinstance(value, datetime.time):
+            from .cas.utils.datetime import python2sas_time
             out = errorcheck(a2u(self._sw_formatter.formatDouble(
-                                 utils.python2sas_time(value),
+                                 python2sas_time(value),
                                  a2n(sasfmt), int32(width)),
                                  a2n('utf-8')),
                              self._sw_formatter)
@@ -213,8 +214,10 @@ class SASFormatter(object):
                              self._sw_formatter)
 
         # For CASTable columns in dataframes
-        elif isinstance(value, CASTable):
-            return a2u(str(value))
+        else:
+            from .cas.table import CASTable
+            if isinstance(value, CASTable):
+                return a2u(str(value))
 
         if out is None:
             raise TypeError(type(value))
@@ -253,8 +256,10 @@ class SASFormatter(object):
             out = a2u('')
 
         # For CASTable columns in dataframes
-        elif isinstance(value, CASTable):
-            return a2u(str(value))
+        else:
+            from .cas.table import CASTable
+            if isinstance(value, CASTable):
+                return a2u(str(value))
 
         if out is None:
             raise TypeError(type(value))
@@ -23,7 +23,6 @@ Functions for rendering output in a ODS-like manner.
 
 from __future__ import print_function, division, absolute_import, unicode_literals
 
-from IPython.display import display_html, HTML
 from pprint import pformat
 
 STYLESHEET = '''
@@ -75,6 +74,8 @@ def render_html(results):
     None
 
     '''
+    from IPython.display import display_html, HTML
+
     if hasattr(results, '_render_html_'):
         out = results._render_html_()
         if out is not None:
@@ -499,6 +499,43 @@ class TestConnection(tm.TestCase):
         self.assertEqual(sorted(userdata.keys()), ['BinDetails'])
         self.assertEqual(userdata['BinDetails'].ix[:,'Variable'].tolist(), [u'MPG_City']*11 + [u'MPG_Highway']*12)
 
+    def test_stream(self):
+        out = self.s.stream('tableinfo', table=self.table)
+        self.assertFalse(isinstance(out, swat.CASResults))
+
+        items = list(out)
+        self.assertEqual([x[0] for x in items], ['TableInfo'])
+        self.assertEqual(items[0][1]['Rows'][0], 428)
+
+        self.s.loadactionset('simple')
+        tbl = self.s.CASTable(self.tablename, caslib=self.srcLib, groupby=['Origin'])
+        streamed = [k for k, v in self.s.stream('simple.summary', table=tbl)]
+        self.assertEqual(streamed, list(self.s.retrieve('simple.summary', table=tbl).keys()))
+
+        out = self.s.stream('table.partition', table=self.table,
+                            casout=dict(name='stream_out', replace=True))
+        keys = [k for k, v in out]
+        self.assertTrue('casTable' in keys)
+        self.s.droptable('stream_out')
+
+    def test_batch(self):
+        with self.s.batch() as batch:
+            info = batch.retrieve('tableinfo', table=self.table)
+            numrows = batch.retrieve('simple.numrows', table=self.table)
+            self.assertEqual(len(batch), 2)
+            self.assertEqual(batch.results, [])
+
+        self.assertEqual(len(batch), 0)
+        self.assertEqual(len(batch.results), 2)
+        self.assertTrue(isinstance(batch.results[info], swat.CASResults))
+        self.assertEqual(batch.results[info]['TableInfo']['Rows'][0], 428)
+        self.assertEqual(batch.results[numrows]['numrows'], 428)
+
+        batch = self.s.batch()
+        batch.retrieve('tableinfo', table=self.table)
+        out = batch.run()
+        self.assertEqual(list(out[0].keys()), ['TableInfo'])
+
     def test_action_class(self):
         self.s.loadactionset('simple')
         summ = self.s.Summary(table=self.table)
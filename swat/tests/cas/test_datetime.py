@@ -59,6 +59,16 @@ class TestDateTime(tm.TestCase):
         self.assertEqual(python2cas_time(datetime.time(12, 0)),
                          43200000000)
 
+    def test_numpy2cas(self):
+        values = np.array(['1970-01-01T12:00', 'NaT', '1959-12-31T23:59:59.5'],
+                          dtype='datetime64[ns]')
+        self.assertEqual(numpy2cas_datetime(values, missing=-1).tolist(),
+                         [315662400000000, -1, -500000])
+        self.assertEqual(numpy2cas_date(values, missing=-1).tolist(),
+                         [3653, -1, -1])
+        self.assertEqual(numpy2cas_time(values, missing=-1).tolist(),
+                         [43200000000, -1, 86399500000])
+
     def test_sas_datetime(self):
         self.assertEqual(str2sas_timestamp('19700101T12:00'), 315662400)
         self.assertEqual(sas2python_timestamp(315662400),
@@ -1711,76 +1711,67 @@ class TestCASTable(tm.TestCase):
         df.index = range(len(df))
         tbl = self.table.sort_values(['Make', 'MSRP'])
 
-        with self.assertRaises(NotImplementedError):
-            tbl.iat[0, 0]
+        self.assertEqual(df.iat[10, 5], tbl.iat[10, 5])
+        self.assertEqual(df.iat[99, 0], tbl.iat[99, 0])
+        self.assertEqual(df.iat[-5, 0], tbl.iat[-5, 0])
+        self.assertEqual(df.iat[-99, 0], tbl.iat[-99, 0])
+        self.assertEqual(df.iat[-99, -2], tbl.iat[-99, -2])
 
-#       self.assertEqual(df.iat[10, 5], tbl.iat[10, 5])
-#       self.assertEqual(df.iat[99, 0], tbl.iat[99, 0])
-#       self.assertEqual(df.iat[-5, 0], tbl.iat[-5, 0])
-#       self.assertEqual(df.iat[-99, 0], tbl.iat[-99, 0])
-#       self.assertEqual(df.iat[-99, -2], tbl.iat[-99, -2])
+        with self.assertRaises(IndexError):
+            tbl.iat[500, 0]
 
-#       with self.assertRaises(IndexError):
-#           tbl.iat[500, 0]
-#
-#       with self.assertRaises(IndexError):
-#           tbl.iat[-500, 0]
+        with self.assertRaises(IndexError):
+            tbl.iat[-500, 0]
 
-#   def test_column_iat(self):
-#       df = self.get_cars_df().sort_values(['Make', 'MSRP'])
-#       df.index = range(len(df))
-#       tbl = self.table.sort_values(['Make', 'MSRP'])
+    def test_column_iat(self):
+        df = self.get_cars_df().sort_values(['Make', 'MSRP'])
+        df.index = range(len(df))
+        tbl = self.table.sort_values(['Make', 'MSRP'])
 
-#       self.assertEqual(df['Model'].iat[10], tbl['Model'].iat[10])
-#       self.assertEqual(df['Model'].iat[99], tbl['Model'].iat[99])
-#       self.assertEqual(df['Model'].iat[-5], tbl['Model'].iat[-5])
-#       self.assertEqual(df['Model'].iat[-99], tbl['Model'].iat[-99])
+        self.assertEqual(df['Model'].iat[10], tbl['Model'].iat[10])
+        self.assertEqual(df['Model'].iat[99], tbl['Model'].iat[99])
+        self.assertEqual(df['Model'].iat[-5], tbl['Model'].iat[-5])
+        self.assertEqual(df['Model'].iat[-99], tbl['Model'].iat[-99])
 
-#       with self.assertRaises(IndexError):
-#           tbl['Model'].iat[500]
+        with self.assertRaises(IndexError):
+            tbl['Model'].iat[500]
 
-#       with self.assertRaises(IndexError):
-#           tbl['Model'].iat[-500]
+        with self.assertRaises(IndexError):
+            tbl['Model'].iat[-500]
 
     def test_at(self):
         df = self.get_cars_df().sort_values(['Make', 'MSRP'])
         df.index = range(len(df))
         tbl = self.table.sort_values(['Make', 'MSRP'])
 
-        with self.assertRaises(NotImplementedError):
-            tbl.at[0, 0] 
+        self.assertEqual(df.iat[10, 5], tbl.at[10, 5])
+        self.assertEqual(df.iat[99, 0], tbl.at[99, 0])
 
-#       self.assertEqual(df.iat[10, 5], tbl.at[10, 5])
-#       self.assertEqual(df.iat[99, 0], tbl.at[99, 0])
-
-#       with self.assertRaises(KeyError):
-#           tbl.at[-5, 0]
+        with self.assertRaises(KeyError):
+            tbl.at[-5, 0]
 
-#       with self.assertRaises(KeyError):
-#           tbl.at[500, 0]
+        with self.assertRaises(KeyError):
+            tbl.at[500, 0]
 
-#       with self.assertRaises(KeyError):
-#           tbl.at[-500, 0]
+        with self.assertRaises(KeyError):
+            tbl.at[-500, 0]
 
     def test_column_at(self):
         df = self.get_cars_df().sort_values(['Make', 'MSRP'])
         df.index = range(len(df))
         tbl = self.table.sort_values(['Make', 'MSRP'])
 
-        with self.assertRaises(NotImplementedError):
-            tbl['Model'].iat[0]
-
-#       self.assertEqual(df['Model'].iat[10], tbl['Model'].at[10])
-#       self.assertEqual(df['Model'].iat[99], tbl['Model'].at[99])
+        self.assertEqual(df['Model'].iat[10], tbl['Model'].at[10])
+        self.assertEqual(df['Model'].iat[99], tbl['Model'].at[99])
 
-#       with self.assertRaises(KeyError):
-#           tbl['Model'].at[-5]
+        with self.assertRaises(KeyError):
+            tbl['Model'].at[-5]
 
-#       with self.assertRaises(KeyError):
-#           tbl['Model'].at[500]
+        with self.assertRaises(KeyError):
+            tbl['Model'].at[500]
 
-#       with self.assertRaises(KeyError):
-#           tbl['Model'].at[-500]
+        with self.assertRaises(KeyError):
+            tbl['Model'].at[-500]
 
     def test_loc(self):
         df = self.get_cars_df().sort_values(SORT_KEYS)
@@ -1798,11 +1789,12 @@ class TestCASTable(tm.TestCase):
 #       with self.assertRaises(TypeError):
 #           tbl.loc[0:1]
 
-        with self.assertRaises(IndexError):
-            tbl.loc[10:100, 'MSRP']
-
-        with self.assertRaises(IndexError):
-            tbl.loc[10, 'MSRP']
+        # Row labels are row positions and label slices include the stop
+        self.assertEqual(df['MSRP'].iloc[10:101].tolist(),
+                         tbl.loc[10:100, 'MSRP'].tolist())
+        self.assertEqual(df['MSRP'].iloc[10], tbl.loc[10, 'MSRP'])
+        self.assertEqual(df[['Make', 'MSRP']].iloc[[5, 2, 149]].values.tolist(),
+                         tbl.loc[[5, 2, 149], ['Make', 'MSRP']].values.tolist())
 
         # Row labels with single column name
         sortAssertEqual(df.loc[:, 'Make'],
@@ -1822,8 +1814,8 @@ class TestCASTable(tm.TestCase):
                          list(tbl.loc[:, ['Make', 'MSRP']].columns))
 
         # Non-existent row
-#       with self.assertRaises(KeyError):
-#           tbl.loc[500, ['Make', 'MSRP']]
+        with self.assertRaises(KeyError):
+            tbl.loc[500, ['Make', 'MSRP']]
 
         # Non-existent column
 #       dfout = df.loc[:, ['Foo', 'MSRP']].values
@@ -1876,11 +1868,17 @@ class TestCASTable(tm.TestCase):
         df = self.get_cars_df().sort_values(SORT_KEYS)
         tbl = self.table.sort_values(SORT_KEYS)
 
-        with self.assertRaises(IndexError):
-            tbl.iloc[0]
+        # Row indexes
+        self.assertEqual(df.iloc[0, 0], tbl.iloc[0, 0])
+        self.assertEqual(df.iloc[5, 3], tbl.iloc[5, 3])
+        self.assertEqual(df.iloc[149, [0, 3]].tolist(), tbl.iloc[149, [0, 3]].tolist())
+        self.assertEqual(df.iloc[-1, [0, 3]].tolist(), tbl.iloc[-1, [0, 3]].tolist())
+        self.assertTablesEqual(df.iloc[10:20], tbl.iloc[10:20], sortby=None)
+        self.assertTablesEqual(df.iloc[[7, 3, 300]], tbl.iloc[[7, 3, 300]], sortby=None)
 
+        # Non-existent row
         with self.assertRaises(IndexError):
-            tbl.iloc[0, 0]
+            tbl.iloc[500, [0, 3]]
 
         # Row indexes with single column name
         self.assertColsEqual(df.iloc[:, 0], tbl.iloc[:, 0])
@@ -1994,11 +1992,8 @@ class TestCASTable(tm.TestCase):
 #       with self.assertRaises(TypeError):
 #           tbl.ix[0:1]
 
-        with self.assertRaises(IndexError):
-            tbl.ix[0, 0]
-
-        with self.assertRaises(IndexError):
-            tbl.ix[:3, 0]
+        self.assertEqual(df.iloc[0, 0], tbl.ix[0, 0])
+        self.assertEqual(df.iloc[:4, 0].tolist(), tbl.ix[:3, 0].tolist())
 
         # Row indexes with single column name
         self.assertColsEqual(df.ix[:, 0], tbl.ix[:, 0])
@@ -2102,8 +2097,7 @@ class TestCASTable(tm.TestCase):
         self.assertEqual(sorted(df.xs('Model', axis=1).tolist()),
                          sorted(tbl.xs('Model', axis=1).tolist()))
 
-        with self.assertRaises(IndexError):
-            tbl.xs(0, axis=0) 
+        self.assertEqual(len(df.columns), len(tbl.xs(0, axis=0)))
 
         with self.assertRaises(swat.SWATError):
             tbl.xs(0, axis=2) 
@@ -2131,8 +2125,7 @@ class TestCASTable(tm.TestCase):
             tbl[5]
 
         # Row slice
-        with self.assertRaises(IndexError):
-            tbl[2:7]
+        self.assertTablesEqual(df[2:7], tbl[2:7], sortby=None)
 
     def test_sas_methods(self):
         tbl = self.table.sort_values(SORT_KEYS)
@@ -4499,6 +4492,9 @@ class TestCASTable(tm.TestCase):
         tbl = self.table
         df = self.get_cars_df()
 
+        # The data is fetched and plotted by pandas
+        swat.set_option('cas.dataset.plot_aggregation', False)
+
         self.assertPlotsEqual(
             tbl[['MSRP', 'Invoice']].plot.box(),
             df[['MSRP', 'Invoice']].plot.box()
@@ -4508,6 +4504,9 @@ class TestCASTable(tm.TestCase):
         tbl = self.table
         df = self.get_cars_df()
 
+        # The data is fetched and plotted by pandas
+        swat.set_option('cas.dataset.plot_aggregation', False)
+
         self.assertPlotsEqual(
             tbl[['MSRP', 'Invoice']].plot.density(),
             df[['MSRP', 'Invoice']].plot.density()
@@ -4517,6 +4516,9 @@ class TestCASTable(tm.TestCase):
         tbl = self.table
         df = self.get_cars_df()
 
+        # The data is fetched and plotted by pandas
+        swat.set_option('cas.dataset.plot_aggregation', False)
+
         self.assertPlotsEqual(
             tbl.plot.hexbin('MSRP', 'Horsepower'),
             df.plot.hexbin('MSRP', 'Horsepower')
@@ -4526,15 +4528,45 @@ class TestCASTable(tm.TestCase):
         tbl = self.table
         df = self.get_cars_df()
 
+        # The data is fetched and plotted by pandas
+        swat.set_option('cas.dataset.plot_aggregation', False)
+
         self.assertPlotsEqual(
             tbl.plot.hist(),
             df.plot.hist(),
         )
 
+    def test_plot_hist_aggregated(self):
+        tbl = self.table
+        df = self.get_cars_df()
+
+        ax1 = tbl[['MSRP', 'Invoice']].plot.hist(bins=20)
+        ax2 = df[['MSRP', 'Invoice']].plot.hist(bins=20)
+        self.assertEqual([x.get_height() for x in ax1.patches],
+                         [x.get_height() for x in ax2.patches])
+        self.assertEqual([x.get_x() for x in ax1.patches],
+                         [x.get_x() for x in ax2.patches])
+
+        # The bin counts are cached
+        self.assertEqual(len(tbl[['MSRP', 'Invoice']].plot.hist(bins=20).patches),
+                         len(ax1.patches))
+
+    def test_plot_hexbin_aggregated(self):
+        tbl = self.table
+        df = self.get_cars_df()
+
+        ax1 = tbl.plot.hexbin('MSRP', 'Horsepower', gridsize=20)
+        ax2 = df.plot.hexbin('MSRP', 'Horsepower', gridsize=20)
+        self.assertEqual(ax1.collections[0].get_array().tolist(),
+                         ax2.collections[0].get_array().tolist())
+
     def test_plot_kde(self):
         tbl = self.table
         df = self.get_cars_df()
 
+        # The data is fetched and plotted by pandas
+        swat.set_option('cas.dataset.plot_aggregation', False)
+
         self.assertPlotsEqual(
             tbl[['MSRP', 'Invoice']].plot.kde(),
             df[['MSRP', 'Invoice']].plot.kde()
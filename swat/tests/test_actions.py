@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import swat
+import swat.cas.actions as actions
+import swat.utils.testing as tm
+import unittest
+from swat.cas.actions import CASActionSet
+
+ASINFO = {
+    'name': 'simple',
+    'label': 'Simple Analytics',
+    'actions': [
+        {'name': 'simple.summary',
+         'desc': 'Generates descriptive statistics of numeric variables',
+         'params': [
+             {'name': 'table', 'parmType': 'value_list', 'isRequired': True,
+              'desc': 'specifies the table name.',
+              'parmList': [{'name': 'name', 'parmType': 'string',
+                            'desc': 'specifies the table name.'}]},
+             {'name': 'orderby', 'parmType': 'value_list', 'isOrderBy': True,
+              'desc': 'specifies the ordering variables.'},
+         ],
+         'results': [{'name': 'Summary', 'parmType': 'table',
+                      'desc': 'descriptive statistics'}]},
+        {'name': 'simple.freq',
+         'desc': 'Generates a frequency distribution',
+         'params': [{'name': 'table', 'parmType': 'value_list',
+                     'desc': 'specifies the table name.'}]},
+    ],
+}
+
+
+class FakeConnection(object):
+    ''' Connection that records the actions called '''
+
+    _sw_connection = None
+
+    def __init__(self):
+        self.calls = []
+
+    def retrieve(self, _name_, **kwargs):
+        self.calls.append((_name_, kwargs))
+        return kwargs
+
+
+class TestActions(tm.TestCase):
+
+    def setUp(self):
+        # Parameter defaults and docs are only generated in interactive mode
+        self._interactive_mode = swat.options.interactive_mode
+        swat.options.interactive_mode = True
+
+        self.conn = FakeConnection()
+        self.ascls = CASActionSet.from_reflection(ASINFO, self.conn)
+
+    def tearDown(self):
+        swat.options.interactive_mode = self._interactive_mode
+
+    def test_lazy_docs(self):
+        calls = []
+        format_params = actions.format_params
+
+        def counting_format_params(*args, **kwargs):
+            calls.append(args)
+            return format_params(*args, **kwargs)
+
+        actions.format_params = counting_format_params
+        try:
+            summary = self.ascls().summary
+            out = summary(table='cars')
+            self.assertEqual(self.conn.calls[-1][0], 'simple.summary')
+            self.assertEqual(out['table'], 'cars')
+            self.assertEqual(calls, [])
+            self.assertEqual(self.ascls._docs, {})
+
+            doc = type(summary).__doc__
+            self.assertEqual(len(calls), 2)
+            self.assertTrue(doc.startswith('Generates descriptive statistics'))
+            self.assertTrue('table.name : string' in doc)
+            self.assertTrue('Results Keys' in type(summary).__call__.__doc__)
+            self.assertTrue('table.name' in type(summary).set_param.__doc__)
+            self.assertEqual(summary.__doc__, doc)
+
+            # Documentation is only generated once
+            type(summary).__doc__
+            self.assertEqual(len(calls), 2)
+        finally:
+            actions.format_params = format_params
+
+    def test_params_docs(self):
+        summary = self.ascls().summary
+        self.assertTrue(summary.params.__doc__.startswith('table : dict'))
+        self.assertTrue('table.name' in dir(summary.params))
+        self.assertTrue('table.name' in type(summary).all_params)
+
+    def test_actionset_docs(self):
+        self.assertEqual(self.ascls._docs, {})
+        doc = self.ascls.__doc__
+        self.assertTrue(doc.startswith('Simple Analytics'))
+        self.assertTrue('summary : Generates descriptive' in doc)
+        self.assertEqual(self.ascls().__doc__, doc)
+
+    def test_default_params(self):
+        asinst = self.ascls()
+        asinst.default_params = {'__table__': 'cars'}
+        summary = asinst.summary
+        self.assertEqual(summary.default_params, {'__table__': 'cars'})
+        self.assertTrue(type(summary).__doc__.startswith('Generates descriptive'))
+        self.assertTrue(summary.params.__doc__.startswith('table : dict'))
+
+
+if __name__ == '__main__':
+   from swat.utils.testing import runtests
+   runtests()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import copy
+import swat
+import swat.utils.testing as tm
+import unittest
+from swat.cas.binder import ParamBinder
+
+PARAMS = [
+    {'name': 'table', 'parmType': 'value_list', 'isTableDef': True,
+     'parmList': [{'name': 'name', 'parmType': 'string'},
+                  {'name': 'caslib', 'parmType': 'string'},
+                  {'name': 'where', 'parmType': 'string'}]},
+    {'name': 'inputs', 'parmType': 'value_list'},
+    {'name': 'casout', 'parmType': 'value_list', 'isOutTableDef': True,
+     'parmList': [{'name': 'name', 'parmType': 'string'},
+                  {'name': 'caslib', 'parmType': 'string'},
+                  {'name': 'replace', 'parmType': 'boolean'}]},
+    {'name': 'subset', 'parmType': 'value_list'},
+    {'name': 'title', 'parmType': 'string'},
+]
+
+BIG_PARAMS = PARAMS + [{'name': 'opt%d' % i, 'parmType': 'value_list',
+                        'parmList': [{'name': 'sub%d' % j, 'parmType': 'string',
+                                      'desc': 'option description'}
+                                     for j in range(10)]}
+                       for i in range(200)]
+
+
+class TestParamBinder(tm.TestCase):
+
+    def test_bind(self):
+        binder = ParamBinder(PARAMS)
+        kwargs = dict(table=dict(name='cars', where='a > 1'), subset=['max', 'min'],
+                      title='Say "hi"')
+        orig = copy.deepcopy(kwargs)
+
+        out, parmlist = binder.bind(kwargs, action='simple.summary')
+
+        self.assertEqual(out, orig)
+        self.assertEqual(kwargs, orig)
+        self.assertEqual(parmlist[0]['parmList'][0]['value'], 'cars')
+        self.assertEqual(parmlist[0]['parmList'][2]['value'], 'a > 1')
+        self.assertTrue('value' not in parmlist[0]['parmList'][1])
+        self.assertEqual(parmlist[3]['value'], ['max', 'min'])
+        self.assertEqual(parmlist[4]['value'], 'Say \\u0022hi\\u0022')
+
+        # The signature is not modified and unused parameters are shared
+        self.assertTrue(all('value' not in x for x in PARAMS))
+        self.assertTrue(parmlist[2] is PARAMS[2])
+        self.assertTrue(parmlist[1] is PARAMS[1])
+
+    def test_tables(self):
+        binder = ParamBinder(PARAMS)
+        tbl = swat.CASTable('cars', caslib='casuser', where='a > 1')
+        tbl._columns = ['a', 'b']
+        out = swat.CASTable('out', caslib='casuser', replace=True)
+
+        kwargs, parmlist = binder.bind(dict(table=tbl, casout=out))
+        self.assertEqual(kwargs['table'],
+                         dict(name='cars', caslib='casuser', where='a > 1'))
+        self.assertEqual(kwargs['casout'],
+                         dict(name='out', caslib='casuser', replace=True))
+        self.assertEqual(kwargs['inputs'], ['a', 'b'])
+        self.assertEqual(parmlist[1]['value'], ['a', 'b'])
+
+        kwargs, parmlist = binder.bind(dict(__table__=tbl, inputs=['c']))
+        self.assertEqual(kwargs, dict(table=dict(name='cars', caslib='casuser',
+                                                 where='a > 1'),
+                                      inputs=['c']))
+
+        kwargs, parmlist = binder.bind(dict(table='cars'))
+        self.assertEqual(kwargs, dict(table=dict(name='cars')))
+        self.assertEqual(parmlist[0]['parmList'][0]['value'], 'cars')
+
+    def test_tableinfo(self):
+        binder = ParamBinder([{'name': 'name', 'parmType': 'string',
+                               'isTableName': True},
+                              {'name': 'caslib', 'parmType': 'string'}])
+        tbl = swat.CASTable('cars', caslib='casuser')
+
+        kwargs, parmlist = binder.bind(dict(__table__=tbl), action='table.tableinfo')
+        self.assertEqual(kwargs, dict(name='cars', caslib='casuser'))
+
+        kwargs, parmlist = binder.bind(dict(table=tbl), action='table.tableinfo')
+        self.assertEqual(kwargs, dict(table='cars', caslib='casuser'))
+
+    def test_nested_copy(self):
+        binder = ParamBinder(PARAMS)
+        tbl = swat.CASTable('cars', caslib='casuser')
+        tbl._columns = ['a', 'b']
+        table = dict(name='cars')
+
+        kwargs, parmlist = binder.bind(dict(__table__=tbl, table=table),
+                                       action='table.save')
+        self.assertEqual(table, dict(name='cars'))
+        self.assertEqual(kwargs, dict(table=dict(name='cars')))
+
+    def test_large_signature(self):
+        kwargs = dict(table=swat.CASTable('cars', caslib='casuser', where='a > 1'),
+                      inputs=['col%d' % i for i in range(1000)],
+                      opt1=dict(sub1='a', sub2='b'))
+        orig = copy.deepcopy(BIG_PARAMS)
+
+        binder = ParamBinder(BIG_PARAMS)
+        out, parmlist = binder.bind(kwargs)
+
+        # The signature is not copied or modified
+        self.assertEqual(BIG_PARAMS, orig)
+        self.assertEqual(len(parmlist), len(BIG_PARAMS))
+
+        # Only the parameters that were used are new dicts
+        self.assertEqual([i for i, (parm, sig) in enumerate(zip(parmlist, BIG_PARAMS))
+                          if parm is not sig], [0, 1, 6])
+        opt1 = parmlist[6]
+        self.assertEqual([i for i, (parm, sig) in
+                          enumerate(zip(opt1['parmList'], BIG_PARAMS[6]['parmList']))
+                          if parm is not sig], [1, 2])
+
+        # Large values are not copied
+        self.assertTrue(out['inputs'] is kwargs['inputs'])
+        self.assertTrue(parmlist[1]['value'] is kwargs['inputs'])
+
+if __name__ == '__main__':
+   from swat.utils.testing import runtests
+   runtests()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import swat
+import swat.utils.testing as tm
+import unittest
+from swat.cas.cache import CASMetadataCache
+
+
+class TestMetadataCache(tm.TestCase):
+
+    def setUp(self):
+        swat.reset_option()
+        swat.options.cas.dataset.metadata_cache = True
+        self.cache = CASMetadataCache()
+
+    def tearDown(self):
+        swat.reset_option()
+
+    def test_get_set(self):
+        tbl = swat.CASTable('cars', caslib='casuser')
+
+        self.assertTrue(self.cache.get('numrows', tbl) is None)
+        self.assertEqual(self.cache.info(), dict(hits=0, misses=1, size=0))
+
+        self.cache.set('numrows', tbl, 428)
+        self.assertEqual(self.cache.get('numrows', tbl), 428)
+        self.assertEqual(self.cache.get('numrows', swat.CASTable('CARS', caslib='CASUSER')),
+                         None)
+        self.assertEqual(self.cache.info(), dict(hits=1, misses=2, size=1))
+
+        # Where clauses are part of the key
+        self.assertTrue(self.cache.get('numrows',
+                                       swat.CASTable('cars', caslib='casuser',
+                                                     where='MSRP > 10000')) is None)
+
+        self.cache.clear()
+        self.assertEqual(self.cache.info(), dict(hits=0, misses=0, size=0))
+
+    def test_disabled(self):
+        swat.options.cas.dataset.metadata_cache = False
+        tbl = swat.CASTable('cars', caslib='casuser')
+        self.cache.set('numrows', tbl, 428)
+        self.assertTrue(self.cache.get('numrows', tbl) is None)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_invalidate(self):
+        cars = swat.CASTable('cars', caslib='casuser')
+        iris = swat.CASTable('iris', caslib='casuser')
+
+        self.cache.set('numrows', cars, 428)
+        self.cache.set('numrows', iris, 150)
+
+        self.cache.invalidate_action('simple.summary', dict(table=cars))
+        self.assertEqual(len(self.cache), 2)
+
+        self.cache.invalidate_action('table.droptable', dict(name='CARS'))
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.get('numrows', iris), 150)
+
+        self.cache.invalidate_action('simple.summary',
+                                     dict(table=cars, casout=dict(name='iris',
+                                                                  caslib='public')))
+        self.assertEqual(len(self.cache), 1)
+
+        self.cache.invalidate_action('simple.summary',
+                                     dict(table=cars, casout=dict(name='iris',
+                                                                  caslib='casuser')))
+        self.assertEqual(len(self.cache), 0)
+
+        self.cache.set('numrows', cars, 428)
+        self.cache.update_flags(set(['action-restart']))
+        self.assertEqual(len(self.cache), 1)
+        self.cache.update_flags(set(['tables']))
+        self.assertEqual(len(self.cache), 0)
+
+        self.cache.set('numrows', cars, 428)
+        self.cache.invalidate_action('datastep.runcode', dict(code='data a; run;'))
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == '__main__':
+   from swat.utils.testing import runtests
+   runtests()
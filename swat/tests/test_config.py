@@ -21,7 +21,8 @@ import swat.utils.testing as tm
 import unittest
 from swat.utils.compat import text_types
 from swat.config import (get_option, set_option, reset_option, describe_option, options, 
-                         get_suboptions, SWATOptionError, get_default,
+                         get_suboptions, SWATOptionError, get_default, get_option_snapshot,
+                         option_context,
                          check_int, check_float, check_string, check_url, check_boolean)
 from swat.utils.config import subscribe, _subscribers, unsubscribe
 
@@ -246,8 +247,8 @@ class TestConfig(tm.TestCase):
     def test_suboptions(self):
         self.assertEqual(list(sorted(get_suboptions('cas').keys())), 
                          ['dataset', 'exception_on_severity',
-                          'hostname', 'missing',
-                          'port', 'print_messages', 'protocol',
+                          'hostname', 'lazy_results', 'missing',
+                          'port', 'print_messages', 'protocol', 'rest',
                           'trace_actions', 'trace_ui_actions'])
 
         with self.assertRaises(SWATOptionError):
@@ -257,6 +258,38 @@ class TestConfig(tm.TestCase):
         with self.assertRaises(SWATOptionError):
             get_suboptions('cas.print_messages')
 
+    def test_option_snapshot(self):
+        snapshot = get_option_snapshot()
+
+        self.assertEqual(snapshot['cas.print_messages'], True)
+        self.assertEqual(snapshot['cas.dataset.index_name'], '_Index_')
+        self.assertTrue('print_messages' not in snapshot)
+
+        options.cas.print_messages = False
+        self.assertEqual(snapshot['cas.print_messages'], False)
+
+        set_option('index_name', 'Foo')
+        self.assertEqual(snapshot['cas.dataset.index_name'], 'Foo')
+
+        reset_option()
+        self.assertEqual(snapshot['cas.print_messages'], True)
+        self.assertEqual(snapshot['cas.dataset.index_name'], '_Index_')
+
+        self.assertTrue(get_option_snapshot() is snapshot)
+
+    def test_option_context(self):
+        with option_context('cas.print_messages', False, index_name='Foo'):
+            self.assertEqual(get_option('cas.print_messages'), False)
+            self.assertEqual(get_option('cas.dataset.index_name'), 'Foo')
+        self.assertEqual(get_option('cas.print_messages'), True)
+        self.assertEqual(get_option('cas.dataset.index_name'), '_Index_')
+
+        # Options are restored when an exception is raised
+        with self.assertRaises(ValueError):
+            with option_context('cas.print_messages', False):
+                raise ValueError('error')
+        self.assertEqual(get_option('cas.print_messages'), True)
+
     def test_get_default(self):
         self.assertEqual(get_default('cas.print_messages'), True)
 
@@ -0,0 +1,312 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import numpy as np
+import pandas as pd
+import sqlite3
+import swat
+import swat.utils.testing as tm
+import unittest
+from swat import clib
+from swat.cas import datamsghandlers as dmh
+
+
+class FakeError(object):
+    ''' CASError that never has an error '''
+
+    def __init__(self, soptions=''):
+        pass
+
+    def getLastErrorMessage(self):
+        return ''
+
+
+class FakeDataBuffer(object):
+    ''' CASDataBuffer that records the values that are set '''
+
+    def __init__(self, reclen, nrecs, soptions='', error=None):
+        self.reclen = reclen
+        self.nrecs = nrecs
+        self.values = {}
+
+    def getLastErrorMessage(self):
+        return ''
+
+    def _set(self, row, offset, value):
+        self.values[(int(row), int(offset))] = value
+
+    setString = setInt32 = setInt64 = setDouble = setBinaryFromBase64 = _set
+
+
+def get_values(handler):
+    ''' Write all rows of a handler and return the buffer values '''
+    out = []
+    row = 0
+    values = handler.getrow(row)
+    while values is not None:
+        handler.write(0, values)
+        out.append([handler._sw_databuffer.values.get((0, v['offset']))
+                    for v in handler.vars])
+        row += 1
+        values = handler.getrow(row)
+    return out
+
+
+class TestPandasDataFrame(tm.TestCase):
+
+    def setUp(self):
+        self._error = clib.SW_CASError
+        self._databuffer = clib.SW_CASDataBuffer
+        clib.SW_CASError = FakeError
+        clib.SW_CASDataBuffer = FakeDataBuffer
+
+    def tearDown(self):
+        clib.SW_CASError = self._error
+        clib.SW_CASDataBuffer = self._databuffer
+
+    def test_datetime(self):
+        df = pd.DataFrame(dict(
+            name=pd.Series(['a', 'b', 'c'], dtype=object),
+            dt=pd.to_datetime(['1970-01-01 12:00:00.000', None, '1959-12-31 23:59:59.500']),
+            date=pd.to_datetime(['1970-01-01 12:00', '1960-01-02 00:00', None]),
+            time=pd.to_datetime([None, '1970-01-01 12:00:00', '1980-05-01 00:00:01'])))
+
+        handler = dmh.PandasDataFrame(df, nrecs=2,
+                                      dtype=dict(date='date', time='time'))
+
+        self.assertEqual([v['type'] for v in handler.vars],
+                         ['VARCHAR', 'DATETIME', 'DATE', 'TIME'])
+        self.assertEqual(handler.transformers, {})
+
+        out = get_values(handler)
+
+        self.assertEqual(out, [
+            ['a', 315662400000000, 3653, swat.get_option('cas.missing.time')],
+            ['b', swat.get_option('cas.missing.datetime'), 1, 43200000000],
+            ['c', -500000, swat.get_option('cas.missing.date'), 1000000],
+        ])
+
+    def test_missing_option(self):
+        df = pd.DataFrame(dict(dt=pd.to_datetime([None, '1960-01-01'])))
+        handler = dmh.PandasDataFrame(df)
+        with swat.option_context('cas.missing.datetime', -1):
+            self.assertEqual(get_values(handler), [[-1], [0]])
+
+    def test_transformers(self):
+        df = pd.DataFrame(dict(dt=pd.to_datetime(['1960-01-01', '1960-01-02'])))
+        handler = dmh.PandasDataFrame(df, transformers=dict(dt=lambda x: 10))
+        self.assertEqual(get_values(handler), [[10], [10]])
+
+    def test_chunks(self):
+        df = pd.DataFrame(dict(
+            x=np.arange(10),
+            dt=pd.date_range('1960-01-01', periods=10, freq='D')))
+
+        handler = dmh.PandasDataFrame(iter([df.iloc[:4], df.iloc[4:8], df.iloc[8:]]),
+                                      nrecs=3)
+
+        out = get_values(handler)
+
+        self.assertEqual(out, [[i, i * 24 * 60 * 60 * 10**6] for i in range(10)])
+
+
+class CountingCursor(object):
+    ''' Cursor that counts the fetch calls '''
+
+    def __init__(self, cursor, error=None):
+        self._cursor = cursor
+        self._error = error
+        self.calls = dict(fetchone=0, fetchmany=0)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        if name.startswith('_') or name == 'calls':
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._cursor, name, value)
+
+    def fetchone(self):
+        self.calls['fetchone'] += 1
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size):
+        self.calls['fetchmany'] += 1
+        if self._error and self.calls['fetchmany'] > 1:
+            raise self._error
+        return self._cursor.fetchmany(size)
+
+
+class TupleCursor(CountingCursor):
+    ''' Cursor that returns tuples of rows, like pymysql '''
+
+    def fetchmany(self, size):
+        return tuple(CountingCursor.fetchmany(self, size))
+
+
+class TestDBAPI(tm.TestCase):
+
+    def setUp(self):
+        self._error = clib.SW_CASError
+        self._databuffer = clib.SW_CASDataBuffer
+        clib.SW_CASError = FakeError
+        clib.SW_CASDataBuffer = FakeDataBuffer
+
+        self.db = sqlite3.connect(':memory:', check_same_thread=False)
+        self.db.execute('create table data (i integer, x real, s text)')
+        self.db.executemany('insert into data values (?, ?, ?)',
+                            [(i, i / 2.0, 'row%d' % i) for i in range(2500)])
+
+    def tearDown(self):
+        clib.SW_CASError = self._error
+        clib.SW_CASDataBuffer = self._databuffer
+        self.db.close()
+
+    def get_cursor(self, error=None):
+        cursor = CountingCursor(self.db.cursor(), error=error)
+        cursor.execute('select * from data order by i')
+        return cursor
+
+    def test_fetchmany(self):
+        cursor = self.get_cursor()
+        handler = dmh.DBAPI(sqlite3, cursor, nrecs=1000)
+
+        self.assertEqual([v['type'] for v in handler.vars], ['SAS', 'SAS', 'VARCHAR'])
+
+        out = get_values(handler)
+
+        self.assertEqual(out, [[i, i / 2.0, 'row%d' % i] for i in range(2500)])
+        self.assertEqual(cursor.calls, dict(fetchone=1, fetchmany=4))
+
+        # Reading past the end doesn't fetch again
+        self.assertTrue(handler.getrow(2500) is None)
+        self.assertTrue(handler.getrow(2501) is None)
+        self.assertEqual(cursor.calls['fetchmany'], 4)
+
+    def test_prefetch(self):
+        cursor = self.get_cursor()
+        handler = dmh.DBAPI(sqlite3, cursor, nrecs=100, prefetch=2)
+
+        out = get_values(handler)
+
+        self.assertEqual(out, [[i, i / 2.0, 'row%d' % i] for i in range(2500)])
+        self.assertTrue(handler.getrow(2500) is None)
+
+        handler.close()
+        self.assertTrue(handler._reader is None)
+        self.assertEqual(cursor.calls['fetchone'], 1)
+
+    def test_prefetch_tuples(self):
+        cursor = TupleCursor(self.db.cursor())
+        cursor.execute('select * from data order by i')
+        handler = dmh.DBAPI(sqlite3, cursor, nrecs=1000, prefetch=2)
+
+        out = get_values(handler)
+
+        self.assertEqual(out, [[i, i / 2.0, 'row%d' % i] for i in range(2500)])
+        self.assertEqual(cursor.calls['fetchmany'], 4)
+
+        handler.close()
+
+    def test_prefetch_close(self):
+        cursor = self.get_cursor()
+        handler = dmh.DBAPI(sqlite3, cursor, nrecs=100, prefetch=1)
+
+        self.assertEqual(handler.getrow(0), (0, 0.0, 'row0'))
+
+        # Stop the reader before all blocks have been read
+        handler.close()
+        self.assertTrue(handler._reader is None)
+        self.assertTrue(cursor.calls['fetchmany'] < 25)
+
+    def test_prefetch_error(self):
+        cursor = self.get_cursor(error=sqlite3.OperationalError('failed'))
+        handler = dmh.DBAPI(sqlite3, cursor, nrecs=1000, prefetch=2)
+
+        self.assertEqual(handler.getrow(999), (999, 499.5, 'row999'))
+
+        with self.assertRaises(sqlite3.OperationalError):
+            handler.getrow(1001)
+
+        handler.close()
+
+
+class TestSQLQuery(tm.TestCase):
+
+    def setUp(self):
+        self._error = clib.SW_CASError
+        self._databuffer = clib.SW_CASDataBuffer
+        clib.SW_CASError = FakeError
+        clib.SW_CASDataBuffer = FakeDataBuffer
+
+        self.db = sqlite3.connect(':memory:', check_same_thread=False)
+        self.db.execute('create table data (i integer, x real)')
+        self.db.executemany('insert into data values (?, ?)',
+                            [(i, i / 2.0) for i in range(2500)])
+
+    def tearDown(self):
+        clib.SW_CASError = self._error
+        clib.SW_CASDataBuffer = self._databuffer
+        self.db.close()
+
+    def test_chunks(self):
+        handler = dmh.SQLQuery('select * from data order by i', self.db, nrecs=1000)
+
+        # Only the first chunk has been read
+        self.assertEqual(len(handler.data), 1000)
+
+        out = get_values(handler)
+
+        self.assertEqual(out, [[i, i / 2.0] for i in range(2500)])
+
+    def test_prefetch(self):
+        handler = dmh.SQLQuery('select * from data order by i', self.db,
+                               nrecs=100, prefetch=2)
+
+        self.assertEqual(len(handler.data), 100)
+
+        out = get_values(handler)
+
+        self.assertEqual(out, [[i, i / 2.0] for i in range(2500)])
+
+        handler.close()
+
+    def test_empty(self):
+        handler = dmh.SQLQuery('select * from data where i < 0', self.db)
+        self.assertEqual([v['name'] for v in handler.vars], ['i', 'x'])
+        self.assertEqual(get_values(handler), [])
+
+    def test_init_error(self):
+        init = dmh.PandasDataFrame.__init__
+
+        def stop(self, *args, **kwargs):
+            raise StopIteration
+
+        # Only an empty result falls back to reading without chunks
+        dmh.PandasDataFrame.__init__ = stop
+        try:
+            with self.assertRaises(StopIteration):
+                dmh.SQLQuery('select * from data order by i', self.db)
+        finally:
+            dmh.PandasDataFrame.__init__ = init
+
+
+if __name__ == '__main__':
+   from swat.utils.testing import runtests
+   runtests()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import base64
+import io
+import swat
+import swat.utils.testing as tm
+import unittest
+from swat.cas import transformers
+from swat.cas.rest.table import REST_CASTable
+from swat.cas.utils.images import LazyImage, image_cache
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def make_png(width, height):
+    ''' Return the bytes of a PNG image '''
+    buf = io.BytesIO()
+    Image.new('RGB', (width, height), 'red').save(buf, 'PNG')
+    return buf.getvalue()
+
+
+@unittest.skipIf(Image is None, 'PIL is not installed')
+class TestLazyImage(tm.TestCase):
+
+    def setUp(self):
+        image_cache.clear()
+        self.png = make_png(4, 3)
+
+    def tearDown(self):
+        image_cache.clear()
+
+    def test_lazy(self):
+        img = LazyImage(self.png)
+        self.assertEqual(len(image_cache), 0)
+        self.assertEqual(img.data, self.png)
+
+        self.assertEqual(img.size, (4, 3))
+        self.assertEqual(img.format, 'PNG')
+        self.assertTrue(isinstance(img.image, Image.Image))
+        self.assertTrue(img.image is img.image)
+        self.assertEqual(len(image_cache), 1)
+
+        self.assertEqual(img, LazyImage(self.png))
+        self.assertNotEqual(img, LazyImage(make_png(1, 1)))
+
+    def test_base64(self):
+        data = base64.b64encode(self.png).decode('ascii')
+        self.assertEqual(LazyImage(data, encoding='base64').data, self.png)
+        self.assertEqual(LazyImage(data.rstrip('='), encoding='base64').data, self.png)
+        self.assertEqual(LazyImage(data, encoding='base64').size, (4, 3))
+
+    def test_cache(self):
+        images = [LazyImage(self.png) for i in range(5)]
+
+        with swat.option_context('cas.dataset.image_cache_size', 2):
+            for img in images:
+                img.size
+            self.assertEqual(len(image_cache), 2)
+
+            # Least recently used images are dropped
+            first = images[3].image
+            images[0].size
+            self.assertTrue(images[3].image is first)
+            images[1].size
+            self.assertFalse(images[4].image is None)
+            self.assertEqual(len(image_cache), 2)
+
+        with swat.option_context('cas.dataset.image_cache_size', 0):
+            image_cache.clear()
+            self.assertFalse(images[0].image is images[0].image)
+            self.assertEqual(len(image_cache), 0)
+
+    def test_to_image(self):
+        self.assertTrue(isinstance(transformers._to_image(self.png), Image.Image))
+        self.assertTrue(isinstance(transformers._to_image(LazyImage(self.png)),
+                                   Image.Image))
+        self.assertTrue(transformers._to_image(None) is None)
+
+        with swat.option_context('cas.dataset.lazy_images', True):
+            self.assertTrue(isinstance(transformers._to_image(self.png), LazyImage))
+            self.assertTrue(transformers._to_image(None) is None)
+
+    def test_rest(self):
+        data = base64.b64encode(self.png).decode('ascii')
+
+        def get_row():
+            table = REST_CASTable(dict(
+                _ctb=True, name='Fetch', rows=[[1, {'data': data}, {'data': data}]],
+                schema=[
+                    dict(name='id', type='double', width=8),
+                    dict(name='img', type='varbinary', width=100,
+                         attributes=dict(MIMEType=dict(type='string',
+                                                       value='image/png'))),
+                    dict(name='bin', type='varbinary', width=100)]))
+            return table.toTuples('strict', None, None, None)[0]
+
+        # Images are bytes in tuples, as in the binary interface
+        for lazy in [False, True]:
+            with swat.option_context('cas.dataset.lazy_images', lazy):
+                row = get_row()
+                self.assertEqual(row[1], self.png)
+                self.assertEqual(row[2], self.png)
+
+
+if __name__ == '__main__':
+   from swat.utils.testing import runtests
+   runtests()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import json
+import os
+import subprocess
+import sys
+import swat
+import swat.utils.testing as tm
+import unittest
+
+# Maximum number of seconds that `import swat` may take.  Timing depends
+# on the machine load, so the budget is only checked when it is set.
+IMPORT_BUDGET = os.environ.get('SWAT_IMPORT_BUDGET')
+
+HEAVY_MODULES = ['pandas', 'requests', 'IPython', 'PIL',
+                 'swat.cas', 'swat.render', 'swat.notebook']
+
+SCRIPT = '''
+import json, sys, time
+start = time.time()
+import swat
+elapsed = time.time() - start
+print(json.dumps(dict(elapsed=elapsed, modules=sorted(sys.modules))))
+'''
+
+
+def _run(script):
+    ''' Run a script in a new interpreter and return the last line of output '''
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([root] + [x for x in
+                                                  [env.get('PYTHONPATH')] if x])
+    out = subprocess.check_output([sys.executable, '-c', script], env=env)
+    return out.decode('utf-8').strip().split('\n')[-1]
+
+
+def _import_swat():
+    ''' Import swat in a new interpreter and return the timing and modules '''
+    return json.loads(_run(SCRIPT))
+
+
+@unittest.skipIf(sys.hexversion < 0x03070000, 'Requires module-level __getattr__')
+class TestImport(tm.TestCase):
+
+    def test_heavy_modules(self):
+        modules = set(_import_swat()['modules'])
+        for name in HEAVY_MODULES:
+            self.assertTrue(name not in modules, '%s was imported' % name)
+
+    @unittest.skipIf(not IMPORT_BUDGET, 'SWAT_IMPORT_BUDGET is not set')
+    def test_budget(self):
+        # Use the best of a few runs to reduce noise from the machine load
+        budget = float(IMPORT_BUDGET)
+        elapsed = min(_import_swat()['elapsed'] for i in range(3))
+        self.assertTrue(elapsed < budget,
+                        '`import swat` took %.3fs; the budget is %.3fs'
+                        % (elapsed, budget))
+
+    def test_lazy_names(self):
+        for name in swat._LAZY:
+            self.assertTrue(name in dir(swat))
+
+        # Each name must be importable first in a new interpreter
+        for name in sorted(swat._LAZY):
+            out = _run('import swat; print(swat.%s is not None)' % name)
+            self.assertEqual(out, 'True', 'swat.%s could not be imported' % name)
+
+        for name in ['swat.dataframe', 'swat.formatter', 'swat.cas.table']:
+            out = _run('import %s; print(%s is not None)' % (name, name))
+            self.assertEqual(out, 'True', '%s could not be imported' % name)
+
+        self.assertTrue(swat.CAS is swat.cas.CAS)
+        self.assertTrue(swat.CASTable is swat.cas.table.CASTable)
+        self.assertTrue(swat.table is swat.cas.utils.table)
+        self.assertTrue(swat.SASDataFrame is swat.dataframe.SASDataFrame)
+
+        with self.assertRaises(AttributeError):
+            swat.does_not_exist
+
+if __name__ == '__main__':
+   from swat.utils.testing import runtests
+   runtests()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import requests
+import swat
+import swat.utils.testing as tm
+import unittest
+import zlib
+from swat.cas.rest import connection as rest
+
+
+class FakeResponse(object):
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.text = '{}'
+
+
+class FakeSession(object):
+    ''' Session that returns the given status codes / raises the given errors '''
+
+    def __init__(self, *items):
+        self.items = list(items)
+        self.requests = 0
+
+    def request(self, method, url, data=None, headers=None):
+        self.requests += 1
+        item = self.items.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return FakeResponse(item)
+
+
+class TestREST(tm.TestCase):
+
+    def setUp(self):
+        swat.reset_option()
+        swat.options.cas.rest.retry_backoff = 0
+        self.conn = object.__new__(rest.REST_CASConnection)
+        self.conn._baseurl = 'http://localhost:8777'
+
+    def tearDown(self):
+        swat.reset_option()
+
+    def test_compress(self):
+        data = b'{"table": "cars"}' * 100
+
+        self.assertEqual(rest._compress(data), (data, None))
+
+        swat.options.cas.rest.compression = 'deflate'
+        out, encoding = rest._compress(data)
+        self.assertEqual(encoding, 'deflate')
+        self.assertEqual(zlib.decompress(out), data)
+
+        swat.options.cas.rest.compression = 'gzip'
+        out, encoding = rest._compress(data)
+        self.assertEqual(encoding, 'gzip')
+        self.assertEqual(zlib.decompress(out, 16 + zlib.MAX_WBITS), data)
+
+        # Small bodies are not compressed
+        self.assertEqual(rest._compress(b'{}'), (b'{}', None))
+
+    def test_readonly(self):
+        self.assertTrue(rest._is_readonly('table.fetch', dict(table='cars')))
+        self.assertTrue(rest._is_readonly('columninfo', dict(table='cars')))
+        self.assertFalse(rest._is_readonly('simple.summary', dict(casout='out')))
+        self.assertFalse(rest._is_readonly('table.droptable', dict(name='cars')))
+
+    def test_retry_readonly(self):
+        self.conn._req_sess = FakeSession(502, requests.exceptions.ReadTimeout(), 200)
+        self.assertEqual(self.conn._request('post', 'cas').status_code, 200)
+        self.assertEqual(self.conn._req_sess.requests, 3)
+
+        swat.options.cas.rest.max_retries = 2
+        self.conn._req_sess = FakeSession(504, 504, 504, 200)
+        self.assertEqual(self.conn._request('post', 'cas').status_code, 504)
+        self.assertEqual(self.conn._req_sess.requests, 3)
+
+    def test_retry_mutating(self):
+        self.conn._req_sess = FakeSession(502, 200)
+        self.assertEqual(self.conn._request('post', 'cas', readonly=False).status_code, 502)
+
+        self.conn._req_sess = FakeSession(requests.exceptions.ReadTimeout())
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            self.conn._request('post', 'cas', readonly=False)
+
+        self.conn._req_sess = FakeSession(503, requests.exceptions.ConnectTimeout(), 200)
+        self.assertEqual(self.conn._request('post', 'cas', readonly=False).status_code, 200)
+
+
+if __name__ == '__main__':
+   from swat.utils.testing import runtests
+   runtests()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import swat
+import swat.utils.testing as tm
+import unittest
+from swat.cas import response as casresponse
+from swat.cas import results as casresults
+from swat.cas.response import CASResponse
+from swat.cas.results import CASResults, _LazyResult
+from swat.cas.rest.response import REST_CASResponse
+from swat.utils.compat import OrderedDict
+from swat.utils.config import get_option_snapshot
+
+
+class FakeConnection(object):
+    pass
+
+
+def _table(name):
+    return {'_ctb': True, 'name': name, 'schema': [], 'rows': []}
+
+
+class TestLazyResults(tm.TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self._cas2py = casresults.cas2py
+        self.global_options = []
+        current = get_option_snapshot()
+
+        def cas2py(_sw_value, soptions, connection=None, options=None):
+            if _sw_value.getType() != 'table':
+                return self._cas2py(_sw_value, soptions, connection=connection,
+                                    options=options)
+            self.calls.append(_sw_value.getKey())
+            self.global_options.append(dict(current))
+            return (_sw_value.getKey(), (options or current)['cas.dataset.format'])
+
+        casresults.cas2py = cas2py
+        casresponse.cas2py = cas2py
+
+        self.conn = FakeConnection()
+
+    def tearDown(self):
+        casresults.cas2py = self._cas2py
+        casresponse.cas2py = self._cas2py
+
+    def _get_response(self):
+        return CASResponse(REST_CASResponse(dict(results=OrderedDict([
+            ('ColumnInfo', _table('ColumnInfo')),
+            ('TableInfo', _table('TableInfo')),
+            ('status', 'ok')]))), connection=self.conn)
+
+    def _get_results(self):
+        out = CASResults()
+        for key, value in self._get_response()._iter_results(lazy=True):
+            out[key] = value
+        return out
+
+    def test_lazy(self):
+        out = self._get_results()
+        self.assertEqual(self.calls, [])
+        self.assertEqual(out['status'], 'ok')
+        self.assertEqual(sorted(out.keys()), ['ColumnInfo', 'TableInfo', 'status'])
+        self.assertTrue('ColumnInfo' in out)
+        self.assertEqual(len(out), 3)
+        self.assertEqual(self.calls, [])
+
+        self.assertEqual(out['ColumnInfo'][0], 'ColumnInfo')
+        self.assertEqual(out.ColumnInfo[0], 'ColumnInfo')
+        self.assertEqual(out.get('ColumnInfo')[0], 'ColumnInfo')
+        self.assertEqual(self.calls, ['ColumnInfo'])
+
+        values = dict(out.items())
+        self.assertEqual(values['TableInfo'][0], 'TableInfo')
+        self.assertEqual(self.calls, ['ColumnInfo', 'TableInfo'])
+        self.assertFalse(any(isinstance(x, _LazyResult) for x in out.values()))
+
+    def test_methods(self):
+        out = self._get_results()
+        self.assertEqual(out.pop('TableInfo')[0], 'TableInfo')
+        self.assertEqual(out.setdefault('ColumnInfo')[0], 'ColumnInfo')
+        self.assertEqual(out, CASResults(
+            [('ColumnInfo', ('ColumnInfo', 'dataframe:sas')), ('status', 'ok')]))
+        self.assertEqual(dict(self._get_results())['TableInfo'][0], 'TableInfo')
+        self.assertEqual(self._get_results().copy()['TableInfo'][0], 'TableInfo')
+
+    def test_options(self):
+        out = self._get_results()
+        with swat.option_context('cas.dataset.format', 'dict'):
+            self.assertEqual(out['ColumnInfo'][1], 'dataframe:sas')
+
+        with swat.option_context('cas.dataset.format', 'dict'):
+            out = self._get_results()
+        self.assertEqual(out['ColumnInfo'][1], 'dict')
+        self.assertEqual(swat.get_option('cas.dataset.format'), 'dataframe:sas')
+
+        # The saved values are passed to the conversion; global options are unchanged
+        self.assertEqual([x['cas.dataset.format'] for x in self.global_options],
+                         ['dict', 'dataframe:sas'])
+
+    def test_saved_options(self):
+        with swat.option_context('cas.dataset.format', 'dict'):
+            out = self._get_results()
+        lazy = OrderedDict.__getitem__(out, 'ColumnInfo')
+        self.assertTrue(isinstance(lazy, _LazyResult))
+
+        # Only the options used by the conversion are saved
+        self.assertEqual(lazy._options['cas.dataset.format'], 'dict')
+        self.assertTrue('encoding_errors' in lazy._options)
+        self.assertFalse('cas.print_messages' in lazy._options)
+        self.assertFalse('cas.hostname' in lazy._options)
+
+    def test_eager(self):
+        out = dict(self._get_response())
+        self.assertEqual(self.calls, ['ColumnInfo', 'TableInfo'])
+        self.assertEqual(out['ColumnInfo'][0], 'ColumnInfo')
+
+
+if __name__ == '__main__':
+   from swat.utils.testing import runtests
+   runtests()
@@ -0,0 +1,1284 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import gc
+import numpy as np
+import pandas as pd
+import swat
+import swat.utils.testing as tm
+import unittest
+from swat.cas.cache import CASMetadataCache
+from swat.cas.batch import CASBatch
+from swat.cas.results import CASResults
+from swat.cas.table import CASTable, CASColumn, _gen_table_name
+from swat.cas.temptables import CASTempTables
+
+
+class FakeResults(dict):
+    ''' CASResults with attribute access '''
+
+    def __getattr__(self, name):
+        return self.get(name)
+
+
+class FakeConnection(object):
+    ''' Connection that records the actions that are called '''
+
+    def __init__(self):
+        self.calls = []
+        self.uploads = []
+        self._ids = iter(range(1, 1000))
+        self.temp_tables = CASTempTables(self)
+
+    def _gen_id(self):
+        return str(next(self._ids))
+
+    def batch(self):
+        return CASBatch(self)
+
+    def retrieve(self, _name_, **kwargs):
+        self.temp_tables.flush()
+        self.calls.append((_name_, kwargs))
+        if _name_ == 'sessionprop.getsessopt':
+            return FakeResults(caslib='CASUSER(user)')
+        return FakeResults(status=None, severity=0)
+
+    def upload_frame(self, data, importoptions=None, casout=None):
+        self.uploads.append((data, importoptions))
+        out = CASTable(casout['name'], caslib='CASUSER(user)')
+        out.set_connection(self)
+        return out
+
+    def CASTable(self, name, **kwargs):
+        out = CASTable(name, **kwargs)
+        out.set_connection(self)
+        return out
+
+    def get_code(self):
+        return [x[1]['code'] for x in self.calls if x[0] == 'datastep.runcode']
+
+    def get_queries(self):
+        return [x[1]['query'] for x in self.calls if x[0] == 'fedsql.execdirect']
+
+    def get_dropped(self):
+        return [x[1]['name'] for x in self.calls if x[0] == 'table.droptable']
+
+
+class FakeTable(CASTable):
+    ''' CASTable with fixed data types '''
+
+    def _get_plan_dtypes(self):
+        return pd.Series(['double', 'double', 'varchar', 'int64'],
+                         index=['a', 'b', 'c', 'd'])
+
+    @property
+    def _columninfo(self):
+        dtypes = self._get_plan_dtypes()
+        return pd.DataFrame(dict(Column=dtypes.index, Type=dtypes.values,
+                                 RawLength=[8, 8, 16, 8]))
+
+    def to_view(self, name=None):
+        conn = self.get_connection()
+        conn.calls.append(('table.view', self.to_table_params()))
+        out = conn.CASTable(name or _gen_table_name(), caslib='CASUSER(user)')
+        if name is None:
+            out._temp = conn.temp_tables.add(out.params['name'], out.params['caslib'])
+        return out
+
+
+class TestDataStepPlan(tm.TestCase):
+
+    def setUp(self):
+        swat.reset_option()
+        self.conn = FakeConnection()
+        self.tbl = FakeTable('cars', caslib='casuser')
+        self.tbl.set_connection(self.conn)
+
+    def tearDown(self):
+        swat.reset_option()
+
+    def test_chain(self):
+        out = self.tbl.fillna(0).replace({'c': {'x': 'y'}}).dropna()
+
+        self.assertEqual(self.conn.get_code(), [])
+        self.assertEqual(out.params['caslib'], 'CASUSER(user)')
+        self.assertNotEqual(out.params['name'], 'cars')
+
+        self.assertEqual(out.to_table_params()['name'], out.params['name'])
+
+        code = self.conn.get_code()
+        self.assertEqual(len(code), 1)
+        code = code[0].split('\n')
+        self.assertEqual(code[0], 'data "%s"(caslib="CASUSER(user)");'
+                                  % out.params['name'])
+        self.assertEqual(code[1], '    set "cars"(caslib="casuser");')
+        self.assertEqual(code[-1], 'run;')
+        self.assertEqual([x.strip() for x in code[2:-1]], [
+            'if ( missing(a) ) then a = 0.0;',
+            'if ( missing(b) ) then b = 0.0;',
+            'if ( missing(c) ) then c = 0.0;',
+            'if ( c = "x" ) then c = "y";',
+            'if ( missing(a) ) then delete;',
+            'else if ( missing(b) ) then delete;',
+            'else if ( missing(c) ) then delete;',
+        ])
+
+        # The data step is only run once
+        out.to_table_params()
+        out.copy().to_table_name()
+        self.assertEqual(len(self.conn.get_code()), 1)
+
+        # The source table is not modified
+        self.assertEqual(self.tbl.to_table_params(), dict(name='cars', caslib='casuser'))
+        self.assertEqual(len(self.conn.get_code()), 1)
+
+    def test_branches(self):
+        filled = self.tbl.fillna(dict(a=1))
+        replaced = filled.replace(1, 2)
+
+        # Copies share the pending data step
+        filled_copy = filled.copy()
+        self.assertEqual(self.conn.get_code(), [])
+
+        filled_copy.to_table_name()
+        replaced.to_table_name()
+        filled.to_table_name()
+
+        code = self.conn.get_code()
+        self.assertEqual(len(code), 2)
+        self.assertTrue('a = 1.0' in code[0])
+        self.assertFalse('then a = 2' in code[0])
+        self.assertTrue('a = 1.0' in code[1])
+        self.assertTrue('then a = 2' in code[1])
+        self.assertTrue('set "cars"' in code[1])
+
+    def test_inplace(self):
+        self.assertTrue(self.tbl.fillna(0, inplace=True) is self.tbl)
+        self.assertEqual(len(self.conn.get_code()), 1)
+        self.tbl.dropna(inplace=True)
+
+        # In-place data steps are run immediately
+        code = self.conn.get_code()
+        self.assertEqual(len(code), 2)
+        self.assertEqual(self.tbl.params, dict(name='cars', caslib='casuser'))
+        for item in code:
+            self.assertTrue(item.startswith('data "cars"(caslib="casuser");\n'
+                                            '    set "cars"(caslib="casuser");\n'))
+        self.assertTrue('then a = 0.0' in code[0])
+        self.assertTrue('then delete' in code[1])
+
+        self.tbl.to_table_params()
+        self.assertEqual(len(self.conn.get_code()), 2)
+
+    def test_inplace_then_delete(self):
+        self.tbl.fillna(0, inplace=True)
+        del self.tbl
+        gc.collect()
+        self.assertEqual(len(self.conn.get_code()), 1)
+
+    def test_inplace_then_copy(self):
+        self.tbl.fillna(0, inplace=True)
+
+        out = self.tbl.dropna()
+        self.assertEqual(len(self.conn.get_code()), 1)
+
+        out.to_table_params()
+        code = self.conn.get_code()
+        self.assertEqual(len(code), 2)
+        self.assertFalse('then a = 0.0' in code[1])
+        self.assertTrue('then delete' in code[1])
+
+    def test_copy_then_inplace(self):
+        out = self.tbl.fillna(0)
+        self.assertEqual(self.conn.get_code(), [])
+
+        # The pending data step reads the table before it is modified
+        self.tbl.dropna(inplace=True)
+        code = self.conn.get_code()
+        self.assertEqual(len(code), 2)
+        self.assertTrue(code[0].startswith('data "%s"' % out.params['name']))
+        self.assertTrue('then a = 0.0' in code[0])
+        self.assertFalse('then delete' in code[0])
+        self.assertTrue(code[1].startswith('data "cars"(caslib="casuser");'))
+        self.assertTrue('then delete' in code[1])
+
+        self.tbl.to_table_params()
+        out.to_table_params()
+        self.assertEqual(len(self.conn.get_code()), 2)
+
+    def test_temp_inplace(self):
+        out = self.tbl.fillna(0)
+
+        # The temporary table doesn't exist yet, so the code is combined
+        self.assertTrue(out.dropna(inplace=True) is out)
+        self.assertEqual(self.conn.get_code(), [])
+
+        out.to_table_params()
+        code = self.conn.get_code()
+        self.assertEqual(len(code), 1)
+        self.assertTrue('then a = 0.0' in code[0])
+        self.assertTrue('then delete' in code[0])
+
+    def test_casout(self):
+        out = self.tbl._apply_datastep('x = 1;', casout=dict(name='out', caslib='public'))
+        self.assertEqual(out.params['name'], 'out')
+        self.assertEqual(out.params['caslib'], 'public')
+
+        # Named tables are created immediately
+        code = self.conn.get_code()
+        self.assertEqual(len(code), 1)
+        self.assertTrue(code[0].startswith('data "out"(caslib="public");'))
+
+        out.to_table_params()
+        self.assertEqual(len(self.conn.get_code()), 1)
+
+    def test_casout_chain(self):
+        out = self.tbl.fillna(0)._apply_datastep('x = 1;', casout=dict(name='clean'))
+        code = self.conn.get_code()
+        self.assertEqual(len(code), 1)
+        self.assertTrue(code[0].startswith('data "clean"'))
+        self.assertTrue('    set "cars"(caslib="casuser");' in code[0])
+        self.assertTrue('then a = 0.0' in code[0])
+        self.assertTrue('x = 1;' in code[0])
+        self.assertEqual(out.params['name'], 'clean')
+
+    def test_not_deferred(self):
+        swat.options.cas.dataset.deferred_datasteps = False
+        out = self.tbl.fillna(0)
+        self.assertEqual(len(self.conn.get_code()), 1)
+        out.dropna()
+        self.assertEqual(len(self.conn.get_code()), 2)
+        self.assertTrue('set "%s"' % out.params['name'] in self.conn.get_code()[1])
+
+    def test_temp_tables(self):
+        out = self.tbl.fillna(0)
+        unused = self.tbl.dropna()
+        col = out['a']
+        out.to_table_params()
+        name = out.params['name']
+
+        # Only tables whose data step has run are dropped
+        del out, unused
+        gc.collect()
+        self.conn.retrieve('simple.numrows')
+        self.assertEqual(self.conn.get_dropped(), [])
+
+        del col
+        gc.collect()
+        self.conn.retrieve('simple.numrows')
+        self.assertEqual(self.conn.get_dropped(), [name])
+
+    def test_temp_scope(self):
+        with self.conn.temp_tables.scope():
+            out = self.tbl.fillna(0)
+            out.to_table_params()
+            view = self.tbl.to_view()
+        self.assertEqual(sorted(self.conn.get_dropped()),
+                         sorted([out.params['name'], view.params['name']]))
+        self.assertEqual(len(self.conn.temp_tables), 0)
+
+
+class TestLookupTable(tm.TestCase):
+
+    def setUp(self):
+        swat.reset_option()
+        swat.options.cas.dataset.lookup_threshold = 3
+        self.conn = FakeConnection()
+        self.tbl = FakeTable('cars', caslib='casuser')
+        self.tbl.set_connection(self.conn)
+
+    def tearDown(self):
+        swat.reset_option()
+
+    def test_replace(self):
+        out = self.tbl.replace({'a': {1: 10, 2: 20, 3: 30}})
+
+        self.assertEqual(len(self.conn.uploads), 1)
+        data, importoptions = self.conn.uploads[0]
+        self.assertEqual(list(data.columns), ['_k1_', '_v1_'])
+        self.assertEqual(data['_k1_'].tolist(), [1.0, 2.0, 3.0])
+        self.assertEqual(data['_v1_'].tolist(), [10.0, 20.0, 30.0])
+        self.assertEqual([x['type'] for x in importoptions['vars']],
+                         ['double', 'double'])
+        self.assertEqual(self.conn.get_dropped(), [])
+
+        out.to_table_params()
+
+        # The lookup table is dropped once the data step has run
+        self.assertEqual(len(self.conn.get_dropped()), 1)
+        name = self.conn.get_dropped()[0]
+        self.assertTrue(name.startswith('_PY_T_'))
+
+        code = self.conn.get_code()[0]
+        self.assertTrue('declare hash _h1_(dataset: \'"%s"(caslib="CASUSER(user)")\');'
+                        % name in code)
+        self.assertTrue('_h1_.defineKey("_k1_");' in code)
+        self.assertTrue('_h1_.defineData("_v1_");' in code)
+        self.assertTrue('_k1_ = a;' in code)
+        self.assertTrue('if ( _h1_.find() = 0 ) then a = _v1_;' in code)
+        self.assertTrue('drop _k1_ _v1_;' in code)
+        self.assertFalse('if ( a = 1 )' in code)
+
+    def test_replace_all_columns(self):
+        out = self.tbl.replace(['w', 'x', 'y'], ['a', 'b', 'c'])
+        out.to_table_params()
+
+        code = self.conn.get_code()[0]
+        self.assertTrue('length _k1_ varchar(*) _v1_ varchar(*);' in code)
+        self.assertTrue('_k1_ = c;' in code)
+        self.assertFalse('_k1_ = a;' in code)
+        self.assertFalse('_k1_ = d;' in code)
+
+    def test_replace_small(self):
+        out = self.tbl.replace({'a': {1: 10, 2: 20}})
+        out.to_table_params()
+        self.assertEqual(self.conn.uploads, [])
+        self.assertTrue('if ( a = 1 ) then a = 10;' in self.conn.get_code()[0])
+
+        # Mappings with mixed types are always inlined
+        self.tbl.replace({'c': {1: 'a', 'b': 'c', 'd': 'e'}}).to_table_params()
+        self.assertEqual(self.conn.uploads, [])
+
+        # The threshold can be disabled
+        swat.options.cas.dataset.lookup_threshold = 0
+        self.tbl.replace({'a': {1: 10, 2: 20, 3: 30}}).to_table_params()
+        self.assertEqual(self.conn.uploads, [])
+
+    def test_shared_lookup(self):
+        replaced = self.tbl.replace({'a': {1: 10, 2: 20, 3: 30}})
+        dropped = replaced.dropna()
+
+        # The lookup table is kept until both data steps have run
+        replaced.to_table_params()
+        self.assertEqual(self.conn.get_dropped(), [])
+        dropped.to_table_params()
+        self.assertEqual(len(self.conn.get_dropped()), 1)
+
+    def test_isin(self):
+        self.tbl._columns = ['a', 'b', 'c', 'd']
+        mask = self.tbl._to_column('a').isin(pd.Series([1, 2, 3, 2]))
+
+        # The lookup table is only uploaded when rows are selected
+        self.assertEqual(self.conn.uploads, [])
+        self.assertEqual(mask.params['name'], 'cars')
+
+        out = self.tbl[mask]
+        self.assertEqual(len(self.conn.uploads), 1)
+        self.assertEqual(list(self.conn.uploads[0][0].columns), ['_k2_'])
+        self.assertTrue(isinstance(out, FakeTable))
+        self.assertNotEqual(out.params['name'], 'cars')
+        self.assertFalse('where' in out.params)
+        self.assertFalse('computedvars' in out.params)
+        self.assertEqual(out._columns, ['a', 'b', 'c', 'd'])
+
+        # The data step only writes the matching rows
+        out.to_table_params()
+        code = self.conn.get_code()
+        self.assertEqual(len(code), 1)
+        self.assertTrue('    set "cars"(caslib="casuser");' in code[0])
+        self.assertTrue('_k2_ = a;' in code[0])
+        self.assertTrue('if ( _h2_.check() = 0 );' in code[0])
+        self.assertFalse('defineData' in code[0])
+        self.assertFalse('_isin_' in code[0])
+        self.assertEqual(len(self.conn.get_dropped()), 1)
+
+    def test_isin_chain(self):
+        out = self.tbl.fillna(0)
+        out = out[out._to_column('a').isin([1, 2, 3])]
+        out.to_table_params()
+
+        # The selection is added to the pending data step
+        code = self.conn.get_code()
+        self.assertEqual(len(code), 1)
+        self.assertTrue('then a = 0.0' in code[0])
+        self.assertTrue('.check() = 0 );' in code[0])
+
+    def test_isin_inline(self):
+        mask = self.tbl._to_column('a').isin([1, 2, 3])
+
+        # Masks that aren't used directly to select rows use an in expression
+        for out in [self.tbl[~mask],
+                    self.tbl[(self.tbl._to_column('b') > 3) & mask],
+                    self.tbl[mask & (self.tbl._to_column('b') > 3)]]:
+            self.assertEqual(out.params['name'], 'cars')
+            self.assertTrue('(a in (1, 2, 3))' in out.params['computedvarsprogram'])
+        self.assertEqual(self.conn.uploads, [])
+        self.assertEqual(self.conn.get_code(), [])
+
+    def test_isin_other_table(self):
+        mask = self.tbl._to_column('a').isin([1, 2, 3])
+        other = FakeTable('other', caslib='public')
+        other.set_connection(self.conn)
+
+        # The values are looked up in the column of the selected table
+        out = other[mask]
+        out.to_table_params()
+        code = self.conn.get_code()[0]
+        self.assertTrue('    set "other"(caslib="public");' in code)
+        self.assertTrue('_k2_ = a;' in code)
+
+        combined = (other._to_column('b') > 3) & mask
+        self.assertEqual(combined.params['name'], 'other')
+        self.assertTrue('(a in (1, 2, 3))' in combined.params['computedvarsprogram'])
+
+    def test_isin_small(self):
+        mask = self.tbl._to_column('a').isin([1, 2])
+        self.assertEqual(self.conn.uploads, [])
+        self.assertEqual(mask.params['name'], 'cars')
+        self.assertTrue('(a in (1, 2))' in mask.params['computedvarsprogram'])
+
+
+class TestMerge(tm.TestCase):
+
+    def setUp(self):
+        swat.reset_option()
+        self.conn = FakeConnection()
+        self.left = FakeTable('orders', caslib='casuser')
+        self.left.set_connection(self.conn)
+        self.left._columns = ['id', 'custid', 'amount']
+        self.right = FakeTable('customers', caslib='public')
+        self.right.set_connection(self.conn)
+        self.right._columns = ['custid', 'name', 'amount']
+
+    def tearDown(self):
+        swat.reset_option()
+
+    def test_merge(self):
+        out = self.left.merge(self.right, on='custid')
+
+        self.assertTrue(isinstance(out, CASTable))
+        self.assertEqual(out.params['caslib'], 'CASUSER(user)')
+        self.assertTrue(out.params['name'].startswith('_PY_T_'))
+
+        query = self.conn.get_queries()
+        self.assertEqual(len(query), 1)
+        self.assertEqual(query[0],
+                         'CREATE TABLE "CASUSER(user)"."%s" AS SELECT '
+                         'L."id", L."custid" AS "custid", L."amount" AS "amount_x", '
+                         'R."name", R."amount" AS "amount_y" '
+                         'FROM "casuser"."orders" AS L INNER JOIN '
+                         '"public"."customers" AS R ON L."custid" = R."custid"'
+                         % out.params['name'])
+
+        # No views are needed for plain tables
+        self.assertFalse('table.view' in [x[0] for x in self.conn.calls])
+
+    def test_merge_how(self):
+        self.left.merge(self.right, how='outer')
+        self.left.merge(self.right, how='right', on=['custid', 'amount'],
+                        casout=dict(name='out', caslib='public', replace=True))
+
+        query = self.conn.get_queries()
+        self.assertTrue('COALESCE(L."custid", R."custid") AS "custid"' in query[0])
+        self.assertTrue('COALESCE(L."amount", R."amount") AS "amount"' in query[0])
+        self.assertTrue(' FULL OUTER JOIN ' in query[0])
+        self.assertTrue(query[0].endswith('ON L."custid" = R."custid" AND '
+                                          'L."amount" = R."amount"'))
+
+        self.assertTrue(query[1].startswith('CREATE TABLE "public"."out" '
+                                            '{options replace=true} AS SELECT '
+                                            'L."id", R."custid" AS "custid"'))
+        self.assertTrue(' RIGHT OUTER JOIN ' in query[1])
+
+    def test_merge_left_on(self):
+        self.right._columns = ['cid', 'name']
+        self.left.merge(self.right, left_on='custid', right_on='cid', how='left')
+
+        query = self.conn.get_queries()[0]
+        self.assertTrue('SELECT L."id", L."custid", L."amount", R."cid", R."name" '
+                        in query)
+        self.assertTrue(' LEFT OUTER JOIN ' in query)
+        self.assertTrue(query.endswith('ON L."custid" = R."cid"'))
+
+    def test_merge_views(self):
+        left = self.left.query('amount > 100')
+        left.merge(self.right, on='custid')
+
+        views = [x for x in self.conn.calls if x[0] == 'table.view']
+        self.assertEqual(len(views), 1)
+        self.assertEqual(views[0][1]['where'], '(amount > 100)')
+
+        # The view is queried and then dropped
+        dropped = self.conn.get_dropped()
+        self.assertEqual(len(dropped), 1)
+        self.assertTrue('FROM "CASUSER(user)"."%s" AS L' % dropped[0]
+                        in self.conn.get_queries()[0])
+
+    def test_merge_errors(self):
+        with self.assertRaises(TypeError):
+            self.left.merge(pd.DataFrame())
+        with self.assertRaises(ValueError):
+            self.left.merge(self.right, how='cross')
+        with self.assertRaises(ValueError):
+            self.left.merge(self.right, left_index=True, right_index=True)
+        with self.assertRaises(ValueError):
+            self.left.merge(self.right, left_on='custid')
+        with self.assertRaises(ValueError):
+            self.left.merge(self.right, on='foo')
+        with self.assertRaises(ValueError):
+            self.left.merge(self.right, on='custid', suffixes=(None, None))
+        with self.assertRaises(ValueError):
+            self.left.join(self.right)
+        self.assertEqual(self.conn.get_queries(), [])
+
+    def test_join(self):
+        self.left.join(self.right, on='custid', rsuffix='_r')
+
+        query = self.conn.get_queries()[0]
+        self.assertTrue('L."amount" AS "amount", R."name", R."amount" AS "amount_r" '
+                        in query)
+        self.assertTrue(' LEFT OUTER JOIN ' in query)
+
+
+class OtherTable(FakeTable):
+    ''' FakeTable with different column types '''
+
+    @property
+    def _columninfo(self):
+        return pd.DataFrame(dict(Column=['a', 'c', 'e'],
+                                 Type=['double', 'char', 'char'],
+                                 RawLength=[8, 32, 4]))
+
+
+class TestAppend(tm.TestCase):
+
+    def setUp(self):
+        swat.reset_option()
+        self.conn = FakeConnection()
+        self.jan = FakeTable('jan', caslib='casuser')
+        self.jan.set_connection(self.conn)
+        self.feb = OtherTable('feb')
+        self.feb.set_connection(self.conn)
+
+    def tearDown(self):
+        swat.reset_option()
+
+    def test_append(self):
+        out = self.jan.append(self.feb)
+
+        self.assertEqual(out.params['caslib'], 'CASUSER(user)')
+        self.assertTrue(out.params['name'].startswith('_PY_T_'))
+
+        code = self.conn.get_code()
+        self.assertEqual(len(code), 1)
+        self.assertEqual(code[0].split('\n'), [
+            'data "%s"(caslib="CASUSER(user)");' % out.params['name'],
+            '    length a 8 b 8 c varchar(*) d 8 e $ 4;',
+            '    set "jan"(caslib="casuser") "feb";',
+            'run;',
+        ])
+
+    def test_concat(self):
+        self.feb._columns = ['a', 'e']
+        marc = FakeTable('mar', caslib='public', where='a > 1')
+        marc.set_connection(self.conn)
+
+        out = swat.concat([self.jan, self.feb, marc], casout='all')
+        self.assertEqual(out.params, dict(name='all', caslib='CASUSER(user)'))
+
+        code = self.conn.get_code()[0].split('\n')
+        view = self.conn.get_dropped()
+        self.assertEqual(len(view), 1)
+        self.assertEqual(code[2], '    set "jan"(caslib="casuser") "feb"(keep=a e) '
+                                  '"%s"(caslib="CASUSER(user)");' % view[0])
+
+    def test_incompatible(self):
+        class CharTable(FakeTable):
+            _columninfo = pd.DataFrame(dict(Column=['b'], Type=['char'],
+                                            RawLength=[8]))
+
+        mar = CharTable('mar')
+        mar.set_connection(self.conn)
+        with self.assertRaises(TypeError):
+            mar.append(self.jan)
+        with self.assertRaises(TypeError):
+            self.jan.append(pd.DataFrame())
+
+    def test_view(self):
+        self.feb._columns = ['a', 'e']
+        out = self.jan.append([self.feb], view=True,
+                              casout=dict(name='jf', caslib='public', replace=True))
+        self.assertEqual(out.params, dict(name='jf', caslib='public'))
+        self.assertEqual(self.conn.get_code(), [])
+
+        name, kwargs = self.conn.calls[-1]
+        self.assertEqual(name, 'table.view')
+        self.assertEqual(kwargs['name'], 'jf')
+        self.assertEqual(kwargs['caslib'], 'public')
+        self.assertEqual(kwargs['replace'], True)
+        self.assertEqual(kwargs['tables'], [dict(name='jan', caslib='casuser'),
+                                            dict(name='feb', vars=['a', 'e'])])
+
+
+class TestPivotTable(tm.TestCase):
+
+    data = pd.DataFrame(dict(
+        Origin=['Asia', 'Asia', 'Asia', 'Europe', 'Europe', 'USA', 'USA'],
+        Type=['SUV', 'Sedan', 'Sedan', 'Sedan', 'Sports', 'SUV', 'SUV'],
+        MSRP=[30000., 20000., 22000., 40000., 90000., 35000., 31000.],
+        Weight=[4000., 3000., 3100., 3500., 3200., 4500., 4300.]))
+
+    def setUp(self):
+        swat.reset_option()
+        self.conn = FakeConnection()
+        self.tbl = FakeTable('cars', caslib='casuser')
+        self.tbl.set_connection(self.conn)
+
+        self._summary = CASTable._summary
+        self.wheres = []
+        stats = dict(MEAN=('mean', 'mean'), SUM=('sum', 'sum'), N=('count', 'count'),
+                     MAX=('max', 'max'), NMISS=('nmiss', lambda x: x.isnull().sum()))
+
+        def summary(tbl, **kwargs):
+            groups = tbl.get_param('groupby')
+            tbl.get_connection().calls.append(('simple.summary',
+                                               dict(kwargs, groupby=groups)))
+            self.wheres.append(tbl.get_param('where', None))
+            data = self.data.assign(_crosstab_n_=1)
+            grouped = data.groupby(groups)[kwargs['inputs']]
+            out = pd.concat(dict((stats[x][0], grouped.agg(stats[x][1]))
+                                 for x in kwargs['subset']))
+            out = out.reorder_levels(list(range(1, len(groups) + 1)) + [0])
+            return out.sort_index()
+
+        CASTable._summary = summary
+
+    def tearDown(self):
+        CASTable._summary = self._summary
+        swat.reset_option()
+
+    def assertFramesEqual(self, a, b):
+        self.assertEqual(list(a.index), list(b.index))
+        self.assertEqual(list(a.columns), list(b.columns))
+        self.assertTablesEqual(a, b)
+
+    def test_pivot_table(self):
+        out = self.tbl.pivot_table(values='MSRP', index='Origin', columns='Type')
+        expected = pd.pivot_table(self.data, values='MSRP', index='Origin',
+                                  columns='Type')
+        self.assertFramesEqual(out, expected)
+
+        name, kwargs = self.conn.calls[-1]
+        self.assertEqual(name, 'simple.summary')
+        self.assertEqual(kwargs, dict(inputs=['MSRP'], subset=['MEAN'],
+                                      groupby=['Origin', 'Type']))
+
+    def test_pivot_table_aggfuncs(self):
+        out = self.tbl.pivot_table(values=['MSRP', 'Weight'], index=['Origin'],
+                                   columns='Type', aggfunc=['sum', np.max],
+                                   fill_value=0)
+        expected = pd.pivot_table(self.data, values=['MSRP', 'Weight'],
+                                  index=['Origin'], columns='Type',
+                                  aggfunc=['sum', 'max'], fill_value=0)
+        self.assertFramesEqual(out, expected)
+        self.assertEqual(self.conn.calls[-1][1]['subset'], ['MAX', 'SUM'])
+
+        out = self.tbl.pivot_table(values=['MSRP'], index=['Origin', 'Type'],
+                                   aggfunc='count')
+        expected = pd.pivot_table(self.data, values=['MSRP'],
+                                  index=['Origin', 'Type'], aggfunc='count')
+        self.assertFramesEqual(out, expected)
+
+    def test_pivot_table_len(self):
+        self.data = self.data.assign(MSRP=[30000., np.nan, 22000., 40000.,
+                                           np.nan, 35000., 31000.])
+
+        # Rows with missing values are counted
+        out = self.tbl.pivot_table(values='MSRP', index='Origin', aggfunc=len)
+        self.assertEqual(list(out['MSRP']), [3, 2, 2])
+        self.assertEqual(self.conn.calls[-1][1]['subset'], ['N', 'NMISS'])
+
+        out = self.tbl.pivot_table(values='MSRP', index='Origin', aggfunc='count')
+        self.assertEqual(list(out['MSRP']), [2, 1, 2])
+
+    def test_pivot_table_errors(self):
+        with self.assertRaises(ValueError):
+            self.tbl.pivot_table(values='MSRP', columns='Type')
+        with self.assertRaises(ValueError):
+            self.tbl.pivot_table(values='MSRP', index='Origin', aggfunc='median')
+        with self.assertRaises(NotImplementedError):
+            self.tbl.pivot_table(values='MSRP', index='Origin', margins=True)
+        self.assertEqual(self.conn.calls, [])
+
+    def test_crosstab(self):
+        origin = self.tbl._to_column('Origin')
+        ctype = self.tbl._to_column('Type')
+
+        out = swat.crosstab(origin, ctype)
+        expected = pd.crosstab(self.data['Origin'], self.data['Type'])
+        self.assertFramesEqual(out, expected)
+
+        name, kwargs = self.conn.calls[-1]
+        self.assertEqual(kwargs['inputs'], ['_crosstab_n_'])
+
+        out = swat.crosstab(origin, ctype, values=self.tbl._to_column('MSRP'),
+                            aggfunc='sum', normalize='index')
+        expected = pd.crosstab(self.data['Origin'], self.data['Type'],
+                               values=self.data['MSRP'], aggfunc='sum',
+                               normalize='index')
+        self.assertFramesEqual(out, expected)
+
+        with self.assertRaises(ValueError):
+            swat.crosstab(origin, ctype, aggfunc='sum')
+
+        # Columns from tables with the same name in different caslibs
+        other = FakeTable('cars', caslib='public')
+        other.set_connection(self.conn)
+        with self.assertRaises(ValueError):
+            swat.crosstab(origin, other._to_column('Type'))
+
+        # The where clauses of all of the columns are used
+        usa = self.tbl.copy()
+        usa.set_param('where', "Origin = 'USA'")
+        suv = self.tbl.copy()
+        suv.set_param('where', "Type = 'SUV'")
+        swat.crosstab(usa._to_column('Origin'), suv._to_column('Type'))
+        self.assertEqual(self.wheres[-1], "(Origin = 'USA') and (Type = 'SUV')")
+
+        # Non-CAS values use pandas
+        self.assertFramesEqual(swat.crosstab(self.data['Origin'], self.data['Type']),
+                              pd.crosstab(self.data['Origin'], self.data['Type']))
+
+
+class TopkTable(FakeTable):
+    ''' CASTable with results for the simple.topk and table.fetch actions '''
+
+    data = pd.DataFrame(dict(
+        Origin=['Asia', 'Asia', 'Asia', 'Europe', 'Europe', 'USA', 'USA', 'USA'],
+        Make=['Acura', 'Honda', 'Kia', 'BMW', 'Audi', 'Ford', 'GMC', 'Jeep'],
+        MSRP=[30000., 20000., 22000., 40000., 90000., 35000., 31000., 35000.]),
+        columns=['Origin', 'Make', 'MSRP'])
+
+    def _retrieve(self, _name_, **kwargs):
+        self.get_connection().calls.append((_name_, dict(kwargs,
+                                                         **self.to_table_params())))
+        groups = self.get_groupby_vars()
+        out = CASResults()
+
+        if _name_ == 'simple.topk':
+            name = kwargs['inputs'][0]
+            grouped = groups and self.data.groupby(groups[0]) or [(None, self.data)]
+            for i, (value, group) in enumerate(grouped):
+                values = group[name].drop_duplicates().sort_values(
+                    ascending=not kwargs['topk'])
+                values = values.iloc[:kwargs['topk'] or kwargs['bottomk']]
+                topk = pd.DataFrame(dict(Column=name, Rank=range(1, len(values) + 1),
+                                         NumVar=list(values)))
+                if groups:
+                    topk.attrs.update(ByVar1=groups[0], ByVar1Value=value,
+                                      ByVar1ValueFormatted=value)
+                out['ByGroup%d.Topk' % (i + 1)] = topk
+
+        elif _name_ == 'table.fetch':
+            sortby = kwargs['sortby']
+            data = self.data
+            if self.params.get('where'):
+                # Missing values are smaller than all numbers, as in CAS
+                numeric = data.select_dtypes('number').columns
+                query = data.fillna(dict((x, -np.inf) for x in numeric))\
+                            .query(self.params['where'].replace(' = ', ' == '))
+                data = data.loc[query.index]
+            data = data.sort_values([x['name'] for x in sortby],
+                                    ascending=[x['order'] == 'ASCENDING'
+                                               for x in sortby],
+                                    kind='mergesort', na_position='first')
+            data = data[self._columns or list(data.columns)]
+            data = data.iloc[kwargs.get('from', 1) - 1:kwargs['to']]
+            data.insert(0, '_Index_', range(1, len(data) + 1))
+            out['Fetch'] = data
+            out.severity = 0
+
+        return out
+
+
+class MissingTopkTable(TopkTable):
+    ''' TopkTable with a missing sort value '''
+
+    data = pd.concat([TopkTable.data,
+                      pd.DataFrame(dict(Origin=['Europe'], Make=['Mini'], MSRP=[np.nan]))],
+                     ignore_index=True)
+
+
+class TiedTopkTable(TopkTable):
+    ''' TopkTable with tied largest values in a By group '''
+
+    data = pd.DataFrame(dict(
+        Origin=['Asia', 'Asia', 'Asia', 'Europe', 'USA'],
+        Make=['Acura', 'Lexus', 'Kia', 'BMW', 'Ford'],
+        MSRP=[30000., 30000., 22000., 40000., 35000.]),
+        columns=['Origin', 'Make', 'MSRP'])
+
+
+class TopkConnection(FakeConnection):
+    ''' Connection that calls table.fetch on the TopkTable it is given '''
+
+    def retrieve(self, _name_, **kwargs):
+        if _name_ == 'table.fetch':
+            return kwargs.pop('__table__')._retrieve(_name_, **kwargs)
+        return FakeConnection.retrieve(self, _name_, **kwargs)
+
+
+class TestTopk(tm.TestCase):
+
+    def setUp(self):
+        swat.reset_option()
+        self.conn = TopkConnection()
+        self.tbl = TopkTable('cars', caslib='casuser')
+        self.tbl.set_connection(self.conn)
+
+    def tearDown(self):
+        swat.reset_option()
+
+    def assertRowsEqual(self, a, b):
+        self.assertEqual(list(a.columns), list(b.columns))
+        self.assertEqual(a.values.tolist(), b.values.tolist())
+
+    def test_nlargest(self):
+        out = self.tbl.nlargest(3, 'MSRP')
+        self.assertRowsEqual(out, TopkTable.data.nlargest(3, 'MSRP'))
+
+        name, kwargs = self.conn.calls[0]
+        self.assertEqual(name, 'simple.topk')
+        self.assertEqual(kwargs['inputs'], ['MSRP'])
+        self.assertEqual((kwargs['topk'], kwargs['bottomk']), (3, 0))
+
+        name, kwargs = self.conn.calls[1]
+        self.assertEqual(name, 'table.fetch')
+        self.assertEqual(kwargs['where'], '(MSRP >= 35000.0)')
+        self.assertEqual(kwargs['to'], 3)
+        self.assertEqual(len(self.conn.calls), 2)
+
+    def test_nsmallest(self):
+        out = self.tbl.nsmallest(2, 'MSRP')
+        self.assertRowsEqual(out, TopkTable.data.nsmallest(2, 'MSRP'))
+
+        name, kwargs = self.conn.calls[1]
+        self.assertEqual(kwargs['where'], '(MSRP <= 22000.0)')
+        self.assertEqual(kwargs['to'], 2)
+
+    def test_groupby(self):
+        out = self.tbl.groupby('Origin').nlargest(1, 'MSRP')
+        expected = TopkTable.data.sort_values('MSRP', ascending=False,
+                                              kind='mergesort')
+        expected = expected.groupby('Origin').head(1).sort_values('Origin')
+        self.assertEqual(out.index.names, ['Origin'])
+        self.assertRowsEqual(out.reset_index(), expected)
+
+        # All By groups are handled in one topk call and one fetch
+        self.assertEqual([x[0] for x in self.conn.calls], ['simple.topk', 'table.fetch'])
+        kwargs = self.conn.calls[1][1]
+        self.assertEqual(kwargs['where'],
+                         '((Origin = "Asia" and MSRP >= 30000.0) or '
+                         '(Origin = "Europe" and MSRP >= 90000.0) or '
+                         '(Origin = "USA" and MSRP >= 35000.0))')
+        self.assertNotIn('groupby', kwargs)
+        self.assertEqual(kwargs['to'], 3)
+        self.assertEqual([x['name'] for x in kwargs['sortby']], ['Origin', 'MSRP'])
+
+    def test_groupby_ties(self):
+        tbl = TiedTopkTable('cars', caslib='casuser')
+        tbl.set_connection(self.conn)
+
+        out = tbl.groupby('Origin').nlargest(1, 'MSRP')
+        expected = TiedTopkTable.data.sort_values('MSRP', ascending=False,
+                                                  kind='mergesort')
+        expected = expected.groupby('Origin').head(1).sort_values('Origin')
+        self.assertRowsEqual(out.reset_index(), expected)
+
+        # The tie in Asia pushes USA out of the first fetch
+        fetches = [x[1] for x in self.conn.calls if x[0] == 'table.fetch']
+        self.assertEqual([x['to'] for x in fetches], [3, 1])
+        self.assertTrue(fetches[1]['where'].endswith(
+            'and not ((Origin = "Asia") or (Origin = "Europe")))'))
+
+    def test_sorted_head(self):
+        out = self.tbl.sort_values('MSRP').head(2, columns=['Make'])
+        self.assertEqual(list(out.columns), ['Make'])
+        self.assertEqual(list(out['Make']), ['Honda', 'Kia'])
+        self.assertEqual(self.conn.calls[0][1]['bottomk'], 2)
+        self.assertEqual(self.conn.calls[1][1]['to'], 2)
+
+    def test_sorted_head_missing(self):
+        tbl = MissingTopkTable('cars', caslib='casuser')
+        tbl.set_connection(self.conn)
+
+        # Missing values sort first, as they do when sorting the whole table
+        out = tbl.sort_values('MSRP').head(2)
+        self.assertEqual(list(out['Make']), ['Mini', 'Honda'])
+        self.assertEqual(self.conn.calls[1][1]['where'], '(MSRP <= 22000.0)')
+
+    def test_sorted_head_few_values(self):
+        # With fewer distinct values than rows, the sort key isn't filtered
+        out = self.tbl.sort_values('Origin').head()
+        self.assertEqual(list(out['Origin']), ['Asia'] * 3 + ['Europe'] * 2)
+        name, kwargs = self.conn.calls[1]
+        self.assertNotIn('where', kwargs)
+        self.assertEqual(kwargs['to'], 5)
+
+
+class FetchConnection(FakeConnection):
+    ''' Connection that returns rows of TopkTable.data from table.fetch '''
+
+    def retrieve(self, _name_, **kwargs):
+        out = FakeConnection.retrieve(self, _name_, **kwargs)
+        if _name_ == 'table.fetch':
+            tbl = kwargs['__table__']
+            data = TopkTable.data[tbl._columns or list(TopkTable.data.columns)]
+            data = data.iloc[kwargs['from'] - 1:kwargs['to']]
+            data.insert(0, '_Index_', range(kwargs['from'], kwargs['from'] + len(data)))
+            out = CASResults(Fetch=data)
+            out.severity = 0
+        return out
+
+    def get_windows(self):
+        return [(x[1]['from'], x[1]['to']) for x in self.calls if x[0] == 'table.fetch']
+
+
+class RowsTable(CASTable):
+    ''' CASTable with the columns and number of rows of TopkTable.data '''
+
+    @property
+    def _columninfo(self):
+        return pd.DataFrame(dict(Column=TopkTable.data.columns))
+
+    @property
+    def _numrows(self):
+        self.get_connection().calls.append(('simple.numrows', {}))
+        return len(TopkTable.data)
+
+
+class TestRowSelection(tm.TestCase):
+
+    def setUp(self):
+        swat.reset_option()
+        self.conn = FetchConnection()
+        self.tbl = RowsTable('cars', caslib='casuser')
+        self.tbl.set_connection(self.conn)
+        self.df = TopkTable.data
+
+    def tearDown(self):
+        swat.reset_option()
+
+    def assertRowsEqual(self, a, b):
+        self.assertEqual(list(a.index), list(b.index))
+        self.assertEqual(list(a.columns), list(b.columns))
+        self.assertEqual(a.values.tolist(), b.values.tolist())
+
+    def test_iloc(self):
+        self.assertRowsEqual(self.tbl.iloc[2:5], self.df.iloc[2:5])
+        self.assertEqual(self.conn.get_windows(), [(3, 5)])
+
+        self.assertRowsEqual(self.tbl.iloc[[6, 0, 1, 5, 1]],
+                             self.df.iloc[[6, 0, 1, 5, 1]])
+        self.assertEqual(self.conn.get_windows()[1:], [(1, 2), (6, 7)])
+
+        self.assertEqual(self.tbl.iloc[3].tolist(), self.df.iloc[3].tolist())
+        self.assertEqual(self.tbl.iloc[3, 1], self.df.iloc[3, 1])
+        self.assertEqual(self.tbl.iloc[1:3, 1].tolist(), self.df.iloc[1:3, 1].tolist())
+        self.assertRowsEqual(self.tbl.iloc[::3, [0, 2]], self.df.iloc[::3, [0, 2]])
+        self.assertRowsEqual(self.tbl.iloc[-2:], self.df.iloc[-2:])
+        self.assertEqual(self.tbl.iloc[-1].tolist(), self.df.iloc[-1].tolist())
+
+        with self.assertRaises(IndexError):
+            self.tbl.iloc[[1, 100]]
+
+    def test_loc(self):
+        self.assertRowsEqual(self.tbl.loc[2:5, ['Make']], self.df.loc[2:5, ['Make']])
+        self.assertEqual(self.conn.get_windows(), [(3, 6)])
+        self.assertEqual(self.tbl.ix[4, 'MSRP'], self.df.loc[4, 'MSRP'])
+
+        # Positive labels don't need the number of rows
+        self.assertNotIn('simple.numrows', [x[0] for x in self.conn.calls])
+
+        with self.assertRaises(KeyError):
+            self.tbl.loc[-1]
+        with self.assertRaises(KeyError):
+            self.tbl.loc[[1, 100]]
+
+    def test_scalars(self):
+        self.assertEqual(self.tbl.iat[2, 1], self.df.iat[2, 1])
+        self.assertEqual(self.tbl.at[5, 'MSRP'], self.df.at[5, 'MSRP'])
+        self.assertEqual(self.tbl.get_value(-1, 'make'), self.df['Make'].iloc[-1])
+
+        with self.assertRaises(KeyError):
+            self.tbl.at[100, 'MSRP']
+        with self.assertRaises(KeyError):
+            self.tbl.get_value(1, 'Foo')
+
+    def test_lookup(self):
+        out = self.tbl.lookup([0, 5, 6, 1], ['Make', 'MSRP', 'Make', 'Make'])
+        self.assertEqual(list(out), ['Acura', 35000., 'GMC', 'Honda'])
+
+        # All of the values are fetched in one batch
+        name, kwargs = self.conn.calls[-1]
+        self.assertEqual(kwargs['__table__']._columns, ['Make', 'MSRP'])
+        self.assertEqual(self.conn.get_windows(), [(1, 2), (6, 7)])
+
+
+class PartitionTable(FakeTable):
+    ''' CASTable with results for the table.partition action '''
+
+    def _retrieve(self, _name_, **kwargs):
+        conn = self.get_connection()
+        conn.calls.append((_name_, dict(kwargs, **self.to_table_params())))
+        return FakeResults(casTable=conn.CASTable(kwargs['casout']['name'],
+                                                  caslib='CASUSER(user)'))
+
+
+class TestCache(tm.TestCase):
+
+    def setUp(self):
+        swat.reset_option()
+        self.conn = FakeConnection()
+        self.tbl = PartitionTable('cars', caslib='casuser', where='a > 1',
+                                  groupby=['c'], computedvars=['e'],
+                                  computedvarsprogram='e = a * 2;')
+        self.tbl.set_connection(self.conn)
+
+    def tearDown(self):
+        swat.reset_option()
+
+    def test_cache(self):
+        tbl = self.tbl
+        self.assertIs(tbl.cache(), tbl)
+
+        name, kwargs = self.conn.calls[0]
+        self.assertEqual(name, 'table.partition')
+        self.assertEqual(kwargs['where'], 'a > 1')
+        self.assertEqual(kwargs['computedvars'], ['e'])
+
+        # Later actions use the cached table with the remaining parameters
+        tmpname = kwargs['casout']['name']
+        self.assertEqual(tbl.to_table_params(),
+                         dict(name=tmpname, caslib='CASUSER(user)', groupby=['c']))
+
+        # Caching again does nothing
+        tbl.persist()
+        self.assertEqual(len(self.conn.calls), 1)
+
+    def test_uncache(self):
+        tbl = self.tbl
+        params = tbl.to_table_params()
+        tbl.cache()
+        tmpname = self.conn.calls[0][1]['casout']['name']
+        tbl.uncache()
+        gc.collect()
+        self.conn.temp_tables.flush()
+        self.assertEqual(tbl.to_table_params(), params)
+        self.assertEqual(self.conn.get_dropped(), [tmpname])
+
+    def test_drop(self):
+        tbl = self.tbl.cache()
+        tmpname = self.conn.calls[0][1]['casout']['name']
+        col = tbl['a']
+        tblcopy = tbl.copy()
+
+        # The table is dropped after the last object that uses it is released
+        del tbl
+        self.tbl = None
+        gc.collect()
+        self.conn.temp_tables.flush()
+        self.assertEqual(self.conn.get_dropped(), [])
+        self.assertEqual(col.params['name'], tmpname)
+
+        del col
+        gc.collect()
+        self.conn.temp_tables.flush()
+        self.assertEqual(self.conn.get_dropped(), [])
+
+        del tblcopy
+        gc.collect()
+        self.conn.temp_tables.flush()
+        self.assertEqual(self.conn.get_dropped(), [tmpname])
+
+
+
+class PlotTable(FakeTable):
+    ''' CASTable with results for the actions used by CASTablePlotter '''
+
+    data = pd.DataFrame(dict(a=[1., 2., 2., 3., 3., 3., 4., 20.],
+                             b=[5., 5., 6., 6., 7., 7., 8., np.nan],
+                             d=[0., 1., 0., 1., 0., 1., 0., 1.]),
+                        columns=['a', 'b', 'd'])
+
+    # Counts returned by simple.freq for each computed column
+    freq = {}
+
+    def _retrieve(self, _name_, **kwargs):
+        self.get_connection().calls.append((_name_, dict(kwargs,
+                                                         **self.to_table_params())))
+        out = CASResults()
+
+        if _name_ == 'simple.summary':
+            rows = []
+            for name in kwargs['inputs']:
+                values = self.data[name] if name in self.data else \
+                    pd.Series(self.freq.get(name, [np.nan]))
+                rows.append(dict(Column=name, N=values.count(), Min=values.min(),
+                                 Max=values.max(), Mean=values.mean()))
+            out['Summary'] = pd.DataFrame(rows)
+
+        elif _name_ == 'simple.freq':
+            rows = []
+            for name in kwargs['inputs']:
+                for value, count in sorted(self.freq[name].items()):
+                    rows.append(dict(Column=name, NumVar=value, Frequency=count))
+            out['Frequency'] = pd.DataFrame(rows)
+
+        elif _name_ == 'percentile.percentile':
+            rows = []
+            for name in kwargs['inputs']:
+                for pct in kwargs['values']:
+                    rows.append(dict(Variable=name, Pctl=float(pct),
+                                     Value=self.data[name].quantile(pct / 100.)))
+            out['Percentile'] = pd.DataFrame(rows)
+
+        return out
+
+
+class TestPlotter(tm.TestCase):
+
+    def setUp(self):
+        swat.reset_option()
+        swat.options.cas.dataset.metadata_cache = True
+        self.conn = FakeConnection()
+        self.conn.metadata_cache = CASMetadataCache()
+        self.tbl = PlotTable('cars', caslib='casuser')
+        self.tbl.set_connection(self.conn)
+        PlotTable.freq = {}
+
+    def tearDown(self):
+        swat.reset_option()
+        PlotTable.freq = {}
+
+    def get_actions(self):
+        return [x[0] for x in self.conn.calls if not x[0].startswith('builtin')]
+
+    def test_use_aggregation(self):
+        self.assertTrue(self.tbl.plot._use_aggregation())
+        self.assertFalse(self.tbl.plot._use_aggregation(by='d'))
+        self.assertFalse(self.tbl.plot._use_aggregation(weights=[1, 2]))
+        self.assertFalse(self.tbl.groupby('d').plot._use_aggregation())
+
+        swat.set_option('cas.dataset.plot_aggregation', False)
+        self.assertFalse(self.tbl.plot._use_aggregation())
+
+    def test_hist_data(self):
+        PlotTable.freq = {'_PY_BIN0_': {0: 3, 1: 3, 4: 2}, '_PY_BIN1_': {3: 7}}
+        edges, counts = self.tbl.plot._get_hist_data(['a', 'b'], 5, None)
+
+        # Bins span all of the columns
+        self.assertTrue(np.allclose(edges, [1., 4.8, 8.6, 12.4, 16.2, 20.]))
+        self.assertEqual(counts.tolist(), [[3, 0], [3, 0], [0, 0], [0, 7], [2, 0]])
+        self.assertEqual(self.get_actions(), ['simple.summary', 'simple.freq'])
+
+        name, kwargs = self.conn.calls[-1]
+        self.assertEqual(kwargs['inputs'], ['_PY_BIN0_', '_PY_BIN1_'])
+        self.assertEqual(kwargs['computedvars'], ['_PY_BIN0_', '_PY_BIN1_'])
+        self.assertTrue('_PY_BIN1_ = min(floor((b - 1.0) / 3.8), 4);'
+                        in kwargs['computedvarsprogram'])
+
+        # Explicit bin edges don't need the ranges of the columns
+        PlotTable.freq = {'_PY_BIN0_': {0: 7, 1: 1}, '_PY_BIN1_': {0: 7}}
+        self.conn.calls = []
+        edges, counts = self.tbl.plot._get_hist_data(['a', 'b'], (0, 5, 20), None)
+        self.assertEqual(edges.tolist(), [0., 5., 20.])
+        self.assertEqual(counts.tolist(), [[7, 7], [1, 0]])
+        self.assertEqual(self.get_actions(), ['simple.freq'])
+
+        name, kwargs = self.conn.calls[-1]
+        self.assertTrue('else if b < 5.0 then _PY_BIN1_ = 0; else _PY_BIN1_ = 1;'
+                        in kwargs['computedvarsprogram'])
+
+    def test_box_stats(self):
+        PlotTable.freq = {'_PY_LO0_': [1., 2., 2., 3., 3., 3., 4.],
+                          '_PY_HI0_': [1., 2., 2., 3., 3., 3., 4.]}
+        stats = self.tbl.plot._get_box_stats(['a'], 1.5)
+        self.assertEqual(self.get_actions(), ['percentile.percentile', 'simple.summary'])
+
+        name, kwargs = self.conn.calls[-1]
+        self.assertEqual(kwargs['inputs'], ['a', '_PY_LO0_', '_PY_HI0_'])
+        self.assertTrue('if a >= 0.125 then _PY_LO0_ = a;' in kwargs['computedvarsprogram'])
+        self.assertTrue('if . < a <= 5.125 then _PY_HI0_ = a;'
+                        in kwargs['computedvarsprogram'])
+
+        self.assertEqual(len(stats), 1)
+        stats = stats[0]
+        self.assertEqual(stats['label'], 'a')
+        self.assertEqual((stats['q1'], stats['med'], stats['q3']), (2., 3., 3.25))
+        self.assertEqual((stats['whislo'], stats['whishi']), (1., 4.))
+        self.assertEqual(stats['mean'], PlotTable.data['a'].mean())
+        self.assertEqual(stats['fliers'].tolist(), [20.])
+
+    def test_box_fallback(self):
+        calls = []
+
+        class Fetched(object):
+            class plot(object):
+                @staticmethod
+                def box(**kwargs):
+                    calls.append(kwargs)
+
+        def fetch(**params):
+            return Fetched()
+
+        self.tbl._fetch = fetch
+
+        # pandas plot arguments that bxp doesn't accept use the fetched data
+        self.tbl.plot.box(rot=45, grid=True, fontsize=8)
+        self.assertEqual(calls, [dict(by=None, rot=45, grid=True, fontsize=8)])
+        self.assertEqual(self.get_actions(), [])
+
+    def test_hexbin_data(self):
+        PlotTable.freq = {'_PY_HEX_': {0: 2, 5: 3}}
+        data = self.tbl.plot._get_hexbin_data('a', 'b', (2, 1))
+
+        self.assertEqual(data['extent'], (1., 20., 5., 8.))
+        self.assertEqual(len(data['counts']), 3 * 2 + 2 * 1)
+        self.assertEqual(data['counts'].tolist(), [2, 0, 0, 0, 0, 3, 0, 0])
+
+        # Centers of the first and second lattice
+        self.assertAlmostEqual(data['x'][0], 1.)
+        self.assertAlmostEqual(data['y'][0], 5.)
+        self.assertAlmostEqual(data['x'][6], 5.75)
+        self.assertAlmostEqual(data['y'][6], 6.5)
+
+    def test_cached(self):
+        PlotTable.freq = {'_PY_BIN0_': {0: 8}}
+        plot = self.tbl.plot
+        first = plot._get_cached('hist', (('a',), 1, None), plot._get_hist_data)
+        num_calls = len(self.conn.calls)
+
+        second = plot._get_cached('hist', (('a',), 1, None), plot._get_hist_data)
+        self.assertEqual(len(self.conn.calls), num_calls)
+        self.assertEqual(second[1].tolist(), first[1].tolist())
+
+        # Different arguments are computed again
+        plot._get_cached('hist', (('a',), 2, None), plot._get_hist_data)
+        self.assertTrue(len(self.conn.calls) > num_calls)
+
+        # Modifying the table invalidates the data
+        num_calls = len(self.conn.calls)
+        self.conn.metadata_cache.invalidate(self.tbl)
+        plot._get_cached('hist', (('a',), 1, None), plot._get_hist_data)
+        self.assertTrue(len(self.conn.calls) > num_calls)
+
+
+if __name__ == '__main__':
+   from swat.utils.testing import runtests
+   runtests()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import gc
+import warnings
+import swat
+import swat.utils.testing as tm
+import unittest
+from swat.cas.batch import CASBatch
+from swat.cas.temptables import CASTempTables
+
+
+class Performance(object):
+    ''' Performance metrics with only the memory '''
+
+    def __init__(self, memory):
+        self.memory = memory
+
+
+class Results(dict):
+    ''' Results with performance metrics '''
+
+    def __init__(self, memory):
+        dict.__init__(self)
+        self.performance = Performance(memory)
+
+
+class DropConnection(object):
+    ''' Connection that records the tables that are dropped '''
+
+    def __init__(self):
+        self.dropped = []
+        self.batches = 0
+
+    def batch(self):
+        self.batches += 1
+        return CASBatch(self)
+
+    def retrieve(self, _name_, **kwargs):
+        if _name_ == 'table.droptable':
+            self.dropped.append(kwargs['name'])
+
+
+class TestTempTables(tm.TestCase):
+
+    def setUp(self):
+        swat.reset_option()
+        self.conn = DropConnection()
+        self.temps = CASTempTables(self.conn)
+
+    def tearDown(self):
+        swat.reset_option()
+
+    def test_release(self):
+        a = self.temps.add('a', 'casuser')
+        b = self.temps.add('b', 'casuser')
+        c = self.temps.add('c', 'casuser')
+        self.assertEqual(len(self.temps), 3)
+
+        # Released tables are queued until the next flush
+        del a, b
+        gc.collect()
+        self.assertEqual(self.temps.pending, 2)
+        self.assertEqual(self.conn.dropped, [])
+
+        self.temps.flush()
+        self.assertEqual(sorted(self.conn.dropped), ['a', 'b'])
+        self.assertEqual(self.conn.batches, 1)
+        self.assertEqual(len(self.temps), 1)
+        self.assertTrue(c in self.temps)
+
+        # Flushing without queued tables doesn't submit anything
+        self.temps.flush()
+        self.assertEqual(self.conn.batches, 1)
+
+    def test_drop(self):
+        a = self.temps.add('a', 'casuser')
+        b = self.temps.add('b', 'casuser')
+        del b
+        gc.collect()
+
+        # Queued tables are dropped along with the given ones
+        self.temps.drop([a])
+        self.assertEqual(sorted(self.conn.dropped), ['a', 'b'])
+        self.assertEqual(self.conn.batches, 1)
+        self.assertEqual(len(self.temps), 0)
+
+        # Releasing a dropped table does nothing
+        del a
+        gc.collect()
+        self.assertEqual(self.temps.pending, 0)
+
+    def test_created(self):
+        a = self.temps.add('a', 'casuser', created=False)
+        b = self.temps.add('b', 'casuser', created=False)
+        self.temps.update(b)
+        del a, b
+        gc.collect()
+        self.temps.flush()
+        self.assertEqual(self.conn.dropped, ['b'])
+
+    def test_sources(self):
+        a = self.temps.add('a', 'casuser')
+        view = self.temps.add('view', 'casuser', sources=[a, None])
+        del a
+        gc.collect()
+        self.temps.flush()
+        self.assertEqual(self.conn.dropped, [])
+
+        del view
+        gc.collect()
+        self.temps.flush()
+        self.assertEqual(sorted(self.conn.dropped), ['a', 'view'])
+
+    def test_scope(self):
+        a = self.temps.add('a', 'casuser')
+        with self.temps.scope():
+            b = self.temps.add('b', 'casuser')
+            with self.temps.scope():
+                c = self.temps.add('c', 'casuser')
+            self.assertEqual(self.conn.dropped, ['c'])
+        self.assertEqual(self.conn.dropped, ['c', 'b'])
+        self.assertEqual(len(self.temps), 1)
+        self.assertTrue(a in self.temps)
+        self.assertFalse(b in self.temps)
+        self.assertFalse(c in self.temps)
+
+    def test_memory(self):
+        swat.options.cas.dataset.temp_table_memory_limit = 1000
+
+        with warnings.catch_warnings(record=True) as warns:
+            warnings.simplefilter('always')
+            a = self.temps.add('a', 'casuser', results=Results(600))
+            self.assertEqual(len(warns), 0)
+
+            b = self.temps.add('b', 'casuser', results=Results(600))
+            self.assertEqual(self.temps.memory, 1200)
+            self.assertEqual(len(warns), 1)
+            self.assertTrue(issubclass(warns[0].category, RuntimeWarning))
+
+            # The warning is only issued when the limit is first exceeded
+            c = self.temps.add('c', 'casuser', results=Results(100))
+            self.assertEqual(len(warns), 1)
+
+            self.temps.drop([b, c])
+            self.assertEqual(self.temps.memory, 600)
+            d = self.temps.add('d', 'casuser', results=Results(600))
+            self.assertEqual(len(warns), 2)
+
+        del a, d
+
+    def test_clear(self):
+        a = self.temps.add('a', 'casuser')
+        self.temps.clear()
+        del a
+        gc.collect()
+        self.temps.flush()
+        self.assertEqual(self.conn.dropped, [])
+        self.assertEqual(len(self.temps), 0)
+
+
+if __name__ == '__main__':
+   from swat.utils.testing import runtests
+   runtests()
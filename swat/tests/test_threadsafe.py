@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import threading
+import time
+import swat
+import swat.utils.testing as tm
+import unittest
+from swat.cas import connection as casconnection
+from swat.cas.cache import CASMetadataCache
+
+
+class FakeCAS(object):
+    ''' Connection that records the actions called and the peak concurrency '''
+
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    actions = set(['simple.summary', 'summary', 'table.tableinfo', 'tableinfo'])
+    actionsets = set(['simple', 'table'])
+
+    def __init__(self):
+        self.calls = []
+        self.terminated = False
+
+    def has_action(self, name):
+        return name in self.actions
+
+    def has_actionset(self, name):
+        return name in self.actionsets
+
+    def copy(self):
+        return type(self)()
+
+    def terminate(self):
+        self.terminated = True
+
+    def retrieve(self, _name_, **kwargs):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        time.sleep(0.01)
+        self.calls.append(_name_)
+        with cls.lock:
+            cls.active -= 1
+        return _name_
+
+
+class TestThreadSafeCAS(tm.TestCase):
+
+    def setUp(self):
+        FakeCAS.active = 0
+        FakeCAS.peak = 0
+
+    def _run_threads(self, conn, num=8):
+        threads = [threading.Thread(target=conn.simple.summary, kwargs=dict(table='cars'))
+                   for i in range(num)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_serialized(self):
+        base = FakeCAS()
+        conn = swat.ThreadSafeCAS(base)
+        self._run_threads(conn)
+        self.assertEqual(FakeCAS.peak, 1)
+        self.assertEqual(base.calls, ['simple.summary'] * 8)
+
+    def test_pool(self):
+        base = FakeCAS()
+        with swat.ThreadSafeCAS(base, pool_size=3) as conn:
+            self._run_threads(conn)
+            self.assertTrue(FakeCAS.peak <= 3)
+            self.assertTrue(len(conn._sessions) <= 3)
+            sessions = list(conn._sessions)
+        self.assertFalse(base.terminated)
+        self.assertTrue(all(x.terminated for x in sessions[1:]))
+
+        with self.assertRaises(swat.SWATError):
+            conn.retrieve('table.tableinfo')
+
+    def test_session(self):
+        base = FakeCAS()
+        conn = swat.ThreadSafeCAS(base, pool_size=2)
+        with conn.session() as sess:
+            self.assertTrue(sess is base)
+            self.assertEqual(conn.retrieve('table.tableinfo'), 'table.tableinfo')
+            self.assertEqual(base.calls, ['table.tableinfo'])
+            with self.assertRaises(swat.SWATError):
+                with conn.session():
+                    pass
+
+        with self.assertRaises(swat.SWATError):
+            conn.invoke('table.tableinfo')
+
+    def test_action_names(self):
+        base = FakeCAS()
+        conn = swat.ThreadSafeCAS(base)
+        self.assertEqual(conn.summary(table='cars'), 'summary')
+        self.assertEqual(conn.simple.summary(table='cars'), 'simple.summary')
+        self.assertEqual(conn.table.tableinfo(), 'table.tableinfo')
+
+        # Other attributes are not turned into action calls
+        for name in ['CASTable', 'upload_frame', 'foo']:
+            with self.assertRaises(AttributeError):
+                getattr(conn, name)
+        with self.assertRaises(AttributeError):
+            conn.simple.tableinfo
+        with self.assertRaises(AttributeError):
+            conn.simple.summary.foo
+        self.assertEqual(base.calls, ['summary', 'simple.summary', 'table.tableinfo'])
+
+
+
+class FakeDisposition(object):
+    status_code = 0
+    status = None
+
+
+class FakeResponse(object):
+    ''' Response containing a single result '''
+
+    def __init__(self, key):
+        self.key = key
+        self.disposition = FakeDisposition()
+        self.updateflags = set()
+
+
+class TestStream(tm.TestCase):
+
+    def setUp(self):
+        self.received = []
+        self._getnext = casconnection.getnext
+
+        def getnext(conn, datamsghandler=None):
+            for i in range(3):
+                with conn._exclusive():
+                    self.received.append(i)
+                yield FakeResponse('Result%d' % i), conn
+
+        casconnection.getnext = getnext
+
+        conn = object.__new__(swat.CAS)
+        conn.__dict__.update(_lock=threading.RLock(), _stream_thread=None,
+                             _protocol='cas', metadata_cache=CASMetadataCache())
+        conn._invoke_with_signature = lambda _name_, **kwargs: None
+        conn._iter_response = lambda response: iter([(response.key, response.key)])
+        self.conn = conn
+
+    def tearDown(self):
+        casconnection.getnext = self._getnext
+
+    def _use(self):
+        with self.conn._exclusive():
+            pass
+
+    def _in_thread(self, func):
+        errors = []
+
+        def run():
+            try:
+                func()
+            except Exception as err:
+                errors.append(err)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+        return errors
+
+    def test_stream(self):
+        out = list(self.conn.stream('simple.summary'))
+        self.assertEqual(out, [('Result0', 'Result0'), ('Result1', 'Result1'),
+                               ('Result2', 'Result2')])
+        self.assertTrue(self.conn._stream_thread is None)
+
+    def test_break(self):
+        for key, value in self.conn.stream('simple.summary'):
+            break
+
+        # The remaining responses are read and the connection is released
+        self.assertEqual(self.received, [0, 1, 2])
+        self.assertTrue(self.conn._stream_thread is None)
+        self.assertEqual(self._in_thread(self._use), [])
+
+    def test_other_thread(self):
+        stream = self.conn.stream('simple.summary')
+        self.assertEqual(next(stream)[0], 'Result0')
+
+        # Other threads can not use the connection until the stream is finished
+        errors = self._in_thread(self._use)
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(isinstance(errors[0], swat.SWATError))
+
+        # The stream can be closed by another thread
+        self.assertEqual(self._in_thread(stream.close), [])
+        self.assertEqual(self.received, [0, 1, 2])
+        self.assertTrue(self.conn._stream_thread is None)
+
+
+if __name__ == '__main__':
+   from swat.utils.testing import runtests
+   runtests()
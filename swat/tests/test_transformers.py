@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import json
+import numpy as np
+import swat
+import swat.utils.testing as tm
+import timeit
+import unittest
+from swat import clib
+from swat.cas import transformers
+from swat.cas.rest.connection import _normalize_params
+
+NUM_ITEMS = 100000
+
+
+class FakeValueList(object):
+    ''' CASValueList that records the values that are set '''
+
+    def __init__(self, length, soptions='', error=None):
+        self.items = [None] * length
+        self.error = ''
+
+    def getLastErrorMessage(self):
+        return self.error
+
+    def _set(self, method):
+        def setter(i, key, value=None):
+            self.items[i] = (key, method, value)
+        return setter
+
+    def __getattr__(self, name):
+        if name.startswith('set'):
+            return self._set(name[3:])
+        raise AttributeError(name)
+
+    def createListAt(self, i, key, length):
+        out = type(self)(length)
+        self.items[i] = (key, 'List', out)
+        return out
+
+    def to_python(self):
+        out = []
+        for item in self.items:
+            if item is None:
+                out.append(item)
+            elif item[1] == 'List':
+                out.append((item[0], item[1], item[2].to_python()))
+            else:
+                out.append(item)
+        return out
+
+
+class TestPy2CAS(tm.TestCase):
+
+    def setUp(self):
+        self._valuelist = clib.SW_CASValueList
+        clib.SW_CASValueList = FakeValueList
+
+    def tearDown(self):
+        clib.SW_CASValueList = self._valuelist
+
+    def test_types(self):
+        out = transformers.py2cas('', None, a=True, b='str', c=10, d=1.5,
+                                  e=swat.nil, f=swat.blob(b'bytes'),
+                                  g=np.int32(5),
+                                  lambda_=['x'], j=None)
+        items = {x[0]: x[1:] for x in out.to_python() if x is not None}
+        self.assertEqual(items['a'], ('Boolean', 1))
+        self.assertEqual(items['b'], ('String', 'str'))
+        self.assertEqual(items['c'], ('Int64', 10))
+        self.assertEqual(items['d'], ('Double', 1.5))
+        self.assertEqual(items['e'], ('Nil', None))
+        self.assertEqual(items['f'], ('Blob', b'bytes'))
+        self.assertEqual(items['g'], ('Int32', 5))
+        self.assertEqual(items['lambda'], ('List', [(None, 'String', 'x')]))
+
+        # Unsupported values are skipped
+        self.assertTrue('j' not in items)
+
+    def test_lists(self):
+        out = transformers.py2cas('', None,
+                                  strs=['a', 'b'], ints=[1, 2], floats=[1.5, 2.5],
+                                  mixed=['a', 1, True, [2.5]],
+                                  table=dict(name='cars', vars=['x', 'y']))
+        items = {x[0]: x[2] for x in out.to_python()}
+        self.assertEqual(items['strs'], [(None, 'String', 'a'), (None, 'String', 'b')])
+        self.assertEqual(items['ints'], [(None, 'Int64', 1), (None, 'Int64', 2)])
+        self.assertEqual(items['floats'], [(None, 'Double', 1.5), (None, 'Double', 2.5)])
+        self.assertEqual(items['mixed'], [(None, 'String', 'a'), (None, 'Int64', 1),
+                                          (None, 'Boolean', 1),
+                                          (None, 'List', [(None, 'Double', 2.5)])])
+        self.assertEqual(sorted(items['table']),
+                         [('name', 'String', 'cars'),
+                          ('vars', 'List', [(None, 'String', 'x'),
+                                            (None, 'String', 'y')])])
+
+    def test_errors(self):
+        class ErrorValueList(FakeValueList):
+            def getLastErrorMessage(self):
+                return 'Bad value'
+
+        clib.SW_CASValueList = ErrorValueList
+        with self.assertRaises(swat.SWATError):
+            transformers.py2cas('', None, strs=['a', 'b'])
+
+    def test_benchmark(self):
+        homogeneous = ['col%d' % i for i in range(NUM_ITEMS)]
+        mixed = homogeneous[:-1] + [NUM_ITEMS]
+
+        fast = min(timeit.repeat(lambda: transformers.py2cas('', None,
+                                                             inputs=homogeneous),
+                                 number=1, repeat=3))
+        slow = min(timeit.repeat(lambda: transformers.py2cas('', None, inputs=mixed),
+                                 number=1, repeat=3))
+
+        self.assertTrue(fast < slow, 'homogeneous: %.4fs, mixed: %.4fs' % (fast, slow))
+
+
+class TestNormalizeParams(tm.TestCase):
+
+    def test_normalize(self):
+        out = _normalize_params(dict(lambda_=1, a=np.int64(5), b=set(['x']),
+                                     c={0: 'a', 1: 'b'},
+                                     d=[np.int64(1), dict(e=np.float64(1.5))],
+                                     table=swat.CASTable('cars', caslib='casuser')))
+        self.assertEqual(out, {'lambda': 1, 'a': 5, 'b': ['x'], 'c': ['a', 'b'],
+                               'd': [1, {'e': 1.5}],
+                               'table': dict(name='cars', caslib='casuser')})
+        self.assertTrue(type(out['a']) is int)
+        self.assertTrue(type(out['d'][0]) is int)
+        json.dumps(out)
+
+    def test_benchmark(self):
+        homogeneous = ['col%d' % i for i in range(NUM_ITEMS)]
+        mixed = homogeneous[:-1] + [np.int64(NUM_ITEMS)]
+
+        fast = min(timeit.repeat(lambda: json.dumps(_normalize_params(
+                                     dict(inputs=homogeneous))),
+                                 number=1, repeat=3))
+        slow = min(timeit.repeat(lambda: json.dumps(_normalize_params(
+                                     dict(inputs=mixed))),
+                                 number=1, repeat=3))
+
+        self.assertTrue(fast < slow, 'homogeneous: %.4fs, mixed: %.4fs' % (fast, slow))
+
+
+if __name__ == '__main__':
+   from swat.utils.testing import runtests
+   runtests()
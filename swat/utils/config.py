@@ -45,6 +45,13 @@ from ..exceptions import SWATOptionError
 # Container for options
 _config = xdict()
 
+# Index of full option names and option name suffixes
+_options = {}
+_suffixes = {}
+
+# Current values of all options
+_snapshot = {}
+
 # Subscribers to option changes
 _subscribers = weakref.WeakKeyDictionary()
 
@@ -111,11 +118,13 @@ def option_context(*args, **kwargs):
         set_option(key, value)
 
     # Yield control
-    yield
+    try:
+        yield
 
     # Set old state back
-    for key, value in six.iteritems(oldstate):
-        set_option(key, value)
+    finally:
+        for key, value in six.iteritems(oldstate):
+            set_option(key, value)
 
 
 def _get_option_leaf_node(key):
@@ -138,11 +147,10 @@ def _get_option_leaf_node(key):
         If more than one option matches
 
     '''
-    flatkeys = list(_config.flatkeys())
     key = key.lower()
-    if key in flatkeys:
+    if key in _options:
         return key
-    keys = [k for k in flatkeys if k.endswith('.' + key)]
+    keys = _suffixes.get(key, [])
     if len(keys) > 1:
         raise SWATOptionError('There is more than one option with the name %s.' % key)
     if not keys:
@@ -192,6 +200,10 @@ def get_option(key):
         The value of the option
 
     '''
+    try:
+        return _options[key].get()
+    except KeyError:
+        pass
     key = _get_option_leaf_node(key)
     opt = _config[key]
     if not isinstance(opt, SWATOption):
@@ -199,6 +211,25 @@ def get_option(key):
     return opt.get()
 
 
+def get_option_snapshot():
+    '''
+    Get a dictionary of the current values of all options
+
+    The dictionary is keyed by the full option names.  It is updated
+    in place whenever an option is set, so it can be held on to by
+    code that looks up options frequently.  Note that options that are
+    specified using environment variables are only updated when they
+    are set using :func:`set_option`.
+
+    Returns
+    -------
+    dict
+        The current option values
+
+    '''
+    return _snapshot
+
+
 def get_suboptions(key):
     '''
     Get the dictionary of options at the level `key`
@@ -611,7 +642,8 @@ class SWATOption(object):
 
         '''
         value = self._validator(value)
-        _config[self._name]._value = value
+        self._value = value
+        _snapshot[self._name] = value
 
         if self._environ is not None:
             os.environ[self._environ] = str(value)
@@ -639,10 +671,11 @@ class SWATOption(object):
         '''
         if self._environ is not None:
             try:
-                _config[self._name]._value = self._validator(os.environ[self._environ])
+                self._value = self._validator(os.environ[self._environ])
+                _snapshot[self._name] = self._value
             except KeyError:
                 pass
-        return _config[self._name]._value
+        return self._value
 
     def get_default(self):
         '''
@@ -654,7 +687,7 @@ class SWATOption(object):
             The default value of the option
 
         '''
-        return _config[self._name]._default
+        return self._default
 
 
 def register_option(key, typedesc, validator, default, doc, environ=None):
@@ -684,7 +717,18 @@ def register_option(key, typedesc, validator, default, doc, environ=None):
     None
 
     '''
-    _config[key] = SWATOption(key, typedesc, validator, default, doc, environ=environ)
+    key = key.lower()
+    opt = SWATOption(key, typedesc, validator, default, doc, environ=environ)
+    _config[key] = opt
+
+    # Index the full name and all suffixes of the name
+    if key not in _options:
+        parts = key.split('.')
+        for i in range(1, len(parts)):
+            _suffixes.setdefault('.'.join(parts[i:]), []).append(key)
+    _options[key] = opt
+
+    _snapshot[key] = opt.get()
 
 
 class AttrOption(object):